@@ -1,2 +1,4 @@
-from .binance.binance_ws import BinanceWSClient
+from .binance.binance_ws import BinanceWSClient, BinanceStreamWSClient, BinanceDepthWSClient, BinanceUserDataWSClient
 from .binance.binance_api import BinanceAPIClient
+from .binance.binance_ws_api import BinanceWSAPIClient
+from .simulated_api import SimulatedAPIClient
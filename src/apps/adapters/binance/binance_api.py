@@ -1,10 +1,17 @@
 import aiohttp
+import asyncio
 import time
+import urllib.parse
 
 from decimal import Decimal
+from logging import Logger
+from yarl import URL
 
 import settings
-from ...adapters.client_base import APIClient
+from ...adapters.binance.exchange_info import ExchangeInfoCache
+from ...adapters.client_base import APIClient, RequestSigner
+from ...adapters.scheduler import RequestPriority, order_priority
+from ...adapters.symbol_info import SymbolInfo
 
 
 class BinanceAPIClient(APIClient):
@@ -14,6 +21,37 @@ class BinanceAPIClient(APIClient):
     url = settings.BINANCE_API_URL
     api_key = settings.BINANCE_API_KEY
     api_secret = settings.BINANCE_API_SECRET
+    rate_limits = {
+        'REQUEST_WEIGHT_1M': (6000, 60),
+        'ORDERS_10S': (100, 10),
+        'ORDERS_1D': (200000, 86400),
+    }
+    # Префиксы заголовков с расходом лимитов -> префикс имени лимита
+    usage_headers = {
+        'X-MBX-USED-WEIGHT-': 'REQUEST_WEIGHT_',
+        'X-MBX-ORDER-COUNT-': 'ORDERS_',
+    }
+
+    # Пул соединений: keep-alive дольше интервала прогрева, адрес API кешируется на 5 минут
+    pool_size = 32
+    keepalive_timeout = 75
+    dns_ttl = 300
+    time_sync_interval = 600
+
+    def __init__(self, logger: Logger, keep_warm: float = 0):
+        super().__init__(logger)
+        self.exchange_info = ExchangeInfoCache(self, logger)
+        self.signer = RequestSigner(self.api_secret)
+        self.headers = self.get_headers(self.api_key)
+        # Интервал ping в простое, чтобы соединение пула не закрылось до ордера; 0 - без ping
+        self.keep_warm = keep_warm
+        # Смещение часов биржи относительно локальных в мс, прибавляется к timestamp подписи
+        self.time_offset = 0
+        self.time_syncs = 0
+        self.pings = 0
+        self._last_request = 0.0
+        # Идущая синхронизация часов, её ждут подписанные запросы
+        self._resync: asyncio.Task | None = None
 
     def __str__(self):
         return f'BinanceAPIClient({self})'
@@ -29,50 +67,150 @@ class BinanceAPIClient(APIClient):
         """ Добавляет к строке запроса требуемую команду"""
         return f'/{api}/{version}/{method}'
 
-    @classmethod
-    def get_signature_params(cls, params: dict = None) -> dict:
-        params = params or {}
-        params.update({
-            'timestamp': int(time.time() * 1000)
-        })
-        params['signature'] = cls._generate_signature(cls.api_secret, params)
-        return params
-
-    async def _request(self, method: str, endpoint: str, params: dict = None, signed: bool = True) -> dict:
-        params = self.get_signature_params(params) if signed else params
-        async with self.session.request(
-                method=method,
-                url=f"{self.url}{endpoint}",
-                params=params,
-                headers=self.get_headers(self.api_key)
-        ) as response:
+    def _create_session(self) -> aiohttp.ClientSession:
+        return aiohttp.ClientSession(connector=aiohttp.TCPConnector(
+            limit_per_host=self.pool_size,
+            ttl_dns_cache=self.dns_ttl,
+            keepalive_timeout=self.keepalive_timeout
+        ))
+
+    def _query(self, params: dict | None, signed: bool) -> str:
+        """Строка запроса, которая уходит как есть: подписывается ровно отправляемый текст"""
+        query = urllib.parse.urlencode(params) if params else ''
+        if signed:
+            timestamp = f"timestamp={int(time.time() * 1000) + self.time_offset}"
+            query = f"{query}&{timestamp}" if query else timestamp
+            query = f"{query}&signature={self.signer.sign(query)}"
+        return query
+
+    @staticmethod
+    def request_costs(weight: int, orders: int = 0) -> dict[str, int]:
+        """Расход лимитов запроса: вес и, для ордеров, счётчики ордеров"""
+        costs = {'REQUEST_WEIGHT_1M': weight}
+        if orders:
+            costs.update({'ORDERS_10S': orders, 'ORDERS_1D': orders})
+        return costs
+
+    async def _request(self,
+                       method: str,
+                       endpoint: str,
+                       params: dict = None,
+                       signed: bool = True,
+                       priority: RequestPriority = RequestPriority.ACCOUNT,
+                       weight: int = 1,
+                       orders: int = 0) -> dict:
+        # Одинаковые одновременные GET-запросы выполняются один раз
+        key = (method, endpoint, tuple(sorted((params or {}).items()))) if method == 'GET' else None
+        return await self.scheduler.submit(
+            lambda: self._send(method, endpoint, params, signed),
+            priority,
+            self.request_costs(weight, orders),
+            key
+        )
+
+    async def _send(self, method: str, endpoint: str, params: dict = None, signed: bool = True) -> dict:
+        if signed and self._resync is not None and not self._resync.done():
+            # Подписанный запрос ждёт идущей синхронизации часов вместо отказа -1021
+            await asyncio.wait([self._resync])
+        query = self._query(params, signed)
+        # encoded=True: aiohttp не перекодирует уже подписанную строку
+        url = URL(f"{self.url}{endpoint}?{query}" if query else f"{self.url}{endpoint}", encoded=True)
+        self._last_request = time.monotonic()
+        async with self.session.request(method=method, url=url, headers=self.headers) as response:
+            self._track_usage(response)
+            if response.status == 400 and signed:
+                await self._check_timestamp(response)
             try:
                 response.raise_for_status()
                 self.logger.info(f"Отправлен {method} запрос '{endpoint}'")
             except aiohttp.ClientResponseError as e:
                 self.logger.error(f"Request failed: {e.status} {e.message}\n"
-                                  f"Request URL: {e.request_info.url}\n"
-                                  f"Params: {params}")
+                                  f"Request URL: {e.request_info.url}")
                 raise
             return await response.json()
 
+    async def _check_timestamp(self, response: aiohttp.ClientResponse):
+        """-1021 (timestamp вне recvWindow): часы разошлись, смещение пересчитывается в фоне"""
+        try:
+            code = (await response.json()).get('code')
+        except (aiohttp.ContentTypeError, ValueError):
+            return
+        if code == -1021 and (self._resync is None or self._resync.done()):
+            self.logger.warning("Timestamp вне recvWindow, синхронизация времени с биржей")
+            self._resync = asyncio.create_task(self.sync_time())
+
+    async def sync_time(self):
+        """Смещение часов биржи по /api/v3/time с поправкой на половину времени ответа"""
+        sent = time.time()
+        result = await self._request('GET', self._path('time'), signed=False)
+        received = time.time()
+        self.time_offset = result['serverTime'] - int((sent + received) * 500)
+        self.time_syncs += 1
+        self.logger.info(f"Смещение часов биржи: {self.time_offset} мс (ответ за {(received - sent) * 1000:.1f} мс)")
+
+    async def maintain(self):
+        """Фоновое обслуживание соединения
+
+        До первого ордера синхронизирует часы (заодно открывая соединение
+        пула), затем раз в time_sync_interval повторяет синхронизацию, а с
+        keep_warm шлёт ping после keep_warm секунд без запросов.
+        """
+        # Проверка дважды за keep_warm: простой не превысит keep_warm больше чем на половину
+        interval = self.keep_warm / 2 if self.keep_warm else self.time_sync_interval
+        next_sync = 0.0
+        while True:
+            try:
+                now = time.monotonic()
+                if now >= next_sync:
+                    self._resync = asyncio.create_task(self.sync_time())
+                    await self._resync
+                    next_sync = now + self.time_sync_interval
+                elif self.keep_warm and now - self._last_request >= self.keep_warm:
+                    await self.get_ping_response()
+                    self.pings += 1
+            except Exception as e:
+                self.logger.warning(f"Обслуживание соединения: {e}")
+            await asyncio.sleep(interval)
+
+    def _track_usage(self, response: aiohttp.ClientResponse):
+        """Синхронизация лимитов по заголовкам X-MBX-* и паузы после 429/418"""
+        used = {}
+        for header, value in response.headers.items():
+            header = header.upper()
+            for prefix, limit in self.usage_headers.items():
+                if header.startswith(prefix):
+                    used[limit + header.removeprefix(prefix)] = int(value)
+        self.scheduler.update_usage(used)
+
+        if response.status in (418, 429):
+            self.scheduler.block(float(response.headers.get('Retry-After', 60)))
+
     async def new_order(self,
                         symbol: str,
                         order_type: str,
                         side: str,
                         quantity: Decimal,
-                        price: Decimal = Decimal('0')) -> dict:
+                        price: Decimal = Decimal('0'),
+                        client_order_id: str | None = None,
+                        reference_price: Decimal | None = None) -> dict:
+        info = self.exchange_info.get(symbol)
+        if info:
+            # Нарушение фильтров пары отклоняется локально, без запроса к бирже
+            quantity, price = info.prepare_order(side, quantity, price, reference_price)
+
         params = {
             'symbol': symbol,
             'side': side.upper(),
             'type': order_type.upper(),
-            'quantity': str(quantity)
+            'quantity': f"{quantity:f}"
         }
 
+        if client_order_id:
+            params['newClientOrderId'] = client_order_id
         if price:
-            params['price'] = str(price)
+            params['price'] = f"{price:f}"
 
-        return await self._request('POST', self._path('order'), params)
+        return await self._request('POST', self._path('order'), params, priority=order_priority(side), orders=1)
 
     async def get_ping_response(self):
         return await self._request(
@@ -81,12 +219,59 @@ class BinanceAPIClient(APIClient):
             signed=False
         )
 
+    async def get_exchange_info(self) -> dict:
+        return await self._request('GET', self._path('exchangeInfo'), signed=False, weight=20)
+
+    async def get_symbol_info(self, symbol: str) -> SymbolInfo | None:
+        await self.exchange_info.load()
+        return self.exchange_info.get(symbol)
+
+    async def get_historical_trades(self, symbol: str, from_id: int, limit: int = 1000) -> list[dict]:
+        """Сделки начиная с from_id для восполнения пропусков потока, нужен только API ключ"""
+        return await self._request('GET', self._path('historicalTrades'), {
+            'symbol': symbol,
+            'fromId': from_id,
+            'limit': limit
+        }, signed=False, priority=RequestPriority.MARKET_DATA, weight=25)
+
+    @staticmethod
+    def depth_weight(limit: int) -> int:
+        """Вес снимка стакана зависит от глубины"""
+        if limit <= 100:
+            return 5
+        if limit <= 500:
+            return 25
+        if limit <= 1000:
+            return 50
+        return 250
+
+    async def get_depth(self, symbol: str, limit: int = 1000) -> dict:
+        """Снимок стакана для синхронизации локального OrderBook"""
+        return await self._request('GET', self._path('depth'), {
+            'symbol': symbol,
+            'limit': limit
+        }, signed=False, priority=RequestPriority.ENTRY, weight=self.depth_weight(limit))
+
+    async def create_listen_key(self) -> str:
+        """Ключ user data stream, подпись не требуется"""
+        result = await self._request('POST', self._path('userDataStream'), signed=False, weight=2)
+        return result['listenKey']
+
+    async def keepalive_listen_key(self, listen_key: str):
+        await self._request('PUT', self._path('userDataStream'), {'listenKey': listen_key}, signed=False, weight=2)
+
     async def get_balances(self) -> dict[str, float]:
-        result = await self._request('GET', self._path('account'))
+        result = await self._request('GET', self._path('account'), weight=20)
         return {b['asset']: b['free'] for b in result['balances'] if float(b['free']) > 0}
 
     async def get_order(self, order_id: str, symbol: str) -> dict:
         return await self._request('GET', self._path('order'), {
             'symbol': symbol,
             'orderId': order_id
-        })
+        }, weight=4)
+
+    async def cancel_order(self, order_id: str, symbol: str) -> dict:
+        return await self._request('DELETE', self._path('order'), {
+            'symbol': symbol,
+            'orderId': order_id
+        }, priority=RequestPriority.EXIT)
@@ -1,27 +1,355 @@
+import asyncio
 import json
+import time
 import settings
+from collections import deque
 from logging import Logger
 
+from apps.adapters.binance.decoders import JsonDecoder, get_decoder
+from apps.adapters.order_book import OrderBook
+from apps.adapters.tick import Tick
 from apps.adapters.ws_base import BaseWSClient
+from apps.services.tick_store import TickRecorder
 
 
 class BinanceWSClient(BaseWSClient):
+    """Поток сделок с контролем последовательности trade id
+
+    Пропуски (после переподключения или потери кадров) восполняются по REST
+    через api_client в фоновой задаче пары: живые сделки этой пары до конца
+    восполнения придерживаются и выдаются следом по порядку, остальные пары
+    соединения идут без задержки. Повторы отбрасываются.
+    """
+
     name = "BinanceWS"
+    # Больший разрыв не восполняется: дешевле пропустить, чем ждать тысячи запросов
+    max_backfill = 10000
+    backfill_page = 1000
 
-    def __init__(self, symbol: str, logger: Logger):
+    def __init__(self,
+                 symbol: str,
+                 logger: Logger,
+                 recorder: TickRecorder | None = None,
+                 decoder: JsonDecoder | None = None,
+                 api_client=None):
         url = f"{settings.BINANCE_WS_URL}/{symbol.lower()}@trade"
         super().__init__(url, logger)
         self.symbol = symbol
+        self.recorder = recorder
+        self.decoder = decoder or get_decoder()
+        self.api_client = api_client
+        self.last_trade_ids: dict[str, int] = {}
+        self.gaps = 0
+        self.missed = 0
+        self.backfilled = 0
+        self.duplicates = 0
+        # Пары с идущим восполнением: придержанные сделки и диапазоны пропусков по порядку
+        self._held: dict[str, deque[Tick | tuple[int, int]]] = {}
+        self._backfilling: dict[str, asyncio.Task] = {}
+        self._queue = None
+
+    async def connect(self, queue):
+        self._queue = queue
+        await super().connect(queue)
+
+    async def close(self):
+        for task in self._backfilling.values():
+            task.cancel()
+        await super().close()
+
+    async def on_connect(self):
+        self.logger.info(f"[{self.name}] Connected to {self.url} (decoder: {self.decoder.name})")
+
+    async def on_message(self, message: str) -> Tick | None:
+        tick = self.decoder.decode(message)
+        if tick is None:
+            return None
+        ticks = self._sequence([tick])
+        return ticks[-1] if ticks else None
+
+    async def on_messages(self, messages: list[str]) -> list[Tick]:
+        return self._sequence(self.decoder.decode_batch(messages))
+
+    def _sequence(self, ticks: list[Tick]) -> list[Tick]:
+        """Упорядочивание по trade id: отбрасывание повторов, пропуски уходят в фоновое восполнение"""
+        result = []
+        for tick in ticks:
+            symbol = tick.symbol
+            last = self.last_trade_ids.get(symbol)
+            held = self._held.get(symbol)
+            if last is not None:
+                if tick.trade_id <= last:
+                    self.duplicates += 1
+                    continue
+                if tick.trade_id > last + 1:
+                    if held is None:
+                        held = self._held[symbol] = deque()
+                        self._backfilling[symbol] = asyncio.create_task(self._release(symbol, held))
+                    held.append((last + 1, tick.trade_id))
+            self.last_trade_ids[symbol] = tick.trade_id
+            if held is not None:
+                held.append(tick)
+                continue
+            result.append(tick)
+
+        if self.recorder:
+            for tick in result:
+                self._record(tick)
+        return result
+
+    async def _release(self, symbol: str, held: deque):
+        """Восполнение пропусков пары и выдача придержанных сделок в порядке trade id"""
+        try:
+            while held:
+                item = held.popleft()
+                ticks = await self._backfill(symbol, *item) if isinstance(item, tuple) else [item]
+                for tick in ticks:
+                    if self.recorder:
+                        self._record(tick)
+                    await self._queue.put(tick)
+        finally:
+            # Без await после опустевшей очереди: новые сделки пары снова идут напрямую
+            del self._held[symbol]
+            del self._backfilling[symbol]
+
+    async def _backfill(self, symbol: str, start: int, end: int) -> list[Tick]:
+        """Сделки [start, end) из REST historicalTrades"""
+        missing = end - start
+        self.gaps += 1
+        self.missed += missing
+        if self.api_client is None or missing > self.max_backfill:
+            self.logger.warning(f"[{self.name}] {symbol}: пропущено {missing} сделок ({start}..{end - 1}), "
+                                f"восполнение недоступно")
+            return []
+
+        ticks = []
+        from_id = start
+        try:
+            while from_id < end:
+                trades = await self.api_client.get_historical_trades(
+                    symbol, from_id, min(self.backfill_page, end - from_id)
+                )
+                received = time.monotonic()
+                ticks += [self.decoder.historical(symbol, trade, received) for trade in trades if trade['id'] < end]
+                if not trades or trades[-1]['id'] + 1 >= end:
+                    break
+                from_id = trades[-1]['id'] + 1
+        except Exception as e:
+            self.logger.error(f"[{self.name}] {symbol}: ошибка восполнения сделок {start}..{end - 1}: {e}")
+
+        self.backfilled += len(ticks)
+        self.logger.warning(f"[{self.name}] {symbol}: пропущено {missing} сделок ({start}..{end - 1}), "
+                            f"восполнено {len(ticks)}")
+        return ticks
+
+    def stats(self) -> dict:
+        return {
+            **super().stats(),
+            'gaps': self.gaps,
+            'missed': self.missed,
+            'backfilled': self.backfilled,
+            'unrecovered': self.missed - self.backfilled,
+            'duplicates': self.duplicates,
+            'backfilling': len(self._backfilling),
+        }
+
+    def _record(self, tick: Tick):
+        """Запись сделки в хранилище тиков"""
+        self.recorder.append(tick.symbol, tick.trade_id, tick.event_time, tick.fixed_price, tick.fixed_qty,
+                             tick.buyer_maker)
+
+    async def on_disconnect(self):
+        self.logger.info(f"[{self.name}] Disconnected from {self.url}: {self.stats()}")
+
+    async def on_error(self, error: Exception):
+        self.logger.info(f"[{self.name}] Error: {error}")
+        return str(error)
+
+
+class BinanceStreamWSClient(BinanceWSClient):
+    """Комбинированный поток сделок по нескольким парам через одно соединение"""
+
+    name = "BinanceStreamWS"
+    # Лимит Binance на количество потоков в одном соединении
+    max_streams = 1024
+
+    def __init__(self,
+                 symbols: list[str],
+                 logger: Logger,
+                 recorder: TickRecorder | None = None,
+                 decoder: JsonDecoder | None = None,
+                 api_client=None):
+        if len(symbols) > self.max_streams:
+            raise ValueError(f"Не более {self.max_streams} потоков на соединение, передано {len(symbols)}")
+
+        streams = '/'.join(f"{symbol.lower()}@trade" for symbol in symbols)
+        super().__init__(symbols[0], logger, recorder, decoder, api_client)
+        self.url = f"{settings.BINANCE_WS_STREAM_URL}?streams={streams}"
+        self.symbols = symbols
+
+    @classmethod
+    def shard(cls,
+              symbols: list[str],
+              logger: Logger,
+              recorder: TickRecorder | None = None,
+              decoder: JsonDecoder | None = None,
+              api_client=None) -> list['BinanceStreamWSClient']:
+        """Разбивает пары на соединения с учётом лимита потоков"""
+        return [
+            cls(symbols[i:i + cls.max_streams], logger, recorder, decoder, api_client)
+            for i in range(0, len(symbols), cls.max_streams)
+        ]
+
+
+class BinanceDepthWSClient(BaseWSClient):
+    """Локальные стаканы пар: комбинированный поток @depth и REST-снимок
+
+    После подключения события копятся в OrderBook, пока не придёт снимок
+    /api/v3/depth; разрыв последовательности или переподключение запускают
+    синхронизацию заново. Стаканы читаются напрямую, в очередь ничего не
+    передаётся.
+    """
+
+    name = "BinanceDepthWS"
+    max_streams = 1024
+    snapshot_limit = 1000
+    snapshot_retries = 5
+
+    def __init__(self,
+                 books: dict[str, OrderBook],
+                 logger: Logger,
+                 api_client,
+                 decoder: JsonDecoder | None = None,
+                 speed: str = '100ms'):
+        if len(books) > self.max_streams:
+            raise ValueError(f"Не более {self.max_streams} потоков на соединение, передано {len(books)}")
+        streams = '/'.join(f"{symbol.lower()}@depth@{speed}" for symbol in books)
+        super().__init__(f"{settings.BINANCE_WS_STREAM_URL}?streams={streams}", logger)
+        self.books = books
+        self.api_client = api_client
+        self.loads = (decoder or get_decoder()).loads
+        self.snapshots = 0
+        self._syncing: dict[str, asyncio.Task] = {}
+
+    @classmethod
+    def shard(cls, books: dict[str, OrderBook], logger: Logger, api_client,
+              decoder: JsonDecoder | None = None) -> list['BinanceDepthWSClient']:
+        symbols = list(books)
+        return [
+            cls({symbol: books[symbol] for symbol in symbols[i:i + cls.max_streams]}, logger, api_client, decoder)
+            for i in range(0, len(symbols), cls.max_streams)
+        ]
+
+    async def on_connect(self):
+        self.logger.info(f"[{self.name}] Connected, {len(self.books)} order books")
+
+    async def on_message(self, message: str) -> None:
+        await self.on_messages([message])
+
+    async def on_messages(self, messages: list[str]) -> list:
+        touched = set()
+        for message in messages:
+            data = self.loads(message)
+            event = data.get('data', data)
+            book = self.books.get(event.get('s'))
+            if book is None:
+                continue
+            if book.synced:
+                if book.apply(event):
+                    touched.add(book)
+                    continue
+                self.logger.warning(f"[{self.name}] {book.symbol}: разрыв последовательности стакана, синхронизация")
+            book.buffer(event)
+            if book.symbol not in self._syncing:
+                self._syncing[book.symbol] = asyncio.create_task(self._sync(book))
+        for book in touched:
+            book.notify()
+        return []
+
+    async def _sync(self, book: OrderBook):
+        """Снимок стакана поверх накопленных событий, повтор, если снимок отстал от потока"""
+        try:
+            for attempt in range(self.snapshot_retries):
+                snapshot = await self.api_client.get_depth(book.symbol, self.snapshot_limit)
+                self.snapshots += 1
+                if book.load_snapshot(snapshot):
+                    book.notify()
+                    return
+                await asyncio.sleep(0.1 * (attempt + 1))
+            self.logger.warning(f"[{self.name}] {book.symbol}: стакан не синхронизирован "
+                                f"за {self.snapshot_retries} снимков")
+        except Exception as e:
+            self.logger.error(f"[{self.name}] {book.symbol}: ошибка снимка стакана: {e}")
+        finally:
+            if self._syncing.get(book.symbol) is asyncio.current_task():
+                del self._syncing[book.symbol]
+
+    def stats(self) -> dict:
+        return {
+            **super().stats(),
+            'books': len(self.books),
+            'synced': sum(book.synced for book in self.books.values()),
+            'snapshots': self.snapshots,
+            'resyncs': sum(book.resyncs for book in self.books.values()),
+        }
+
+    async def on_disconnect(self):
+        # События за время разрыва потеряны: стаканы синхронизируются заново после подключения
+        for task in self._syncing.values():
+            task.cancel()
+        self._syncing.clear()
+        for book in self.books.values():
+            book.reset()
+        self.logger.info(f"[{self.name}] Disconnected: {self.stats()}")
+
+    async def on_error(self, error: Exception):
+        self.logger.info(f"[{self.name}] Error: {error}")
+        return str(error)
+
+
+class BinanceUserDataWSClient(BaseWSClient):
+    """User data stream: executionReport и outboundAccountPosition по listenKey"""
+
+    name = "BinanceUserDataWS"
+    # Binance закрывает ключ через 60 минут без продления
+    keepalive_interval = 30 * 60
+
+    def __init__(self, api_client, logger: Logger):
+        super().__init__(settings.BINANCE_WS_URL, logger)
+        self.api_client = api_client
+        self.listen_key: str | None = None
+        self._keepalive_task: asyncio.Task | None = None
+
+    async def connect(self, queue):
+        self._keepalive_task = asyncio.create_task(self._keepalive())
+        try:
+            await super().connect(queue)
+        finally:
+            self._keepalive_task.cancel()
+
+    async def before_connect(self):
+        """Ключ запрашивается при каждом подключении: истёкший ключ заменяется новым"""
+        self.listen_key = await self.api_client.create_listen_key()
+        self.url = f"{settings.BINANCE_WS_URL}/{self.listen_key}"
+
+    async def _keepalive(self):
+        while True:
+            await asyncio.sleep(self.keepalive_interval)
+            try:
+                await self.api_client.keepalive_listen_key(self.listen_key)
+            except Exception as e:
+                self.logger.error(f"[{self.name}] Не удалось продлить listenKey: {e}")
 
     async def on_connect(self):
-        self.logger.info(f"[{self.name}] Connected to {self.url}")
+        self.logger.info(f"[{self.name}] Connected to user data stream")
 
-    async def on_message(self, message: str):
-        data = json.loads(message)
-        return data.get("p")
+    async def on_message(self, message: str) -> dict | None:
+        event = json.loads(message)
+        if event.get('e') in ('executionReport', 'outboundAccountPosition'):
+            return event
 
     async def on_disconnect(self):
-        self.logger.info(f"[{self.name}] Disconnected from {self.url}")
+        self.logger.info(f"[{self.name}] Disconnected from user data stream")
 
     async def on_error(self, error: Exception):
         self.logger.info(f"[{self.name}] Error: {error}")
@@ -0,0 +1,274 @@
+import asyncio
+import itertools
+import json
+import time
+import urllib.parse
+from decimal import Decimal
+from logging import Logger
+
+import websockets
+
+import settings
+from apps.adapters.binance.binance_api import BinanceAPIClient
+from apps.adapters.binance.exchange_info import ExchangeInfoCache
+from apps.adapters.client_base import APIClient, RequestSigner
+from apps.adapters.scheduler import RequestPriority, RequestScheduler, order_priority
+from apps.adapters.symbol_info import SymbolInfo
+
+
+class BinanceWSAPIError(Exception):
+    """Ошибка запроса WebSocket API: HTTP-подобный статус и код Binance"""
+
+    def __init__(self, status: int, code: int, msg: str):
+        super().__init__(f"{status} {code}: {msg}")
+        self.status = status
+        self.code = code
+        self.msg = msg
+
+
+class BinanceWSAPIClient(APIClient):
+    """Ордера через WebSocket API Binance по постоянному соединению
+
+    Запросы отправляются в одно долгоживущее соединение, ответы сопоставляются
+    по id запроса. Подключение устанавливается при первом запросе и
+    восстанавливается после обрыва. Часы биржи синхронизируются методом time,
+    как у BinanceAPIClient: смещение прибавляется к timestamp подписи.
+    """
+
+    exchange = 'Binance'
+    url = settings.BINANCE_WS_API_URL
+    api_key = settings.BINANCE_API_KEY
+    api_secret = settings.BINANCE_API_SECRET
+    request_timeout = 10
+    # Лимиты общие с REST API: биржа считает вес по IP и ордера по аккаунту
+    rate_limits = BinanceAPIClient.rate_limits
+    # Запросы на чтение, одинаковые одновременные вызовы которых схлопываются
+    read_methods = {'ping', 'time', 'exchangeInfo', 'account.status', 'order.status'}
+    time_sync_interval = BinanceAPIClient.time_sync_interval
+
+    def __init__(self, logger: Logger):
+        # HTTP-сессия не нужна, весь обмен идёт через WebSocket
+        self.logger = logger
+        self.session = None
+        self.scheduler = RequestScheduler(self.rate_limits, logger)
+        self.exchange_info = ExchangeInfoCache(self, logger)
+        self.signer = RequestSigner(self.api_secret)
+        self._ws = None
+        self._reader: asyncio.Task | None = None
+        self._pending: dict[str, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._connect_lock = asyncio.Lock()
+        # Смещение часов биржи относительно локальных в мс, прибавляется к timestamp подписи
+        self.time_offset = 0
+        self.time_syncs = 0
+        # Идущая синхронизация часов, её ждут подписанные запросы
+        self._resync: asyncio.Task | None = None
+
+    def __str__(self):
+        return f'BinanceWSAPIClient({self.url})'
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def connect(self):
+        """Заранее открыть соединение, чтобы первый ордер не платил за рукопожатие"""
+        async with self._connect_lock:
+            if self._ws is None:
+                self._ws = await websockets.connect(self.url)
+                self._reader = asyncio.create_task(self._read(self._ws))
+                self.logger.info(f"WebSocket API connected to {self.url}")
+
+    async def close(self):
+        if self._ws is not None:
+            await self._ws.close()
+            self._ws = None
+        if self._reader:
+            self._reader.cancel()
+            self._reader = None
+        self.logger.info("API client closed")
+
+    async def _read(self, ws):
+        try:
+            async for message in ws:
+                response = json.loads(message)
+                future = self._pending.get(response.get('id'))
+                if future and not future.done():
+                    future.set_result(response)
+        except Exception as e:
+            self.logger.error(f"WebSocket API connection lost: {e}")
+        finally:
+            if self._ws is ws:
+                self._ws = None
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("WebSocket API connection closed"))
+
+    def _signed_params(self, params: dict) -> dict:
+        """Подпись WebSocket API: параметры по алфавиту в виде query string"""
+        params = dict(params, apiKey=self.api_key, timestamp=int(time.time() * 1000) + self.time_offset)
+        params = dict(sorted(params.items()))
+        params['signature'] = self.signer.sign(urllib.parse.urlencode(params))
+        return params
+
+    async def _call(self,
+                    method: str,
+                    params: dict = None,
+                    signed: bool = True,
+                    priority: RequestPriority = RequestPriority.ACCOUNT,
+                    weight: int = 1,
+                    orders: int = 0) -> dict:
+        params = params or {}
+        key = (method, tuple(sorted(params.items()))) if method in self.read_methods else None
+        return await self.scheduler.submit(
+            lambda: self._send(method, params, signed),
+            priority,
+            BinanceAPIClient.request_costs(weight, orders),
+            key
+        )
+
+    async def _send(self, method: str, params: dict, signed: bool) -> dict:
+        if self._ws is None:
+            await self.connect()
+
+        request_id = str(next(self._ids))
+        if signed:
+            if self._resync is not None and not self._resync.done():
+                # Подписанный запрос ждёт идущей синхронизации часов вместо отказа -1021
+                await asyncio.wait([self._resync])
+            params = self._signed_params(params)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            await self._ws.send(json.dumps({'id': request_id, 'method': method, 'params': params}))
+            async with asyncio.timeout(self.request_timeout):
+                response = await future
+        finally:
+            self._pending.pop(request_id, None)
+
+        self._track_usage(response)
+        if response.get('status') != 200:
+            error = response.get('error', {})
+            if error.get('code') == -1021 and (self._resync is None or self._resync.done()):
+                self.logger.warning("Timestamp вне recvWindow, синхронизация времени с биржей")
+                self._resync = asyncio.create_task(self.sync_time())
+            self.logger.error(f"Request failed: {response.get('status')} {error}\n"
+                              f"Method: {method}\n"
+                              f"Params: {params}")
+            raise BinanceWSAPIError(response.get('status'), error.get('code'), error.get('msg'))
+        self.logger.info(f"Отправлен запрос '{method}'")
+        return response.get('result')
+
+    async def sync_time(self):
+        """Смещение часов биржи по методу time с поправкой на половину времени ответа"""
+        sent = time.time()
+        result = await self._call('time', signed=False)
+        received = time.time()
+        self.time_offset = result['serverTime'] - int((sent + received) * 500)
+        self.time_syncs += 1
+        self.logger.info(f"Смещение часов биржи: {self.time_offset} мс (ответ за {(received - sent) * 1000:.1f} мс)")
+
+    async def maintain(self):
+        """Синхронизация часов до первого ордера и затем раз в time_sync_interval
+
+        Соединение держат открытым ping-кадры websockets, отдельный прогрев не нужен.
+        """
+        while True:
+            try:
+                self._resync = asyncio.create_task(self.sync_time())
+                await self._resync
+            except Exception as e:
+                self.logger.warning(f"Синхронизация времени: {e}")
+            await asyncio.sleep(self.time_sync_interval)
+
+    def _track_usage(self, response: dict):
+        """Синхронизация лимитов по rateLimits ответа и паузы после 429/418"""
+        self.scheduler.update_usage({
+            f"{limit['rateLimitType']}_{limit['intervalNum']}{limit['interval'][0]}": limit['count']
+            for limit in response.get('rateLimits', [])
+        })
+
+        if response.get('status') in (418, 429):
+            data = response.get('error', {}).get('data', {})
+            if 'retryAfter' in data and 'serverTime' in data:
+                self.scheduler.block((data['retryAfter'] - data['serverTime']) / 1000)
+            else:
+                self.scheduler.block(60)
+
+    async def new_order(self,
+                        symbol: str,
+                        order_type: str,
+                        side: str,
+                        quantity: Decimal,
+                        price: Decimal = Decimal('0'),
+                        client_order_id: str | None = None,
+                        reference_price: Decimal | None = None) -> dict:
+        info = self.exchange_info.get(symbol)
+        if info:
+            # Нарушение фильтров пары отклоняется локально, без запроса к бирже
+            quantity, price = info.prepare_order(side, quantity, price, reference_price)
+
+        params = {
+            'symbol': symbol,
+            'side': side.upper(),
+            'type': order_type.upper(),
+            'quantity': f"{quantity:f}",
+            'newOrderRespType': 'FULL'
+        }
+
+        if client_order_id:
+            params['newClientOrderId'] = client_order_id
+        if price:
+            params['price'] = f"{price:f}"
+            params['timeInForce'] = 'GTC'
+
+        return await self._call('order.place', params, priority=order_priority(side), orders=1)
+
+    async def get_ping_response(self):
+        return await self._call('ping', signed=False)
+
+    async def get_exchange_info(self) -> dict:
+        return await self._call('exchangeInfo', signed=False, weight=20)
+
+    async def get_symbol_info(self, symbol: str) -> SymbolInfo | None:
+        await self.exchange_info.load()
+        return self.exchange_info.get(symbol)
+
+    async def get_historical_trades(self, symbol: str, from_id: int, limit: int = 1000) -> list[dict]:
+        return await self._call('trades.historical', {
+            'symbol': symbol,
+            'fromId': from_id,
+            'limit': limit
+        }, signed=False, priority=RequestPriority.MARKET_DATA, weight=25)
+
+    async def get_depth(self, symbol: str, limit: int = 1000) -> dict:
+        return await self._call('depth', {
+            'symbol': symbol,
+            'limit': limit
+        }, signed=False, priority=RequestPriority.ENTRY, weight=BinanceAPIClient.depth_weight(limit))
+
+    async def create_listen_key(self) -> str:
+        result = await self._call('userDataStream.start', {'apiKey': self.api_key}, signed=False, weight=2)
+        return result['listenKey']
+
+    async def keepalive_listen_key(self, listen_key: str):
+        await self._call('userDataStream.ping', {'apiKey': self.api_key, 'listenKey': listen_key}, signed=False,
+                         weight=2)
+
+    async def get_balances(self) -> dict[str, str]:
+        result = await self._call('account.status', weight=20)
+        return {b['asset']: b['free'] for b in result['balances'] if float(b['free']) > 0}
+
+    async def get_order(self, order_id: str, symbol: str) -> dict:
+        return await self._call('order.status', {
+            'symbol': symbol,
+            'orderId': order_id
+        }, weight=4)
+
+    async def cancel_order(self, order_id: str, symbol: str) -> dict:
+        return await self._call('order.cancel', {
+            'symbol': symbol,
+            'orderId': order_id
+        }, priority=RequestPriority.EXIT)
@@ -0,0 +1,81 @@
+import json
+import time
+from typing import Callable, Iterable
+
+from apps.adapters.fixed_point import to_scaled
+from apps.adapters.tick import Tick
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class JsonDecoder:
+    """Разбор кадров потока @trade (в том числе в обёртке комбинированного потока) в Tick"""
+
+    name = 'json'
+    loads: Callable = staticmethod(json.loads)
+
+    def decode(self, message: str | bytes) -> Tick | None:
+        return self._tick(self.loads(message), time.monotonic())
+
+    def decode_batch(self, messages: Iterable[str | bytes]) -> list[Tick]:
+        """Разбор уже полученных кадров одним проходом с общим временем приёма"""
+        received = time.monotonic()
+        loads, make = self.loads, self._tick
+        ticks = []
+        for message in messages:
+            tick = make(loads(message), received)
+            if tick is not None:
+                ticks.append(tick)
+        return ticks
+
+    @staticmethod
+    def _tick(data: dict, received: float) -> Tick | None:
+        data = data.get('data', data)
+        if data.get('e') != 'trade':
+            return None
+        return Tick(
+            data['s'],
+            to_scaled(data['p']),
+            to_scaled(data['q']),
+            data['t'],
+            data['E'],
+            data['T'],
+            data['m'],
+            received
+        )
+
+    @staticmethod
+    def historical(symbol: str, trade: dict, received: float) -> Tick:
+        """Сделка из REST /api/v3/historicalTrades, время сделки служит и временем события"""
+        return Tick(
+            symbol,
+            to_scaled(trade['price']),
+            to_scaled(trade['qty']),
+            trade['id'],
+            trade['time'],
+            trade['time'],
+            trade['isBuyerMaker'],
+            received
+        )
+
+
+class OrjsonDecoder(JsonDecoder):
+    """Тот же разбор поверх orjson"""
+
+    name = 'orjson'
+    loads = staticmethod(orjson.loads) if orjson else None
+
+
+DECODERS = {decoder.name: decoder for decoder in (JsonDecoder, OrjsonDecoder) if decoder.loads}
+
+
+def get_decoder(name: str | None = None) -> JsonDecoder:
+    """Декодер по имени, по умолчанию самый быстрый из установленных"""
+    if name in (None, 'auto'):
+        name = 'orjson' if 'orjson' in DECODERS else 'json'
+    if name not in DECODERS:
+        raise ValueError(f"Декодер '{name}' недоступен, установлены: {', '.join(DECODERS)}")
+    return DECODERS[name]()
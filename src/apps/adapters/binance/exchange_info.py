@@ -0,0 +1,131 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+import urllib.parse
+from decimal import Decimal
+from logging import Logger
+
+import settings
+from apps.adapters.symbol_info import SymbolInfo
+
+
+def parse_symbol(data: dict) -> SymbolInfo:
+    """SymbolInfo из элемента symbols ответа /api/v3/exchangeInfo"""
+    filters = {f['filterType']: f for f in data.get('filters', [])}
+    price_filter = filters.get('PRICE_FILTER', {})
+    lot_size = filters.get('LOT_SIZE', {})
+    market_lot_size = filters.get('MARKET_LOT_SIZE', {})
+    # Старые пары используют MIN_NOTIONAL, новые - NOTIONAL с верхней границей
+    notional = filters.get('NOTIONAL') or filters.get('MIN_NOTIONAL', {})
+
+    def value(section: dict, key: str) -> Decimal:
+        return Decimal(section.get(key, '0'))
+
+    return SymbolInfo(
+        symbol=data['symbol'],
+        base_asset=data['baseAsset'],
+        quote_asset=data['quoteAsset'],
+        status=data.get('status', 'TRADING'),
+        tick_size=value(price_filter, 'tickSize'),
+        min_price=value(price_filter, 'minPrice'),
+        max_price=value(price_filter, 'maxPrice'),
+        step_size=value(lot_size, 'stepSize'),
+        min_qty=value(lot_size, 'minQty'),
+        max_qty=value(lot_size, 'maxQty'),
+        market_step_size=value(market_lot_size, 'stepSize'),
+        market_min_qty=value(market_lot_size, 'minQty'),
+        market_max_qty=value(market_lot_size, 'maxQty'),
+        min_notional=value(notional, 'minNotional'),
+        max_notional=value(notional, 'maxNotional'),
+    )
+
+
+class ExchangeInfoCache:
+    """Кеш exchangeInfo: один запрос на процесс, копия на диске с TTL и фоновое обновление
+
+    Копия на диске своя для каждого url биржи, чтобы testnet и mainnet не смешивались.
+    """
+
+    ttl = 3600
+    # Пауза перед повтором после неудачного обновления
+    retry_interval = 60
+
+    def __init__(self, api_client, logger: Logger, path: str | None = None):
+        self.api_client = api_client
+        self.logger = logger
+        host = urllib.parse.urlsplit(api_client.url).netloc.replace(':', '_')
+        digest = hashlib.sha1(api_client.url.encode()).hexdigest()[:8]
+        self.path = path or os.path.join(settings.CACHE_DIR, f"exchange_info_{host}_{digest}.json")
+        self.symbols: dict[str, SymbolInfo] = {}
+        self.fetched_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    def get(self, symbol: str) -> SymbolInfo | None:
+        return self.symbols.get(symbol)
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at if self.fetched_at is not None else float('inf')
+
+    async def load(self) -> dict[str, SymbolInfo]:
+        """Загрузка при первом обращении: с диска, если копия свежая, иначе с биржи"""
+        async with self._lock:
+            if self.fetched_at is None and not self._read():
+                await self._refresh()
+        return self.symbols
+
+    async def refresh(self):
+        async with self._lock:
+            await self._refresh()
+
+    async def run(self):
+        """Фоновое обновление по истечении TTL"""
+        while True:
+            await asyncio.sleep(max(self.ttl - self.age, 0) if self.fetched_at else self.retry_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                self.logger.error(f"Не удалось обновить exchangeInfo: {e}")
+                await asyncio.sleep(self.retry_interval)
+
+    async def _refresh(self):
+        data = await self.api_client.get_exchange_info()
+        symbols = data['symbols']
+        self._apply(symbols, time.time())
+        self._write(symbols)
+        self.logger.info(f"exchangeInfo обновлён: {len(self.symbols)} пар")
+
+    def _apply(self, symbols: list[dict], fetched_at: float):
+        self.symbols = {data['symbol']: parse_symbol(data) for data in symbols}
+        self.fetched_at = fetched_at
+
+    def _read(self) -> bool:
+        try:
+            with open(self.path) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if cached.get('url') != self.api_client.url or time.time() - cached.get('fetched_at', 0) >= self.ttl:
+            return False
+        self._apply(cached['symbols'], cached['fetched_at'])
+        self.logger.info(f"exchangeInfo загружен с диска: {len(self.symbols)} пар, возраст {self.age:.0f} с")
+        return True
+
+    def _write(self, symbols: list[dict]):
+        """Атомарная запись копии, от ответа остаются только нужные поля"""
+        fields = ('symbol', 'status', 'baseAsset', 'quoteAsset', 'filters')
+        cached = {
+            'url': self.api_client.url,
+            'fetched_at': self.fetched_at,
+            'symbols': [{key: data[key] for key in fields if key in data} for data in symbols],
+        }
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            temp = f"{self.path}.tmp"
+            with open(temp, 'w') as f:
+                json.dump(cached, f, separators=(',', ':'))
+            os.replace(temp, self.path)
+        except OSError as e:
+            self.logger.warning(f"Не удалось сохранить exchangeInfo в {self.path}: {e}")
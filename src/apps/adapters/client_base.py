@@ -3,10 +3,11 @@ from logging import Logger
 import aiohttp
 import hashlib
 import hmac
-import urllib.parse
 from abc import ABC, abstractmethod
 from decimal import Decimal
 
+from apps.adapters.scheduler import RequestScheduler
+from apps.adapters.symbol_info import SymbolInfo
 from base.enum import BaseEnum
 
 
@@ -20,23 +21,38 @@ class OrderType(BaseEnum):
     LIMIT = 'limit'
 
 
+class RequestSigner:
+    """HMAC-SHA256 с ключом, подготовленным один раз
+
+    hmac.new на каждый запрос заново дополняет ключ и хеширует его блоки;
+    здесь копируется уже готовое состояние, в которое дописывается запрос.
+    """
+
+    __slots__ = ('_mac',)
+
+    def __init__(self, secret: str | None):
+        self._mac = hmac.new((secret or '').encode(), digestmod=hashlib.sha256)
+
+    def sign(self, payload: str) -> str:
+        mac = self._mac.copy()
+        mac.update(payload.encode())
+        return mac.hexdigest()
+
+
 class APIClient(ABC):
     """Общий класс для описания API клиентов внешних бирж"""
     exchange: str
+    # Лимиты биржи: имя -> (ёмкость, окно в секундах)
+    rate_limits: dict[str, tuple[int, float]] = {}
 
     def __init__(self, logger: Logger):
         self.logger = logger
-        self.session = aiohttp.ClientSession()
+        self.session = self._create_session()
+        self.scheduler = RequestScheduler(self.rate_limits, logger)
 
-    @classmethod
-    def _generate_signature(cls, secret: str, params: dict) -> str:
-        """Генерация подписи для запросов"""
-        query = urllib.parse.urlencode(params, doseq=True)
-        return hmac.new(
-            key=secret.encode(),
-            msg=query.encode(),
-            digestmod=hashlib.sha256
-        ).hexdigest()
+    def _create_session(self) -> aiohttp.ClientSession:
+        """HTTP-сессия клиента, наследники настраивают пул соединений"""
+        return aiohttp.ClientSession()
 
     @classmethod
     def get_headers(cls, key: str) -> dict:
@@ -51,6 +67,10 @@ class APIClient(ABC):
             await self.session.close()
             self.logger.info("API client closed")
 
+    async def get_symbol_info(self, symbol: str) -> SymbolInfo | None:
+        """Параметры пары (активы, шаги, минимальный объём), если биржа их предоставляет"""
+        return None
+
     @abstractmethod
     async def new_order(self,
                         symbol: str,
@@ -58,6 +78,8 @@ class APIClient(ABC):
                         side: SideType,
                         quantity: Decimal,
                         price: Decimal = Decimal('0'),
+                        client_order_id: str | None = None,
+                        reference_price: Decimal | None = None
                         ) -> dict:
         """Размещает ордер с параметрами:
 
@@ -65,8 +87,9 @@ class APIClient(ABC):
         order_type - Тип ордера: лимитный, рыночный;
         side -Тип операции: buy, sell;
         quantity - Количество в базовой валюте
-        order_id - Клиентский номер заказа
-        price - Цена исполнения ордера, указывается для лимитных заявок
+        price - Цена исполнения ордера, указывается для лимитных заявок;
+        client_order_id - Клиентский номер заказа (newClientOrderId);
+        reference_price - Текущая цена для проверки минимального объёма рыночного ордера
         """
         pass
 
@@ -75,3 +98,6 @@ class APIClient(ABC):
 
     @abstractmethod
     async def get_order(self, order_id: str, symbol: str) -> dict: ...
+
+    @abstractmethod
+    async def cancel_order(self, order_id: str, symbol: str) -> dict: ...
@@ -0,0 +1,36 @@
+from decimal import Decimal, ROUND_CEILING, ROUND_FLOOR
+
+# Binance передаёт цены и объёмы строками с 8 знаками после точки: шаг цены
+# любой пары кратен 1e-8, поэтому целое в этих единицах точно для всех пар
+SCALE_DIGITS = 8
+SCALE = 10 ** SCALE_DIGITS
+_ONE = Decimal(SCALE)
+
+
+def to_scaled(value: str) -> int:
+    """Перевод десятичной строки Binance в целое с масштабом 1e8 без Decimal"""
+    if value[-SCALE_DIGITS - 1:-SCALE_DIGITS] == '.':
+        return int(value.replace('.', ''))
+    whole, _, frac = value.partition('.')
+    return int(whole + frac[:SCALE_DIGITS].ljust(SCALE_DIGITS, '0'))
+
+
+def from_scaled(value: int) -> str:
+    sign = '-' if value < 0 else ''
+    value = abs(value)
+    return f"{sign}{value // SCALE}.{value % SCALE:0{SCALE_DIGITS}d}"
+
+
+def to_decimal(value: int) -> Decimal:
+    """Decimal для границы с REST и логами, с 8 знаками, как в ответах биржи"""
+    return Decimal(value).scaleb(-SCALE_DIGITS)
+
+
+def floor_scaled(value: Decimal) -> int:
+    """Наибольшее целое в единицах 1e-8 не больше value: price <= value равносильно price <= floor"""
+    return int((value * _ONE).to_integral_value(ROUND_FLOOR))
+
+
+def ceil_scaled(value: Decimal) -> int:
+    """Наименьшее целое в единицах 1e-8 не меньше value: price >= value равносильно price >= ceil"""
+    return int((value * _ONE).to_integral_value(ROUND_CEILING))
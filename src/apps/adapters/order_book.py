@@ -0,0 +1,182 @@
+from array import array
+from bisect import bisect_left
+from typing import Callable
+
+from apps.adapters.fixed_point import to_scaled
+
+
+class BookSide:
+    """Уровни одной стороны стакана в отсортированных массивах int64
+
+    Ключ уровня - цена для бидов и минус цена для асков, так что лучший
+    уровень всегда последний: поиск уровня - bisect за O(log n), а частые
+    изменения у вершины стакана сдвигают только хвост массива.
+    """
+
+    __slots__ = ('sign', 'keys', 'quantities')
+
+    def __init__(self, bids: bool):
+        self.sign = 1 if bids else -1
+        self.keys = array('q')
+        self.quantities = array('q')
+
+    def __len__(self):
+        return len(self.keys)
+
+    def clear(self):
+        del self.keys[:]
+        del self.quantities[:]
+
+    def update(self, price: int, quantity: int):
+        """Новый объём уровня, 0 удаляет уровень"""
+        key = price * self.sign
+        keys = self.keys
+        i = bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            if quantity:
+                self.quantities[i] = quantity
+            else:
+                del keys[i]
+                del self.quantities[i]
+        elif quantity:
+            keys.insert(i, key)
+            self.quantities.insert(i, quantity)
+
+    def best(self) -> int | None:
+        return self.keys[-1] * self.sign if self.keys else None
+
+    def walk(self, quantity: int) -> tuple[int, int]:
+        """Исполнение quantity от лучшего уровня: (исполненный объём, стоимость в единицах 1e-16)"""
+        filled = cost = 0
+        for key, level in zip(reversed(self.keys), reversed(self.quantities)):
+            if level >= quantity - filled:
+                level = quantity - filled
+            filled += level
+            cost += level * key
+            if filled >= quantity:
+                break
+        return filled, cost * self.sign
+
+    def within(self, limit: int) -> int:
+        """Объём уровней не хуже цены limit"""
+        return sum(self.quantities[bisect_left(self.keys, limit * self.sign):])
+
+
+class OrderBook:
+    """Локальный стакан пары по REST-снимку и diff-событиям @depth
+
+    Цены и объёмы - целые с масштабом 1e8, как в Tick. Пока стакан не
+    синхронизирован, события копятся в pending; снимок применяется поверх
+    них по правилам Binance (lastUpdateId и U/u событий). Разрыв в u
+    сбрасывает стакан до новой синхронизации. Клиент потока вызывает notify
+    (observer) один раз на пачку применённых событий.
+    """
+
+    max_pending = 1000
+
+    def __init__(self, symbol: str, observer: Callable[[], None] | None = None):
+        self.symbol = symbol
+        self.observer = observer
+        self.bids = BookSide(bids=True)
+        self.asks = BookSide(bids=False)
+        self.update_id = 0
+        self.synced = False
+        self.pending: list[dict] = []
+        self.updates = 0
+        self.resyncs = 0
+
+    def reset(self):
+        self.bids.clear()
+        self.asks.clear()
+        self.update_id = 0
+        self.synced = False
+        self.pending.clear()
+
+    def buffer(self, event: dict):
+        """Событие до синхронизации; при переполнении старые события отбрасываются"""
+        self.pending.append(event)
+        if len(self.pending) > self.max_pending:
+            del self.pending[:len(self.pending) - self.max_pending]
+
+    def load_snapshot(self, snapshot: dict) -> bool:
+        """Снимок /api/v3/depth и накопленные события
+
+        False, если снимок старше первого накопленного события: его нужно запросить заново.
+        """
+        pending = self.pending
+        if pending and snapshot['lastUpdateId'] < pending[0]['U'] - 1:
+            return False
+
+        self.bids.clear()
+        self.asks.clear()
+        for price, quantity in snapshot['bids']:
+            self.bids.update(to_scaled(price), to_scaled(quantity))
+        for price, quantity in snapshot['asks']:
+            self.asks.update(to_scaled(price), to_scaled(quantity))
+        self.update_id = snapshot['lastUpdateId']
+        self.synced = True
+        self.pending = []
+        for event in pending:
+            if not self.apply(event):
+                return False
+        return True
+
+    def notify(self):
+        if self.observer:
+            self.observer()
+
+    def apply(self, event: dict) -> bool:
+        """Diff-событие; False при разрыве последовательности (стакан сброшен)"""
+        if event['u'] <= self.update_id:
+            return True
+        if event['U'] > self.update_id + 1:
+            self.reset()
+            self.resyncs += 1
+            return False
+
+        bids, asks = self.bids, self.asks
+        for price, quantity in event['b']:
+            bids.update(to_scaled(price), to_scaled(quantity))
+        for price, quantity in event['a']:
+            asks.update(to_scaled(price), to_scaled(quantity))
+        self.update_id = event['u']
+        self.updates += 1
+        return True
+
+    @property
+    def best_bid(self) -> int | None:
+        return self.bids.best()
+
+    @property
+    def best_ask(self) -> int | None:
+        return self.asks.best()
+
+    def expected_price(self, side: str, quantity: int) -> int | None:
+        """Средняя цена рыночного ордера на quantity по текущему стакану
+
+        Покупка идёт по аскам (цена округляется вверх), продажа по бидам (вниз).
+        None, если стакан не синхронизирован или глубины не хватает.
+        """
+        if not self.synced or quantity <= 0:
+            return None
+        buy = side.upper() == 'BUY'
+        filled, cost = (self.asks if buy else self.bids).walk(quantity)
+        if filled < quantity:
+            return None
+        return -(-cost // filled) if buy else cost // filled
+
+    def available(self, side: str, limit: int) -> int:
+        """Объём, который рыночный ордер исполнит не хуже цены limit"""
+        if not self.synced:
+            return 0
+        return (self.asks if side.upper() == 'BUY' else self.bids).within(limit)
+
+    def stats(self) -> dict:
+        return {
+            'synced': self.synced,
+            'update_id': self.update_id,
+            'bids': len(self.bids),
+            'asks': len(self.asks),
+            'updates': self.updates,
+            'resyncs': self.resyncs,
+        }
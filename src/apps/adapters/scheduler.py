@@ -0,0 +1,179 @@
+import asyncio
+import heapq
+import itertools
+import time
+from enum import IntEnum
+from logging import Logger
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class RequestPriority(IntEnum):
+    """Приоритет запроса: меньшее значение обслуживается раньше"""
+    EXIT = 0
+    ENTRY = 1
+    ACCOUNT = 2
+    # Восполнение рыночных данных: не должно задерживать ордера и сверку
+    MARKET_DATA = 3
+
+
+def order_priority(side: str) -> RequestPriority:
+    """Продажа закрывает позицию и идёт первой, покупка открывает новую"""
+    return RequestPriority.EXIT if side.upper() == 'SELL' else RequestPriority.ENTRY
+
+
+class TokenBucket:
+    """Лимит вида «capacity единиц за interval секунд» с равномерным пополнением"""
+
+    def __init__(self, capacity: int, interval: float):
+        self.capacity = capacity
+        self.interval = interval
+        self.rate = capacity / interval
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, cost: int, reserve: float, now: float) -> float:
+        """Сколько ждать, чтобы взять cost, не залезая в резерв старших приоритетов"""
+        self._refill(now)
+        missing = cost + self.capacity * reserve - self.tokens
+        return missing / self.rate if missing > 0 else 0.0
+
+    def take(self, cost: int):
+        self.tokens -= cost
+
+    def sync(self, used: int, now: float):
+        """Счётчик биржи из заголовков ответа учитывает и другие процессы с этого IP"""
+        self._refill(now)
+        self.tokens = min(self.tokens, float(self.capacity - used))
+
+
+class RequestScheduler:
+    """Очередь запросов к бирже с учётом лимитов и приоритетов
+
+    Запрос получает разрешение, когда во всех его лимитах хватает единиц;
+    ожидающие обслуживаются строго по приоритету, младшим приоритетам
+    недоступен резерв лимита, оставленный под выходы из позиций.
+    Одинаковые одновременные запросы на чтение схлопываются в один.
+    """
+
+    # Доля лимита, недоступная приоритету
+    reserves = {
+        RequestPriority.EXIT: 0.0,
+        RequestPriority.ENTRY: 0.05,
+        RequestPriority.ACCOUNT: 0.1,
+        RequestPriority.MARKET_DATA: 0.2,
+    }
+
+    def __init__(self, limits: dict[str, tuple[int, float]], logger: Logger):
+        self.buckets = {name: TokenBucket(capacity, interval) for name, (capacity, interval) in limits.items()}
+        self.logger = logger
+        self.blocked_until = 0.0
+        self.coalesced = 0
+        self.delayed = 0
+        self._waiters: list[tuple[int, int, dict[str, int], asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+
+    async def submit(self,
+                     func: Callable[[], Awaitable[Any]],
+                     priority: RequestPriority,
+                     costs: dict[str, int],
+                     key: Hashable | None = None) -> Any:
+        """Выполнить func после получения разрешения; key включает схлопывание"""
+        if key is None:
+            return await self._execute(func, priority, costs)
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._execute(func, priority, costs))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    async def _execute(self, func: Callable[[], Awaitable[Any]], priority: RequestPriority, costs: dict[str, int]):
+        await self.acquire(priority, costs)
+        return await func()
+
+    async def acquire(self, priority: RequestPriority, costs: dict[str, int]):
+        if not self._waiters and self._wait_time(priority, costs) == 0:
+            self._take(costs)
+            return
+
+        self.delayed += 1
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), costs, future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Отменённый запрос не должен задерживать очередь за собой
+            self._dispatch()
+            raise
+
+    def _wait_time(self, priority: RequestPriority, costs: dict[str, int]) -> float:
+        now = time.monotonic()
+        wait = max(0.0, self.blocked_until - now)
+        reserve = self.reserves.get(priority, 0.0)
+        for name, cost in costs.items():
+            bucket = self.buckets.get(name)
+            if bucket:
+                wait = max(wait, bucket.wait_time(cost, reserve, now))
+        return wait
+
+    def _take(self, costs: dict[str, int]):
+        for name, cost in costs.items():
+            bucket = self.buckets.get(name)
+            if bucket:
+                bucket.take(cost)
+
+    def _dispatch(self):
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._waiters:
+            priority, _, costs, future = self._waiters[0]
+            if future.done():
+                # Ожидание отменено вызывающей стороной
+                heapq.heappop(self._waiters)
+                continue
+            wait = self._wait_time(priority, costs)
+            if wait > 0:
+                self._timer = asyncio.get_running_loop().call_later(wait, self._dispatch)
+                return
+            heapq.heappop(self._waiters)
+            self._take(costs)
+            future.set_result(None)
+
+    def update_usage(self, used: dict[str, int]):
+        """Использованные единицы лимитов по данным биржи"""
+        now = time.monotonic()
+        for name, value in used.items():
+            bucket = self.buckets.get(name)
+            if bucket:
+                bucket.sync(value, now)
+
+    def block(self, seconds: float):
+        """Пауза всех запросов после 429/418 на время Retry-After"""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.logger.warning(f"Лимит запросов превышен, пауза {seconds:.1f} с")
+        if self._waiters:
+            self._dispatch()
+
+    def stats(self) -> dict:
+        return {
+            'queued': len(self._waiters),
+            'delayed': self.delayed,
+            'coalesced': self.coalesced,
+            'tokens': {name: int(bucket.tokens) for name, bucket in self.buckets.items()},
+        }
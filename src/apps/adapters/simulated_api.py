@@ -0,0 +1,76 @@
+import asyncio
+from decimal import Decimal
+from logging import Logger
+from typing import Callable
+
+from apps.adapters.client_base import APIClient
+from apps.mock.exchange import FakeExchange
+
+
+class SimulatedAPIClient(APIClient):
+    """Симулятор биржи для прогона TradeManager на записанных тиках
+
+    Рыночные ордера исполняются мгновенно по последней воспроизведённой цене,
+    балансы ведутся локально, время берётся из часов текущего event loop.
+    """
+
+    exchange = 'Simulated'
+
+    def __init__(self,
+                 logger: Logger,
+                 balances: dict[str, Decimal],
+                 commission: Decimal = Decimal('0'),
+                 quote_asset: str = 'USDT',
+                 on_fill: Callable[[dict], None] | None = None):
+        # HTTP-сессия симулятору не нужна
+        self.logger = logger
+        self.session = None
+        self.on_fill = on_fill
+        self.market = FakeExchange(
+            balances=balances,
+            commission=commission,
+            quote_asset=quote_asset,
+            clock=lambda: asyncio.get_running_loop().time()
+        )
+
+    def __str__(self):
+        return f'SimulatedAPIClient({dict(self.balances)})'
+
+    @property
+    def balances(self) -> dict[str, Decimal]:
+        return self.market.balances
+
+    @property
+    def prices(self) -> dict[str, Decimal]:
+        return self.market.prices
+
+    def set_price(self, symbol: str, price: Decimal):
+        self.market.set_price(symbol, price)
+
+    async def close(self):
+        pass
+
+    async def new_order(self,
+                        symbol: str,
+                        order_type: str,
+                        side: str,
+                        quantity: Decimal,
+                        price: Decimal = Decimal('0'),
+                        client_order_id: str | None = None,
+                        reference_price: Decimal | None = None) -> dict:
+        order = self.market.place_market_order(symbol, side, quantity, client_order_id or '')
+        if self.on_fill:
+            self.on_fill(order)
+        return order
+
+    async def get_ping_response(self):
+        return {}
+
+    async def get_balances(self) -> dict[str, str]:
+        return {asset: str(free) for asset, free in self.balances.items() if free > 0}
+
+    async def get_order(self, order_id: str, symbol: str) -> dict:
+        return self.market.get_order(symbol, int(order_id))
+
+    async def cancel_order(self, order_id: str, symbol: str) -> dict:
+        return self.market.cancel_order(symbol, int(order_id))
@@ -0,0 +1,117 @@
+from decimal import Decimal, ROUND_DOWN, ROUND_UP
+from typing import Callable
+
+
+class OrderRejected(Exception):
+    """Ордер не проходит фильтры пары и отклонён локально, без запроса к бирже"""
+
+    def __init__(self, symbol: str, reason: str):
+        super().__init__(f"{symbol}: {reason}")
+        self.symbol = symbol
+        self.reason = reason
+
+
+def make_quantizer(step: Decimal, rounding: str = ROUND_DOWN) -> Callable[[Decimal], Decimal]:
+    """Округление к шагу, подготовленное один раз: для шага 10^n - Decimal.quantize"""
+    if not step:
+        return lambda value: value
+    step = step.normalize()
+    if step == Decimal(1).scaleb(step.adjusted()):
+        return lambda value: value.quantize(step, rounding)
+    return lambda value: (value / step).to_integral_value(rounding) * step
+
+
+class SymbolInfo:
+    """Параметры торговой пары и проверка ордера по фильтрам биржи
+
+    Нулевое значение ограничения означает его отсутствие.
+    """
+
+    __slots__ = (
+        'symbol', 'base_asset', 'quote_asset', 'status',
+        'tick_size', 'min_price', 'max_price',
+        'step_size', 'min_qty', 'max_qty',
+        'market_step_size', 'market_min_qty', 'market_max_qty',
+        'min_notional', 'max_notional',
+        'floor_quantity', 'floor_market_quantity', 'floor_price', 'ceil_price',
+    )
+
+    def __init__(self,
+                 symbol: str,
+                 base_asset: str,
+                 quote_asset: str,
+                 status: str = 'TRADING',
+                 tick_size: Decimal = Decimal('0'),
+                 min_price: Decimal = Decimal('0'),
+                 max_price: Decimal = Decimal('0'),
+                 step_size: Decimal = Decimal('0'),
+                 min_qty: Decimal = Decimal('0'),
+                 max_qty: Decimal = Decimal('0'),
+                 market_step_size: Decimal | None = None,
+                 market_min_qty: Decimal | None = None,
+                 market_max_qty: Decimal | None = None,
+                 min_notional: Decimal = Decimal('0'),
+                 max_notional: Decimal = Decimal('0')):
+        self.symbol = symbol
+        self.base_asset = base_asset
+        self.quote_asset = quote_asset
+        self.status = status
+        self.tick_size = tick_size
+        self.min_price = min_price
+        self.max_price = max_price
+        self.step_size = step_size
+        self.min_qty = min_qty
+        self.max_qty = max_qty
+        # MARKET_LOT_SIZE с нулевым шагом на Binance означает «как в LOT_SIZE»
+        self.market_step_size = market_step_size or step_size
+        self.market_min_qty = market_min_qty or min_qty
+        self.market_max_qty = market_max_qty or max_qty
+        self.min_notional = min_notional
+        self.max_notional = max_notional
+
+        self.floor_quantity = make_quantizer(self.step_size)
+        self.floor_market_quantity = make_quantizer(self.market_step_size)
+        self.floor_price = make_quantizer(tick_size)
+        self.ceil_price = make_quantizer(tick_size, ROUND_UP)
+
+    def __repr__(self):
+        return (f'SymbolInfo({self.symbol} {self.base_asset}/{self.quote_asset} step={self.step_size} '
+                f'tick={self.tick_size} min_notional={self.min_notional})')
+
+    def prepare_order(self,
+                      side: str,
+                      quantity: Decimal,
+                      price: Decimal = Decimal('0'),
+                      reference_price: Decimal | None = None) -> tuple[Decimal, Decimal]:
+        """Округлить количество и цену к шагам пары и проверить фильтры
+
+        price задаётся для лимитных ордеров (покупка округляется вниз, продажа вверх),
+        для рыночных ордеров минимальный объём проверяется по reference_price.
+        Возвращает (количество, цена), при нарушении фильтров - OrderRejected.
+        """
+        if self.status != 'TRADING':
+            raise OrderRejected(self.symbol, f"торги остановлены ({self.status})")
+
+        if price:
+            price = self.floor_price(price) if side.upper() == 'BUY' else self.ceil_price(price)
+            if price <= 0 or price < self.min_price or (self.max_price and price > self.max_price):
+                raise OrderRejected(self.symbol, f"цена {price} вне PRICE_FILTER")
+            quantity = self.floor_quantity(quantity)
+            min_qty, max_qty = self.min_qty, self.max_qty
+        else:
+            quantity = self.floor_market_quantity(quantity)
+            min_qty, max_qty = self.market_min_qty, self.market_max_qty
+
+        if quantity <= 0 or quantity < min_qty:
+            raise OrderRejected(self.symbol, f"количество {quantity} меньше минимального {min_qty}")
+        if max_qty and quantity > max_qty:
+            raise OrderRejected(self.symbol, f"количество {quantity} больше максимального {max_qty}")
+
+        notional_price = price or reference_price
+        if notional_price:
+            notional = quantity * notional_price
+            if notional < self.min_notional:
+                raise OrderRejected(self.symbol, f"объём {notional:.8f} меньше минимального {self.min_notional}")
+            if self.max_notional and notional > self.max_notional:
+                raise OrderRejected(self.symbol, f"объём {notional:.8f} больше максимального {self.max_notional}")
+        return quantity, price
@@ -0,0 +1,45 @@
+from decimal import Decimal
+
+from apps.adapters.fixed_point import to_decimal
+
+
+class Tick:
+    """Сделка из потока биржи, разобранная один раз
+
+    fixed_price/fixed_qty - целые с масштабом 1e8 (apps.adapters.fixed_point),
+    Decimal строится только по запросу price/qty. event_time/trade_time -
+    время биржи в мс, received - time.monotonic() приёма.
+    """
+
+    __slots__ = ('symbol', 'fixed_price', 'fixed_qty', 'trade_id', 'event_time', 'trade_time', 'buyer_maker',
+                 'received')
+
+    def __init__(self,
+                 symbol: str,
+                 fixed_price: int,
+                 fixed_qty: int,
+                 trade_id: int,
+                 event_time: int,
+                 trade_time: int,
+                 buyer_maker: bool,
+                 received: float = 0.0):
+        self.symbol = symbol
+        self.fixed_price = fixed_price
+        self.fixed_qty = fixed_qty
+        self.trade_id = trade_id
+        self.event_time = event_time
+        self.trade_time = trade_time
+        self.buyer_maker = buyer_maker
+        self.received = received
+
+    @property
+    def price(self) -> Decimal:
+        return to_decimal(self.fixed_price)
+
+    @property
+    def qty(self) -> Decimal:
+        return to_decimal(self.fixed_qty)
+
+    def __repr__(self):
+        return (f'Tick({self.symbol} #{self.trade_id} price={self.price} qty={self.qty} '
+                f'E={self.event_time} T={self.trade_time} m={self.buyer_maker})')
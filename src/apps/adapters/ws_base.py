@@ -1,4 +1,7 @@
 import asyncio
+import random
+import time
+from collections import deque
 import websockets
 import ssl
 from logging import Logger
@@ -7,6 +10,11 @@ from abc import ABC, abstractmethod
 
 class BaseWSClient(ABC):
     name: str = NotImplemented
+    # Экспоненциальная задержка переподключения с полным джиттером
+    reconnect_delay: float = 1.0
+    max_reconnect_delay: float = 60.0
+    # Binance разрывает соединение через 24 часа, переподключаемся заранее
+    max_session: float = 23 * 3600
 
     def __init__(self, url: str, logger: Logger):
         self.logger = logger
@@ -14,24 +22,96 @@ class BaseWSClient(ABC):
         self._ws = None
         self._connected = asyncio.Event()
         self._running = False
+        self.reconnects = 0
+        self.rotations = 0
+        self.last_reconnect_time = 0.0
+        self.downtime = 0.0
+        self._disconnected_at: float | None = None
 
     async def connect(self, queue: asyncio.Queue):
+        """Чтение потока в queue с переподключением до вызова close()"""
         self.logger.info(f"[{self.name}] Start connection.")
+        self._running = True
+        attempt = 0
+        while self._running:
+            session = None
+            rotated = False
+            try:
+                await self.before_connect()
+                async with websockets.connect(self.url) as self._ws:
+                    self._connected.set()
+                    attempt = 0
+                    self._mark_connected()
+                    await self.on_connect()
+                    # Разнесённая ротация, чтобы шарды не переподключались одновременно
+                    async with asyncio.timeout(self.max_session * random.uniform(0.95, 1.0)) as session:
+                        await self._consume(queue)
+            except TimeoutError as e:
+                rotated = session is not None and session.expired()
+                if not rotated:
+                    await self.on_error(e)
+            except Exception as e:
+                await self.on_error(e)
+            finally:
+                if self._connected.is_set():
+                    self._connected.clear()
+                    self._disconnected_at = time.monotonic()
+                    await self.on_disconnect()
+
+            if not self._running:
+                break
+            if rotated:
+                self.rotations += 1
+                self.logger.info(f"[{self.name}] Плановое переподключение после {self.max_session / 3600:.0f} ч")
+                continue
+            delay = random.uniform(0, min(self.max_reconnect_delay, self.reconnect_delay * 2 ** attempt))
+            attempt += 1
+            self.logger.warning(f"[{self.name}] Переподключение через {delay:.1f} с (попытка {attempt})")
+            await asyncio.sleep(delay)
+
+    def _mark_connected(self):
+        if self._disconnected_at is not None:
+            self.reconnects += 1
+            self.last_reconnect_time = time.monotonic() - self._disconnected_at
+            self.downtime += self.last_reconnect_time
+            self.logger.info(f"[{self.name}] Reconnected in {self.last_reconnect_time:.2f} s")
+        self._disconnected_at = None
+
+    def stats(self) -> dict:
+        return {
+            'reconnects': self.reconnects,
+            'rotations': self.rotations,
+            'last_reconnect_s': round(self.last_reconnect_time, 3),
+            'downtime_s': round(self.downtime, 3),
+        }
+
+    async def _consume(self, queue: asyncio.Queue):
+        """Чтение кадров в буфер и разбор накопившихся кадров пачкой"""
+        inbox = deque()
+        arrived = asyncio.Event()
+        reader = asyncio.create_task(self._receive(inbox, arrived))
         try:
-            async with websockets.connect(self.url) as self._ws:
-                self._connected.set()
-                await self.on_connect()
-                async for message in self._ws:
-                    price = await self.on_message(message)
-                    if price:
-                        await queue.put(price)
-        except Exception as e:
-            await self.on_error(e)
+            while True:
+                await arrived.wait()
+                arrived.clear()
+                if inbox:
+                    batch = list(inbox)
+                    inbox.clear()
+                    for result in await self.on_messages(batch):
+                        await queue.put(result)
+                if reader.done():
+                    # Пробрасываем ошибку соединения или выходим при закрытии
+                    return reader.result()
         finally:
-            if self._ws and not self._ws.close:
-                await self._ws.close()
-                await self.on_disconnect()
-                self.logger.info("WebSocket client closed")
+            reader.cancel()
+
+    async def _receive(self, inbox: deque, arrived: asyncio.Event):
+        try:
+            async for message in self._ws:
+                inbox.append(message)
+                arrived.set()
+        finally:
+            arrived.set()
 
     async def listen(self):
         try:
@@ -40,15 +120,24 @@ class BaseWSClient(ABC):
         except Exception as e:
             await self.on_error(e)
 
+    async def wait_connected(self):
+        await self._connected.wait()
+
     async def send(self, message: str):
         await self._connected.wait()
         await self._ws.send(message)
 
     async def close(self):
+        self._running = False
         if self._ws:
             await self._ws.close()
             self.logger.info(f"[{self.name}] Closed by user.")
-        await self.on_disconnect()
+        if self._connected.is_set():
+            self._connected.clear()
+            await self.on_disconnect()
+
+    async def before_connect(self):
+        """Подготовка перед каждым подключением, например получение url"""
 
     @abstractmethod
     async def on_connect(self) -> 'BaseWSClient':
@@ -58,6 +147,15 @@ class BaseWSClient(ABC):
     async def on_message(self, message: str) -> str:
         ...
 
+    async def on_messages(self, messages: list[str]) -> list:
+        """Разбор пачки кадров, по умолчанию по одному через on_message"""
+        results = []
+        for message in messages:
+            result = await self.on_message(message)
+            if result:
+                results.append(result)
+        return results
+
     @abstractmethod
     async def on_disconnect(self) -> 'BaseWSClient':
         ...
@@ -0,0 +1,144 @@
+import time
+from collections import defaultdict
+from decimal import Decimal
+from typing import Callable
+
+
+class FakeExchangeError(Exception):
+    """Ошибка в формате Binance: код и текст"""
+
+    def __init__(self, code: int, msg: str):
+        super().__init__(msg)
+        self.code = code
+        self.msg = msg
+
+
+class FakeExchange:
+    """Упрощённая спотовая биржа: рыночные ордера исполняются по последней цене
+
+    Общее ядро симулятора бэктеста и локального мок-сервера. Подписчики
+    получают события user data stream в формате Binance.
+    """
+
+    def __init__(self,
+                 balances: dict[str, Decimal],
+                 commission: Decimal = Decimal('0'),
+                 quote_asset: str = 'USDT',
+                 clock: Callable[[], float] = time.time):
+        self.balances: defaultdict[str, Decimal] = defaultdict(Decimal, balances)
+        self.commission = commission
+        self.quote_asset = quote_asset
+        self.clock = clock
+        self.prices: dict[str, Decimal] = {}
+        self.orders: dict[int, dict] = {}
+        self.listeners: list[Callable[[dict], None]] = []
+        self._order_id = 0
+
+    def now_ms(self) -> int:
+        return int(self.clock() * 1000)
+
+    def set_price(self, symbol: str, price: Decimal):
+        self.prices[symbol] = price
+
+    def base_asset(self, symbol: str) -> str:
+        return symbol.removesuffix(self.quote_asset)
+
+    def place_market_order(self, symbol: str, side: str, quantity: Decimal, client_order_id: str = '') -> dict:
+        if symbol not in self.prices:
+            raise FakeExchangeError(-1121, "Invalid symbol.")
+
+        fill_price = self.prices[symbol]
+        quantity = Decimal(quantity)
+        if quantity <= 0:
+            raise FakeExchangeError(-1013, "Invalid quantity.")
+        quote_qty = quantity * fill_price
+        base_asset = self.base_asset(symbol)
+        side = side.upper()
+
+        # Комиссия списывается в получаемом активе, как на Binance
+        if side == 'BUY':
+            if self.balances[self.quote_asset] < quote_qty:
+                raise FakeExchangeError(-2010, "Account has insufficient balance for requested action.")
+            commission, commission_asset = quantity * self.commission, base_asset
+            self.balances[self.quote_asset] -= quote_qty
+            self.balances[base_asset] += quantity - commission
+        elif side == 'SELL':
+            if self.balances[base_asset] < quantity:
+                raise FakeExchangeError(-2010, "Account has insufficient balance for requested action.")
+            commission, commission_asset = quote_qty * self.commission, self.quote_asset
+            self.balances[base_asset] -= quantity
+            self.balances[self.quote_asset] += quote_qty - commission
+        else:
+            raise FakeExchangeError(-1100, f"Illegal side '{side}'.")
+
+        self._order_id += 1
+        now = self.now_ms()
+        order = {
+            'symbol': symbol,
+            'orderId': self._order_id,
+            'clientOrderId': client_order_id or f'fake-{self._order_id}',
+            'transactTime': now,
+            'price': '0',
+            'origQty': str(quantity),
+            'executedQty': str(quantity),
+            'cummulativeQuoteQty': str(quote_qty),
+            'status': 'FILLED',
+            'type': 'MARKET',
+            'side': side,
+            'fills': [{
+                'price': str(fill_price),
+                'qty': str(quantity),
+                'commission': str(commission),
+                'commissionAsset': commission_asset
+            }]
+        }
+        self.orders[self._order_id] = order
+        self._publish_fill(order, now)
+        return order
+
+    def get_order(self, symbol: str, order_id: int) -> dict:
+        order = self.orders.get(int(order_id))
+        if order is None or order['symbol'] != symbol:
+            raise FakeExchangeError(-2013, "Order does not exist.")
+        return {key: value for key, value in order.items() if key != 'fills'}
+
+    def cancel_order(self, symbol: str, order_id: int) -> dict:
+        order = self.get_order(symbol, order_id)
+        # Рыночные ордера исполняются сразу, отменять нечего
+        raise FakeExchangeError(-2011, f"Unknown order sent. Order {order['orderId']} is {order['status']}.")
+
+    def account(self) -> dict:
+        return {
+            'canTrade': True,
+            'updateTime': self.now_ms(),
+            'balances': [
+                {'asset': asset, 'free': str(free), 'locked': '0'}
+                for asset, free in self.balances.items()
+            ]
+        }
+
+    def _publish_fill(self, order: dict, now: int):
+        if not self.listeners:
+            return
+
+        fill = order['fills'][0]
+        base_asset = self.base_asset(order['symbol'])
+        events = [
+            {
+                'e': 'executionReport', 'E': now, 's': order['symbol'], 'c': order['clientOrderId'],
+                'S': order['side'], 'o': 'MARKET', 'q': order['origQty'], 'x': 'TRADE', 'X': 'FILLED',
+                'i': order['orderId'], 'l': fill['qty'], 'z': order['executedQty'], 'L': fill['price'],
+                'n': fill['commission'], 'N': fill['commissionAsset'], 'T': now,
+                'Z': order['cummulativeQuoteQty'], 'Y': order['cummulativeQuoteQty']
+            },
+            {
+                'e': 'outboundAccountPosition', 'E': now, 'u': now,
+                'B': [
+                    {'a': asset, 'f': str(self.balances[asset]), 'l': '0'}
+                    for asset in (base_asset, self.quote_asset)
+                ]
+            }
+        ]
+        for listener in self.listeners:
+            for event in events:
+                listener(event)
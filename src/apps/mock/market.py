@@ -0,0 +1,204 @@
+import asyncio
+import json
+import random
+import time
+from collections import deque
+from decimal import Decimal
+from itertools import islice
+from typing import Callable, Iterable, Iterator
+
+from apps.adapters.fixed_point import from_scaled
+from apps.mock.exchange import FakeExchange
+
+
+class TickGenerator:
+    """Поток сделок для мок-сервера: случайное блуждание или повтор записанных сделок
+
+    Каждая пара получает rate сделок в секунду. Сделки выдаются пачками раз в
+    interval секунд, цена исполнения ордеров в FakeExchange следует за потоком.
+    Кадр сериализуется один раз на сделку и формат (одиночный /ws или
+    комбинированный /stream). Последние history сделок пары доступны для
+    /api/v3/historicalTrades. Для пар, у которых запрошен стакан, вокруг
+    последней цены ведётся синтетический стакан с diff-событиями @depth.
+    """
+
+    interval = 0.01
+    depth_levels = 20
+    depth_tick = 0.01
+
+    def __init__(self,
+                 exchange: FakeExchange,
+                 rate: float = 10,
+                 volatility: float = 0.0002,
+                 source: Iterable[tuple[int, int]] | None = None,
+                 history: int = 10000,
+                 seed: int | None = None):
+        self.exchange = exchange
+        self.rate = rate
+        self.volatility = volatility
+        # Записанные сделки (цена, объём) целыми с масштабом 1e8, по кругу для каждой пары
+        self.source = list(source) if source is not None else None
+        self.history: dict[str, deque[dict]] = {}
+        self.history_size = history
+        self.random = random.Random(seed)
+        self.subscribers: dict[str, list[Callable[[str], None]]] = {}
+        self.combined: dict[str, list[Callable[[str], None]]] = {}
+        self.depth_subscribers: dict[str, list[Callable[[str], None]]] = {}
+        self.books: dict[str, dict] = {}
+        self.emitted = 0
+        self._trade_ids: dict[str, int] = {}
+        self._prices: dict[str, float] = {}
+        self._replay: dict[str, Iterator[tuple[int, int]]] = {}
+
+    def subscribe(self, symbol: str, callback: Callable[[str], None], combined: bool = False):
+        (self.combined if combined else self.subscribers).setdefault(symbol.upper(), []).append(callback)
+
+    def unsubscribe(self, symbol: str, callback: Callable[[str], None], combined: bool = False):
+        callbacks = (self.combined if combined else self.subscribers).get(symbol.upper(), [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+    def subscribe_depth(self, symbol: str, callback: Callable[[str], None]):
+        self.depth_subscribers.setdefault(symbol.upper(), []).append(callback)
+
+    def unsubscribe_depth(self, symbol: str, callback: Callable[[str], None]):
+        callbacks = self.depth_subscribers.get(symbol.upper(), [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+    def depth(self, symbol: str, limit: int = 100) -> dict:
+        """Снимок стакана в формате REST /api/v3/depth"""
+        book = self.books.get(symbol)
+        if book is None:
+            book = self.books[symbol] = {'id': 1, 'bids': {}, 'asks': {}}
+            self._update_book(symbol, float(self.exchange.prices[symbol]))
+        bids = sorted(book['bids'].items(), key=lambda level: -float(level[0]))
+        asks = sorted(book['asks'].items(), key=lambda level: float(level[0]))
+        return {
+            'lastUpdateId': book['id'],
+            'bids': [list(level) for level in bids[:limit]],
+            'asks': [list(level) for level in asks[:limit]],
+        }
+
+    def historical(self, symbol: str, from_id: int | None = None, limit: int = 500) -> list[dict]:
+        """Сделки в формате REST historicalTrades начиная с from_id"""
+        trades = self.history.get(symbol)
+        if not trades:
+            return []
+        if from_id is None:
+            return list(trades)[-limit:]
+        # id в истории идут подряд, начало находится без перебора
+        start = max(from_id - trades[0]['id'], 0)
+        return list(islice(trades, start, start + limit))
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        budget = 0.0
+        last = loop.time()
+        while True:
+            await asyncio.sleep(self.interval)
+            now = loop.time()
+            budget += (now - last) * self.rate
+            last = now
+            count = int(budget)
+            budget -= count
+            if count:
+                self.emit(count)
+
+    def emit(self, count: int):
+        """Выдать count сделок по каждой паре"""
+        event_time = int(time.time() * 1000)
+        for symbol in self.exchange.prices:
+            for _ in range(count):
+                self._publish(symbol, self._next_trade(symbol, event_time))
+            if symbol in self.books or self.depth_subscribers.get(symbol):
+                self._publish_depth(symbol, event_time)
+
+    def _next_trade(self, symbol: str, event_time: int) -> dict:
+        trade_id = self._trade_ids.get(symbol, 0) + 1
+        self._trade_ids[symbol] = trade_id
+        if self.source:
+            replay = self._replay.get(symbol)
+            if replay is None:
+                replay = self._replay[symbol] = self._cycle()
+            price, qty = next(replay)
+            price, qty = from_scaled(price), from_scaled(qty)
+        else:
+            current = self._prices.get(symbol) or float(self.exchange.prices[symbol])
+            current *= 1 + self.random.gauss(0, self.volatility)
+            self._prices[symbol] = current
+            price, qty = f"{current:.2f}000000", f"{self.random.random() / 100:.8f}"
+        self.exchange.set_price(symbol, Decimal(price))
+        return {'e': 'trade', 'E': event_time, 's': symbol, 't': trade_id, 'p': price, 'q': qty,
+                'T': event_time, 'm': self.random.random() < 0.5, 'M': True}
+
+    def _update_book(self, symbol: str, price: float) -> tuple[list, list]:
+        """Уровни вокруг price с шагом depth_tick; изменения уровней в формате diff-события"""
+        book = self.books[symbol]
+        changes = []
+        for side, sign in (('bids', -1), ('asks', 1)):
+            levels = book[side]
+            # Ближайший уровень каждой стороны не пересекает цену сделки
+            start = round(price / self.depth_tick) + sign
+            target = {}
+            for k in range(self.depth_levels):
+                level = f"{(start + sign * k) * self.depth_tick:.8f}"
+                qty = levels.get(level)
+                target[level] = qty if qty and self.random.random() < 0.8 else f"{self.random.random() / 2:.8f}"
+            diff = [[level, qty] for level, qty in target.items() if levels.get(level) != qty]
+            diff += [[level, '0.00000000'] for level in levels if level not in target]
+            book[side] = target
+            changes.append(diff)
+        return changes[0], changes[1]
+
+    def _publish_depth(self, symbol: str, event_time: int):
+        book = self.books.get(symbol)
+        if book is None:
+            book = self.books[symbol] = {'id': 0, 'bids': {}, 'asks': {}}
+        bids, asks = self._update_book(symbol, float(self.exchange.prices[symbol]))
+        first = book['id'] + 1
+        book['id'] = first
+        subscribers = self.depth_subscribers.get(symbol)
+        if subscribers:
+            event = {'e': 'depthUpdate', 'E': event_time, 's': symbol, 'U': first, 'u': first, 'b': bids, 'a': asks}
+            frame = json.dumps({'stream': f"{symbol.lower()}@depth@100ms", 'data': event})
+            for callback in subscribers:
+                callback(frame)
+
+    def _cycle(self) -> Iterator[tuple[int, int]]:
+        while True:
+            yield from self.source
+
+    def _publish(self, symbol: str, trade: dict):
+        history = self.history.get(symbol)
+        if history is None:
+            history = self.history[symbol] = deque(maxlen=self.history_size)
+        history.append({'id': trade['t'], 'price': trade['p'], 'qty': trade['q'],
+                        'time': trade['T'], 'isBuyerMaker': trade['m'], 'isBestMatch': True})
+        self.emitted += 1
+
+        subscribers = self.subscribers.get(symbol)
+        if subscribers:
+            frame = json.dumps(trade)
+            for callback in subscribers:
+                callback(frame)
+        combined = self.combined.get(symbol)
+        if combined:
+            frame = json.dumps({'stream': f"{symbol.lower()}@trade", 'data': trade})
+            for callback in combined:
+                callback(frame)
+
+    def stats(self) -> dict:
+        return {
+            'symbols': len(self.exchange.prices),
+            'rate': self.rate,
+            'emitted': self.emitted,
+            'books': len(self.books),
+        }
+
+
+def load_replay(path: str) -> list[tuple[int, int]]:
+    """Цены и объёмы из CSV формата Binance public data для повтора"""
+    from apps.services.backtest import load_csv_ticks
+
+    return [(tick.fixed_price, tick.fixed_qty) for tick in load_csv_ticks(path, '')]
@@ -0,0 +1,393 @@
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import secrets
+import time
+import urllib.parse
+from decimal import Decimal
+
+from aiohttp import web
+
+from apps.mock.exchange import FakeExchange, FakeExchangeError
+from apps.mock.market import TickGenerator, load_replay
+
+
+class MockBinanceServer:
+    """Локальная замена Binance Spot REST API, WebSocket API и потоков поверх FakeExchange
+
+    Позволяет прогонять бота и проверять учёт балансов без testnet:
+    BINANCE_API_URL=http://127.0.0.1:<port>, BINANCE_WS_URL=ws://127.0.0.1:<port>/ws,
+    BINANCE_WS_API_URL=ws://127.0.0.1:<port>/ws-api/v3. С market потоки сделок
+    /ws/<symbol>@trade и /stream?streams=... получают сделки TickGenerator.
+    """
+
+    # Вес запросов как на бирже; остальные стоят 1
+    weights = {
+        ('GET', '/api/v3/account'): 20,
+        ('GET', '/api/v3/order'): 4,
+        ('GET', '/api/v3/exchangeInfo'): 20,
+        ('GET', '/api/v3/historicalTrades'): 25,
+        ('GET', '/api/v3/depth'): 50,
+        ('POST', '/api/v3/userDataStream'): 2,
+        ('PUT', '/api/v3/userDataStream'): 2,
+        'exchangeInfo': 20,
+        'trades.historical': 25,
+        'depth': 50,
+        'account.status': 20,
+        'order.status': 4,
+        'userDataStream.start': 2,
+        'userDataStream.ping': 2,
+    }
+
+    def __init__(self,
+                 exchange: FakeExchange,
+                 logger: logging.Logger,
+                 api_secret: str | None = None,
+                 market: TickGenerator | None = None):
+        self.exchange = exchange
+        self.market = market
+        self.logger = logger
+        self.api_secret = api_secret
+        self.listen_keys: set[str] = set()
+        self.requests = 0
+        self.used_weight = 0
+        self._weight_minute = 0
+
+    def make_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._errors])
+        app.add_routes([
+            web.get('/api/v3/ping', self.ping),
+            web.get('/api/v3/time', self.server_time),
+            web.get('/api/v3/exchangeInfo', self.exchange_info),
+            web.get('/api/v3/historicalTrades', self.historical_trades),
+            web.get('/api/v3/depth', self.depth),
+            web.get('/api/v3/account', self.account),
+            web.post('/api/v3/order', self.new_order),
+            web.get('/api/v3/order', self.get_order),
+            web.delete('/api/v3/order', self.cancel_order),
+            web.post('/api/v3/userDataStream', self.create_listen_key),
+            web.put('/api/v3/userDataStream', self.keepalive_listen_key),
+            web.get('/ws/{listen_key}', self.user_data_stream),
+            web.get('/stream', self.combined_stream),
+            web.get('/ws-api/v3', self.ws_api),
+        ])
+        return app
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> web.AppRunner:
+        runner = web.AppRunner(self.make_app())
+        await runner.setup()
+        site = web.TCPSite(runner, host, port)
+        await site.start()
+        self.logger.info(f"Mock Binance listening on {', '.join(map(str, runner.addresses))}")
+        return runner
+
+    @web.middleware
+    async def _errors(self, request: web.Request, handler):
+        self.requests += 1
+        used = self._use_weight(self.weights.get((request.method, request.path), 1))
+        try:
+            response = await handler(request)
+        except FakeExchangeError as e:
+            response = web.json_response({'code': e.code, 'msg': e.msg}, status=400)
+        if not response.prepared:
+            response.headers['X-MBX-USED-WEIGHT-1M'] = str(used)
+        return response
+
+    def _use_weight(self, weight: int) -> int:
+        """Счётчик веса в окне текущей минуты, как REQUEST_WEIGHT 1M на бирже"""
+        minute = int(time.time() // 60)
+        if minute != self._weight_minute:
+            self._weight_minute = minute
+            self.used_weight = 0
+        self.used_weight += weight
+        return self.used_weight
+
+    async def _params(self, request: web.Request, signed: bool = True) -> dict:
+        params = dict(request.query)
+        if request.can_read_body:
+            params.update(await request.post())
+        if signed:
+            self._check_signature(request)
+            self._check_timestamp(params)
+        return params
+
+    def _check_signature(self, request: web.Request):
+        payload, _, signature = request.query_string.rpartition('&signature=')
+        self._verify(payload, signature)
+
+    def _check_timestamp(self, params: dict):
+        """Окно recvWindow, как на бирже: запрос из будущего больше чем на 1 с или старше окна отклоняется"""
+        if 'timestamp' not in params:
+            return
+        timestamp, now = int(params['timestamp']), self.exchange.now_ms()
+        if timestamp > now + 1000 or now - timestamp > int(params.get('recvWindow', 5000)):
+            raise FakeExchangeError(-1021, "Timestamp for this request is outside of the recvWindow.")
+
+    def _verify(self, payload: str, signature: str):
+        if not self.api_secret:
+            return
+        expected = hmac.new(self.api_secret.encode(), payload.encode(), hashlib.sha256).hexdigest()
+        if not hmac.compare_digest(signature, expected):
+            raise FakeExchangeError(-1022, "Signature for this request is not valid.")
+
+    async def ping(self, request: web.Request):
+        return web.json_response({})
+
+    async def server_time(self, request: web.Request):
+        return web.json_response({'serverTime': self.exchange.now_ms()})
+
+    async def exchange_info(self, request: web.Request):
+        return web.json_response(self._exchange_info())
+
+    def _exchange_info(self) -> dict:
+        """Пары с ценами в FakeExchange и типовыми фильтрами спотовых пар Binance"""
+        return {
+            'timezone': 'UTC',
+            'serverTime': self.exchange.now_ms(),
+            'symbols': [
+                {
+                    'symbol': symbol,
+                    'status': 'TRADING',
+                    'baseAsset': self.exchange.base_asset(symbol),
+                    'quoteAsset': self.exchange.quote_asset,
+                    'filters': [
+                        {'filterType': 'PRICE_FILTER', 'minPrice': '0.01000000', 'maxPrice': '1000000.00000000',
+                         'tickSize': '0.01000000'},
+                        {'filterType': 'LOT_SIZE', 'minQty': '0.00001000', 'maxQty': '9000.00000000',
+                         'stepSize': '0.00001000'},
+                        {'filterType': 'MARKET_LOT_SIZE', 'minQty': '0.00000000', 'maxQty': '100.00000000',
+                         'stepSize': '0.00000000'},
+                        {'filterType': 'NOTIONAL', 'minNotional': '5.00000000', 'applyMinToMarket': True,
+                         'maxNotional': '9000000.00000000', 'applyMaxToMarket': False},
+                    ],
+                }
+                for symbol in self.exchange.prices
+            ],
+        }
+
+    async def historical_trades(self, request: web.Request):
+        params = await self._params(request, signed=False)
+        return web.json_response(self._historical(params))
+
+    def _historical(self, params: dict) -> list[dict]:
+        if not self.market:
+            return []
+        from_id = int(params['fromId']) if 'fromId' in params else None
+        return self.market.historical(params['symbol'], from_id, min(int(params.get('limit', 500)), 1000))
+
+    async def depth(self, request: web.Request):
+        params = await self._params(request, signed=False)
+        return web.json_response(self._depth(params))
+
+    def _depth(self, params: dict) -> dict:
+        if not self.market:
+            raise FakeExchangeError(-1121, "Invalid symbol.")
+        return self.market.depth(params['symbol'], min(int(params.get('limit', 100)), 5000))
+
+    async def account(self, request: web.Request):
+        await self._params(request)
+        return web.json_response(self.exchange.account())
+
+    async def new_order(self, request: web.Request):
+        params = await self._params(request)
+        if params.get('type', 'MARKET') != 'MARKET':
+            raise FakeExchangeError(-1116, "Invalid orderType.")
+        order = self.exchange.place_market_order(
+            params['symbol'], params['side'], Decimal(params['quantity']), params.get('newClientOrderId', '')
+        )
+        return web.json_response(order)
+
+    async def get_order(self, request: web.Request):
+        params = await self._params(request)
+        return web.json_response(self.exchange.get_order(params['symbol'], int(params['orderId'])))
+
+    async def cancel_order(self, request: web.Request):
+        params = await self._params(request)
+        return web.json_response(self.exchange.cancel_order(params['symbol'], int(params['orderId'])))
+
+    async def create_listen_key(self, request: web.Request):
+        listen_key = secrets.token_hex(32)
+        self.listen_keys.add(listen_key)
+        return web.json_response({'listenKey': listen_key})
+
+    async def keepalive_listen_key(self, request: web.Request):
+        params = await self._params(request, signed=False)
+        if params.get('listenKey') not in self.listen_keys:
+            raise FakeExchangeError(-1125, "This listenKey does not exist.")
+        return web.json_response({})
+
+    async def user_data_stream(self, request: web.Request):
+        name = request.match_info['listen_key']
+        if name.endswith('@trade'):
+            return await self._trade_stream(request, [name.removesuffix('@trade')], combined=False)
+        if name not in self.listen_keys:
+            raise web.HTTPNotFound()
+
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        events = asyncio.Queue()
+        self.exchange.listeners.append(events.put_nowait)
+        sender = asyncio.create_task(self._forward(ws, events))
+        try:
+            # Входящие сообщения не нужны, ждём закрытия со стороны клиента
+            async for _ in ws:
+                pass
+        finally:
+            sender.cancel()
+            self.exchange.listeners.remove(events.put_nowait)
+        return ws
+
+    async def combined_stream(self, request: web.Request):
+        """Комбинированный поток: /stream?streams=btcusdt@trade/ethusdt@depth@100ms"""
+        streams = request.query.get('streams', '').split('/')
+        symbols = [stream.removesuffix('@trade') for stream in streams if stream.endswith('@trade')]
+        depth = [stream.split('@')[0].upper() for stream in streams if '@depth' in stream]
+        return await self._trade_stream(request, symbols, combined=True, depth=depth)
+
+    async def _trade_stream(self, request: web.Request, symbols: list[str], combined: bool, depth: list[str] = ()):
+        if not self.market:
+            raise web.HTTPNotFound()
+
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        frames = asyncio.Queue()
+        for symbol in symbols:
+            self.market.subscribe(symbol, frames.put_nowait, combined)
+        for symbol in depth:
+            self.market.subscribe_depth(symbol, frames.put_nowait)
+        sender = asyncio.create_task(self._send_frames(ws, frames))
+        try:
+            async for _ in ws:
+                pass
+        finally:
+            sender.cancel()
+            for symbol in symbols:
+                self.market.unsubscribe(symbol, frames.put_nowait, combined)
+            for symbol in depth:
+                self.market.unsubscribe_depth(symbol, frames.put_nowait)
+        return ws
+
+    @staticmethod
+    async def _send_frames(ws: web.WebSocketResponse, frames: asyncio.Queue):
+        """Отправка накопившихся кадров подряд, ожидание только на пустой очереди"""
+        while not ws.closed:
+            frame = await frames.get()
+            while True:
+                await ws.send_str(frame)
+                try:
+                    frame = frames.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+
+    async def ws_api(self, request: web.Request):
+        """WebSocket API: запросы {id, method, params}, ответы с тем же id"""
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        async for message in ws:
+            request_data = json.loads(message.data)
+            self.requests += 1
+            used = self._use_weight(self.weights.get(request_data['method'], 1))
+            rate_limits = [{
+                'rateLimitType': 'REQUEST_WEIGHT', 'interval': 'MINUTE', 'intervalNum': 1, 'limit': 6000, 'count': used
+            }]
+            try:
+                result = self._ws_api_call(request_data['method'], request_data.get('params', {}))
+                response = {'id': request_data['id'], 'status': 200, 'result': result, 'rateLimits': rate_limits}
+            except FakeExchangeError as e:
+                response = {'id': request_data['id'], 'status': 400, 'error': {'code': e.code, 'msg': e.msg},
+                            'rateLimits': rate_limits}
+            await ws.send_str(json.dumps(response))
+        return ws
+
+    def _ws_api_call(self, method: str, params: dict) -> dict:
+        if 'signature' in params:
+            payload = urllib.parse.urlencode(sorted((k, v) for k, v in params.items() if k != 'signature'))
+            self._verify(payload, params['signature'])
+            self._check_timestamp(params)
+
+        match method:
+            case 'ping':
+                return {}
+            case 'time':
+                return {'serverTime': self.exchange.now_ms()}
+            case 'exchangeInfo':
+                return self._exchange_info()
+            case 'trades.historical':
+                return self._historical(params)
+            case 'depth':
+                return self._depth(params)
+            case 'account.status':
+                return self.exchange.account()
+            case 'order.place':
+                if params.get('type', 'MARKET') != 'MARKET':
+                    raise FakeExchangeError(-1116, "Invalid orderType.")
+                return self.exchange.place_market_order(
+                    params['symbol'], params['side'], Decimal(params['quantity']), params.get('newClientOrderId', '')
+                )
+            case 'order.status':
+                return self.exchange.get_order(params['symbol'], int(params['orderId']))
+            case 'order.cancel':
+                return self.exchange.cancel_order(params['symbol'], int(params['orderId']))
+            case 'userDataStream.start':
+                listen_key = secrets.token_hex(32)
+                self.listen_keys.add(listen_key)
+                return {'listenKey': listen_key}
+            case 'userDataStream.ping':
+                return {}
+        raise FakeExchangeError(-1100, f"Unknown method '{method}'.")
+
+    @staticmethod
+    async def _forward(ws: web.WebSocketResponse, events: asyncio.Queue):
+        while not ws.closed:
+            await ws.send_str(json.dumps(await events.get()))
+
+
+def _pairs(values: list[str]) -> dict[str, Decimal]:
+    return {key.upper(): Decimal(value) for key, value in (item.split('=', 1) for item in values)}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Local mock Binance server')
+    parser.add_argument('--host', type=str, default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9000)
+    parser.add_argument('--balance', nargs='*', default=['USDT=10000'], help='Initial balances, e.g. USDT=10000')
+    parser.add_argument('--price', nargs='*', default=['BTCUSDT=84000'], help='Fill prices, e.g. BTCUSDT=84000')
+    parser.add_argument('--fee', type=str, default='0.1', help='Commission in percentage')
+    parser.add_argument('--secret', type=str, default=None, help='Verify request signatures with this secret')
+    parser.add_argument('--clock-offset', type=int, default=0,
+                        help='Shift the exchange clock by this many ms to test recvWindow handling')
+    parser.add_argument('--rate', type=float, default=0, help='Generated trades per second per symbol (0 - no streams)')
+    parser.add_argument('--volatility', type=float, default=0.0002, help='Random-walk step standard deviation')
+    parser.add_argument('--replay', type=str, default=None,
+                        help='Replay prices from recorded trades (Binance public data CSV) instead of a random walk')
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+    exchange = FakeExchange(balances=_pairs(args.balance), commission=Decimal(args.fee) / 100,
+                            clock=lambda: time.time() + args.clock_offset / 1000)
+    for symbol, price in _pairs(args.price).items():
+        exchange.set_price(symbol, price)
+
+    market = None
+    if args.rate:
+        market = TickGenerator(exchange, args.rate, args.volatility, load_replay(args.replay) if args.replay else None)
+
+    server = MockBinanceServer(exchange, logging.getLogger("MockBinance"), args.secret, market)
+    runner = await server.start(args.host, args.port)
+    try:
+        await (market.run() if market else asyncio.Event().wait())
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
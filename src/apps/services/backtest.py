@@ -0,0 +1,240 @@
+import asyncio
+import csv
+import selectors
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from logging import Logger
+from typing import Iterable, Iterator
+
+from apps.adapters.fixed_point import to_scaled
+from apps.adapters.simulated_api import SimulatedAPIClient
+from apps.adapters.tick import Tick
+from apps.services.custom_logger import CustomLogger
+from apps.services.indicators import TickIndicators
+from apps.services.tick_store import TickStore
+from apps.services.trade_handler import TradeManager
+
+
+class _VirtualSelector(selectors.DefaultSelector):
+    """Селектор, который вместо ожидания таймеров переводит виртуальные часы"""
+
+    def __init__(self, loop: 'VirtualTimeEventLoop'):
+        super().__init__()
+        self._loop = loop
+
+    def select(self, timeout: float | None = None):
+        if timeout is None:
+            # Ни готовых задач, ни таймеров: ждём только потоки
+            return super().select(timeout)
+        if timeout > 0 and not self._loop.frozen:
+            self._loop.now += timeout
+        # В бэктесте нет сокетов, кроме служебного self-pipe
+        return []
+
+
+class VirtualTimeEventLoop(asyncio.SelectorEventLoop):
+    """Event loop с виртуальными часами: sleep/call_later срабатывают мгновенно"""
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+        self.frozen = False
+        super().__init__(selector=_VirtualSelector(self))
+        # При времени порядка unix epoch шаг float ~2e-7 с, стандартного 1e-9 не хватает
+        self._clock_resolution = 1e-6
+
+    def time(self) -> float:
+        return self.now
+
+
+def load_csv_ticks(path: str, symbol: str) -> Iterator[Tick]:
+    """Чтение сделок из CSV формата Binance public data
+
+    Колонки: id, price, qty, quote_qty, time, is_buyer_maker, is_best_match.
+    Время в миллисекундах или микросекундах (spot с 2025 года).
+    """
+    with open(path, newline='') as f:
+        for row in csv.reader(f):
+            if not row or not row[0].isdigit():
+                continue
+            ts = int(row[4])
+            if ts > 10 ** 14:
+                ts //= 1000
+            yield Tick(symbol, to_scaled(row[1]), to_scaled(row[2]), int(row[0]), ts, ts, row[5] == 'True')
+
+
+def load_store_ticks(root: str, symbol: str, days: list[str] | None = None) -> Iterator[Tick]:
+    """Чтение сделок из хранилища TickRecorder"""
+    for trade_id, event_time, price, qty, buyer_maker in TickStore(root).iter_ticks(symbol, days):
+        yield Tick(symbol, price, qty, trade_id, event_time, event_time, buyer_maker)
+
+
+def _format_time(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat(timespec='milliseconds')
+
+
+class Backtest:
+    """Прогон неизменённого TradeManager на записанных тиках с виртуальным временем"""
+
+    def __init__(
+            self,
+            symbol: str,
+            ticks: Iterable[Tick],
+            quantity: Decimal,
+            stop_loss: float,
+            take_profit: float,
+            timeout: int,
+            cooldown: int,
+            logger: Logger,
+            trade_logger: CustomLogger,
+            balance: Decimal = Decimal('10000'),
+            commission: Decimal = Decimal('0'),
+            quote_asset: str = 'USDT',
+            indicators: TickIndicators | None = None,
+            volatility_factor: float = 0,
+            trend_entry: bool = False,
+            max_positions: int = 1
+    ):
+        self.symbol = symbol
+        self.ticks = iter(ticks)
+        self.trade_logger = trade_logger
+        self.quote_asset = quote_asset
+        self.initial_balance = balance
+
+        self.api_client = SimulatedAPIClient(
+            logger=logger,
+            balances={quote_asset: balance},
+            commission=commission,
+            quote_asset=quote_asset,
+            on_fill=self._on_fill
+        )
+        self.manager = TradeManager(
+            api_client=self.api_client,
+            ws_client=None,
+            symbol=symbol,
+            quantity=quantity,
+            stop_loss=stop_loss,
+            take_profit=take_profit,
+            timeout=timeout,
+            cooldown=cooldown,
+            logger=logger,
+            indicators=indicators,
+            volatility_factor=volatility_factor,
+            trend_entry=trend_entry,
+            max_positions=max_positions
+        )
+        self.trades: list[dict] = []
+        self.ticks_replayed = 0
+        # Исполнения покупок открытых позиций по orderId
+        self._entries: dict[int, dict] = {}
+
+    def run(self) -> dict:
+        """Синхронный запуск прогона, возвращает итоговую сводку"""
+        first = next(self.ticks, None)
+        if first is None:
+            raise ValueError("Нет тиков для прогона")
+
+        loop = VirtualTimeEventLoop(start=first.event_time / 1000)
+        started = time.perf_counter()
+        try:
+            loop.run_until_complete(self._run(first))
+        finally:
+            loop.close()
+
+        summary = self._summary(time.perf_counter() - started)
+        self.trade_logger.log_trade('SUMMARY', summary)
+        return summary
+
+    async def _run(self, first: Tick):
+        task = asyncio.create_task(self.manager.start_trading())
+        await self._feed(first)
+        # Останавливаем часы, чтобы таймауты не срабатывали во время отмены задач
+        asyncio.get_running_loop().frozen = True
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        # Дочерние задачи менеджера уже отменены, дожидаемся их завершения
+        await asyncio.gather(*asyncio.all_tasks() - {asyncio.current_task()}, return_exceptions=True)
+
+    async def _feed(self, tick: Tick):
+        loop = asyncio.get_running_loop()
+        channel = self.manager.price_queue
+        while tick is not None:
+            delay = tick.event_time / 1000 - loop.time()
+            # Ожидание до времени тика отрабатывает все таймеры между тиками
+            await asyncio.sleep(delay if delay > 0 else 0)
+            tick.received = loop.time()
+            self.api_client.set_price(self.symbol, tick.price)
+            channel.put_nowait(tick)
+            self.ticks_replayed += 1
+            tick = next(self.ticks, None)
+        # Даём менеджеру обработать последний тик
+        await asyncio.sleep(0)
+
+    def _on_fill(self, order: dict):
+        price = Decimal(order['cummulativeQuoteQty']) / Decimal(order['executedQty'])
+        fill = {
+            'time': order['transactTime'] / 1000,
+            'price': price,
+            'quantity': Decimal(order['executedQty']),
+            'quote': Decimal(order['cummulativeQuoteQty']),
+            'commission': Decimal(order['fills'][0]['commission']),
+        }
+        if order['side'] == 'BUY':
+            self._entries[order['orderId']] = fill
+            self.trade_logger.log_trade('BUY', {
+                'time': _format_time(fill['time']),
+                'symbol': self.symbol,
+                'quantity': fill['quantity'],
+                'price': fill['price'],
+            })
+            return
+
+        positions = self.manager.exiting
+        entries = [self._entries.pop(position.order_id) for position in positions
+                   if position.order_id in self._entries]
+        entry_quote = sum((entry['quote'] for entry in entries), Decimal('0'))
+        entry_quantity = sum((entry['quantity'] for entry in entries), Decimal('0'))
+        # Комиссия покупки списана в базовом активе, переводим её в котируемый
+        entry_fee = sum((entry['commission'] * entry['price'] for entry in entries), Decimal('0'))
+        pnl = fill['quote'] - fill['commission'] - entry_quote
+        trade = {
+            'entry_time': _format_time(min(entry['time'] for entry in entries)) if entries else None,
+            'exit_time': _format_time(fill['time']),
+            'symbol': self.symbol,
+            'quantity': fill['quantity'],
+            'entry_price': entry_quote / entry_quantity if entries else None,
+            'exit_price': fill['price'],
+            'reason': ', '.join(dict.fromkeys(position.reason for position in positions)),
+            'fee': (fill['commission'] + entry_fee).quantize(Decimal('1e-8')),
+            'pnl': pnl.quantize(Decimal('1e-8')),
+        }
+        self.trades.append(trade)
+        self.trade_logger.log_trade('SELL', trade)
+
+    def _summary(self, elapsed: float) -> dict:
+        equity = peak = Decimal('0')
+        max_drawdown = Decimal('0')
+        wins = 0
+        for trade in self.trades:
+            equity += trade['pnl']
+            peak = max(peak, equity)
+            max_drawdown = max(max_drawdown, peak - equity)
+            wins += trade['pnl'] > 0
+
+        balances = self.api_client.balances
+        last_price = self.api_client.prices.get(self.symbol, Decimal('0'))
+        base_asset = self.symbol.removesuffix(self.quote_asset)
+        final_equity = balances[self.quote_asset] + balances[base_asset] * last_price
+        return {
+            'symbol': self.symbol,
+            'ticks': self.ticks_replayed,
+            'trades': len(self.trades),
+            'win_rate': f"{wins / len(self.trades) * 100:.2f}%" if self.trades else '0.00%',
+            'realized_pnl': equity,
+            'max_drawdown': max_drawdown,
+            'open_position': bool(self._entries),
+            'final_equity': final_equity.quantize(Decimal('1e-8')),
+            'return': f"{(final_equity / self.initial_balance - 1) * 100:.4f}%",
+            'elapsed_s': round(elapsed, 3),
+            'ticks_per_s': int(self.ticks_replayed / elapsed) if elapsed else 0,
+        }
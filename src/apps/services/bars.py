@@ -0,0 +1,331 @@
+import asyncio
+import os
+import re
+import threading
+import time
+from array import array
+from collections import deque
+from datetime import datetime, timezone
+from typing import BinaryIO, Callable, NamedTuple
+
+from apps.adapters.fixed_point import SCALE, to_scaled
+
+DAY_MS = 86_400_000
+EXTENSION = '.i8'
+_UNITS = {'s': 1000, 'm': 60_000, 'h': 3_600_000, 'd': DAY_MS}
+
+
+class Bar(NamedTuple):
+    """Закрытый бар: время в мс, цены и объёмы целыми с масштабом 1e8
+
+    buy_volume - объём сделок, где агрессор покупатель (buyer_maker = False).
+    """
+    start: int
+    end: int
+    open: int
+    high: int
+    low: int
+    close: int
+    volume: int
+    buy_volume: int
+    quote_volume: int
+    trades: int
+
+
+def parse_interval(value: str) -> int:
+    """'1s', '5m', '1h' -> длительность в мс"""
+    match = re.fullmatch(r'(\d+)([smhd])', value.strip())
+    if not match or not int(match[1]):
+        raise ValueError(f"Неверный интервал бара: {value!r}")
+    return int(match[1]) * _UNITS[match[2]]
+
+
+class BarAggregator:
+    """Инкрементальная сборка баров одной пары за O(1) на сделку
+
+    Временной бар (interval мс) начинается на границе интервала и
+    закрывается первой сделкой следующего интервала или по таймеру
+    close_due; интервалы без сделок баров не дают. Объёмный бар закрывается
+    сделкой, после которой объём достиг threshold. Закрытые бары попадают в
+    history (последние history_size) и в on_close.
+    """
+
+    __slots__ = ('symbol', 'kind', 'interval', 'threshold', 'history', 'on_close',
+                 'start', 'end', 'open', 'high', 'low', 'close', 'volume', 'buy_volume', 'quote', 'trades',
+                 'closed', 'late')
+
+    def __init__(self,
+                 symbol: str,
+                 kind: str,
+                 interval: int = 0,
+                 threshold: int = 0,
+                 history_size: int = 1000,
+                 on_close: Callable[['BarAggregator', Bar], None] | None = None):
+        self.symbol = symbol
+        self.kind = kind
+        self.interval = interval
+        self.threshold = threshold
+        self.history: deque[Bar] = deque(maxlen=history_size)
+        self.on_close = on_close
+        self.start = self.end = 0
+        self.open = self.high = self.low = self.close = 0
+        self.volume = self.buy_volume = 0
+        # Оборот в единицах 1e-16, переводится в 1e-8 при закрытии бара
+        self.quote = 0
+        # 0 - открытого бара нет
+        self.trades = 0
+        self.closed = 0
+        self.late = 0
+
+    def update(self, price: int, qty: int, ts: int, buyer_maker: bool):
+        interval = self.interval
+        if self.trades:
+            if interval and ts >= self.start + interval:
+                self._close()
+        elif interval and self.history and ts < self.history[-1].start + interval:
+            # Сделка интервала, уже закрытого по таймеру: бар записан, сделка только считается
+            self.late += 1
+            return
+
+        if self.trades:
+            if price > self.high:
+                self.high = price
+            elif price < self.low:
+                self.low = price
+        else:
+            self.start = ts - ts % interval if interval else ts
+            self.open = self.high = self.low = price
+            self.volume = self.buy_volume = self.quote = 0
+        self.close = price
+        self.end = ts
+        self.volume += qty
+        if not buyer_maker:
+            self.buy_volume += qty
+        self.quote += price * qty
+        self.trades += 1
+
+        if self.threshold and self.volume >= self.threshold:
+            self._close()
+
+    def close_due(self, now: int):
+        """Закрыть временной бар, интервал которого закончился к now (мс эпохи)"""
+        if self.trades and self.interval and now >= self.start + self.interval:
+            self._close()
+
+    def current(self) -> Bar | None:
+        """Незакрытый бар в текущем состоянии"""
+        if not self.trades:
+            return None
+        return Bar(self.start, self.end, self.open, self.high, self.low, self.close,
+                   self.volume, self.buy_volume, self.quote // SCALE, self.trades)
+
+    def column(self, name: str) -> list[int]:
+        """Поле закрытых баров истории, от старых к новым"""
+        index = Bar._fields.index(name)
+        return [bar[index] for bar in self.history]
+
+    def _close(self):
+        bar = self.current()
+        self.trades = 0
+        self.closed += 1
+        self.history.append(bar)
+        if self.on_close is not None:
+            self.on_close(self, bar)
+
+    def stats(self) -> dict:
+        return {
+            'closed': self.closed,
+            'late': self.late,
+            'history': len(self.history),
+        }
+
+
+def partition_path(root: str, symbol: str, kind: str, day: int) -> str:
+    """Каталог баров пары за сутки: <root>/<SYMBOL>/<kind>/<YYYY-MM-DD>"""
+    date = datetime.fromtimestamp(day * DAY_MS / 1000, tz=timezone.utc).strftime('%Y-%m-%d')
+    return os.path.join(root, symbol.upper(), kind, date)
+
+
+class BarWriter:
+    """Колоночная запись закрытых баров: по файлу int64 на поле Bar в каталоге пары, вида и дня
+
+    write вызывается из фонового потока пачкой, каждое поле пачки
+    дописывается одним вызовом write. Бар относится к дню своего начала.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.pending: list[tuple[str, str, Bar]] = []
+        self.written = 0
+        self.batches = 0
+        self._files: dict[tuple[str, str], tuple[int, list[BinaryIO]]] = {}
+        self._lock = threading.Lock()
+
+    def append(self, symbol: str, kind: str, bar: Bar):
+        self.pending.append((symbol, kind, bar))
+
+    def take(self) -> list[tuple[str, str, Bar]]:
+        batch, self.pending = self.pending, []
+        return batch
+
+    def write(self, batch: list[tuple[str, str, Bar]]):
+        grouped: dict[tuple[str, str, int], list[Bar]] = {}
+        for symbol, kind, bar in batch:
+            grouped.setdefault((symbol, kind, bar.start // DAY_MS), []).append(bar)
+
+        with self._lock:
+            for (symbol, kind, day), bars in grouped.items():
+                files = self._open(symbol, kind, day)
+                for file, values in zip(files, zip(*bars)):
+                    file.write(array('q', values).tobytes())
+            self.written += len(batch)
+            self.batches += 1
+
+    def _open(self, symbol: str, kind: str, day: int) -> list[BinaryIO]:
+        current = self._files.get((symbol, kind))
+        if current is not None and current[0] == day:
+            return current[1]
+        if current is not None:
+            for file in current[1]:
+                file.close()
+
+        directory = partition_path(self.root, symbol, kind, day)
+        os.makedirs(directory, exist_ok=True)
+        # Без буфера: пачка уже собрана, поле пишется одним вызовом
+        files = [open(os.path.join(directory, f'{name}{EXTENSION}'), 'ab', buffering=0) for name in Bar._fields]
+        # Пачка, дописанная не полностью при аварии, отрезается во всех полях:
+        # иначе следующие бары лягут в файлы полей с разным сдвигом
+        rows = min(file.tell() // 8 for file in files)
+        for file in files:
+            if file.tell() != rows * 8:
+                file.truncate(rows * 8)
+        self._files[(symbol, kind)] = (day, files)
+        return files
+
+    def close(self):
+        with self._lock:
+            for _, files in self._files.values():
+                for file in files:
+                    file.close()
+            self._files.clear()
+
+
+class BarBuilder:
+    """Бары всех пар процесса по потоку сделок
+
+    update вызывается на каждую сделку до схлопывания в PriceChannel.
+    run закрывает временные бары без новых сделок по часам с запасом grace
+    (на задержку доставки сделок) и отдаёт накопленные бары BarWriter
+    в фоновом потоке раз в flush_interval секунд или по max_batch барам.
+    """
+
+    check_interval = 0.25
+    grace = 0.5
+    max_batch = 4096
+
+    def __init__(self,
+                 symbols: list[str],
+                 intervals: list[str],
+                 volume: str | None = None,
+                 history_size: int = 1000,
+                 writer: BarWriter | None = None,
+                 flush_interval: float = 5):
+        self.writer = writer
+        self.flush_interval = flush_interval
+        kinds = [(interval, parse_interval(interval), 0) for interval in intervals]
+        if volume:
+            kinds.append((f'v{volume}', 0, to_scaled(volume)))
+        on_close = self._on_close if writer else None
+        self.series: dict[str, dict[str, BarAggregator]] = {
+            symbol: {
+                kind: BarAggregator(symbol, kind, interval, threshold, history_size, on_close)
+                for kind, interval, threshold in kinds
+            }
+            for symbol in dict.fromkeys(symbols)
+        }
+        self._timed = [aggregator for series in self.series.values() for aggregator in series.values()
+                       if aggregator.interval]
+        self._aggregators = {symbol: tuple(series.values()) for symbol, series in self.series.items()}
+
+    def update(self, tick):
+        aggregators = self._aggregators.get(tick.symbol)
+        if aggregators is None:
+            return
+        price, qty, ts, buyer_maker = tick.fixed_price, tick.fixed_qty, tick.trade_time, tick.buyer_maker
+        for aggregator in aggregators:
+            aggregator.update(price, qty, ts, buyer_maker)
+
+    def close_due(self, now: int):
+        for aggregator in self._timed:
+            aggregator.close_due(now)
+
+    def _on_close(self, aggregator: BarAggregator, bar: Bar):
+        self.writer.append(aggregator.symbol, aggregator.kind, bar)
+
+    async def run(self):
+        last_flush = time.monotonic()
+        while True:
+            await asyncio.sleep(self.check_interval)
+            self.close_due(int((time.time() - self.grace) * 1000))
+            if self.writer is None or not self.writer.pending:
+                continue
+            now = time.monotonic()
+            if len(self.writer.pending) >= self.max_batch or now - last_flush >= self.flush_interval:
+                last_flush = now
+                await asyncio.to_thread(self.writer.write, self.writer.take())
+
+    def close(self):
+        """Дописать закрытые бары; незакрытые не сохраняются"""
+        if self.writer is not None:
+            batch = self.writer.take()
+            if batch:
+                self.writer.write(batch)
+            self.writer.close()
+
+    def stats(self) -> dict:
+        aggregators = [aggregator for series in self.series.values() for aggregator in series.values()]
+        return {
+            'closed': sum(aggregator.closed for aggregator in aggregators),
+            'late': sum(aggregator.late for aggregator in aggregators),
+            'pending': len(self.writer.pending) if self.writer else 0,
+            'written': self.writer.written if self.writer else 0,
+        }
+
+
+class BarStore:
+    """Чтение баров BarWriter в NumPy-массивы по полям"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _list(self, *parts: str) -> list[str]:
+        directory = os.path.join(self.root, *parts)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name for name in os.listdir(directory) if os.path.isdir(os.path.join(directory, name)))
+
+    def symbols(self) -> list[str]:
+        return self._list()
+
+    def kinds(self, symbol: str) -> list[str]:
+        return self._list(symbol.upper())
+
+    def days(self, symbol: str, kind: str) -> list[str]:
+        return self._list(symbol.upper(), kind)
+
+    def load(self, symbol: str, kind: str, days: list[str] | None = None) -> dict:
+        """{поле: np.ndarray int64} за дни days (по умолчанию все)
+
+        Поля пачки, дописанной не полностью при аварии, обрезаются до общей
+        длины; BarWriter отрезает такой хвост перед следующей записью.
+        """
+        import numpy as np
+
+        parts = {name: [] for name in Bar._fields}
+        for day in days or self.days(symbol, kind):
+            directory = os.path.join(self.root, symbol.upper(), kind, day)
+            paths = {name: os.path.join(directory, f'{name}{EXTENSION}') for name in Bar._fields}
+            count = min(os.path.getsize(path) // 8 if os.path.exists(path) else 0 for path in paths.values())
+            for name, path in paths.items():
+                parts[name].append(np.fromfile(path, dtype='<i8', count=count) if count else np.empty(0, '<i8'))
+        return {name: np.concatenate(arrays) if arrays else np.empty(0, '<i8') for name, arrays in parts.items()}
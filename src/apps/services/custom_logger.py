@@ -1,30 +1,239 @@
+import atexit
+import json
 import os
 import logging
+import queue
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+
+
+class BatchFileHandler(RotatingFileHandler):
+    """Файловый обработчик с записью пачки записей одним вызовом write и ротацией по размеру"""
+
+    def emit_batch(self, records: list[logging.LogRecord]):
+        text = ''.join(self.format(record) + self.terminator for record in records)
+        with self.lock:
+            if self.stream is None:
+                self.stream = self._open()
+            # maxBytes в байтах: кириллица в UTF-8 занимает два байта на символ
+            if self.maxBytes and self.stream.tell() and \
+                    self.stream.tell() + len(text.encode(self.encoding or 'utf-8')) >= self.maxBytes:
+                self.doRollover()
+            self.stream.write(text)
+            self.stream.flush()
+
+
+class BatchStreamHandler(logging.StreamHandler):
+    """Вывод пачки записей в консоль одним вызовом write"""
+
+    def emit_batch(self, records: list[logging.LogRecord]):
+        text = ''.join(self.format(record) + self.terminator for record in records)
+        with self.lock:
+            self.stream.write(text)
+            self.flush()
+
+
+class TradeJournalFormatter(logging.Formatter):
+    """Компактная JSON-строка события сделки: время в мс, логгер и поля из extra={'trade': ...}"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(
+            {'ts': int(record.created * 1000), 'logger': record.name, **record.trade},
+            separators=(',', ':'),
+            default=str
+        )
+
+
+class LogWriter:
+    """Фоновый поток записи логов: event loop только кладёт запись в очередь
+
+    Накопившиеся записи разбираются пачкой до max_batch и раскладываются по
+    обработчикам, каждый пишет свою пачку одним вызовом.
+    """
+
+    max_batch = 1024
+    # Форматирование идёт под GIL: после каждых chunk записей поток уступает его event loop
+    chunk = 64
+    _stop = object()
+
+    def __init__(self):
+        self.queue = queue.SimpleQueue()
+        self.written = 0
+        self.batches = 0
+        self.closed = False
+        self._thread = threading.Thread(target=self._run, name='LogWriter', daemon=True)
+        self._thread.start()
+
+    def put(self, handlers: tuple[logging.Handler, ...], record: logging.LogRecord):
+        self.queue.put((handlers, record))
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = any(item is self._stop for item in batch)
+            self._write([item for item in batch if item is not self._stop])
+            if stop:
+                return
+
+    def _write(self, batch: list):
+        grouped: dict[logging.Handler, list[logging.LogRecord]] = {}
+        for handlers, record in batch:
+            for handler in handlers:
+                if record.levelno >= handler.level and handler.filter(record):
+                    grouped.setdefault(handler, []).append(record)
+
+        for handler, records in grouped.items():
+            for start in range(0, len(records), self.chunk):
+                part = records[start:start + self.chunk]
+                try:
+                    if hasattr(handler, 'emit_batch'):
+                        handler.emit_batch(part)
+                    else:
+                        for record in part:
+                            handler.emit(record)
+                except Exception:
+                    handler.handleError(part[-1])
+                time.sleep(0)
+        self.written += len(batch)
+        self.batches += 1
+
+    def close(self):
+        """Дописать очередь и остановить поток; дальше QueuedHandler пишет напрямую"""
+        self.closed = True
+        if self._thread.is_alive():
+            self.queue.put(self._stop)
+            self._thread.join(timeout=5)
+        # Записи, попавшие в очередь после сигнала остановки
+        leftover = []
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not self._stop:
+                leftover.append(item)
+        if leftover:
+            self._write(leftover)
+
+
+class QueuedHandler(logging.Handler):
+    """Передаёт запись в LogWriter, реальные обработчики работают вне event loop"""
+
+    def __init__(self, writer: LogWriter, handlers: tuple[logging.Handler, ...]):
+        super().__init__()
+        self.writer = writer
+        self.handlers = handlers
+
+    def emit(self, record: logging.LogRecord):
+        if self.writer.closed:
+            # Поток записи остановлен (CustomLogger.shutdown): запись идёт напрямую
+            for handler in self.handlers:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+            return
+        # Аргументы подставляются сразу: объекты могут измениться до записи в потоке
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        self.writer.put(self.handlers, record)
 
 
 class CustomLogger(logging.Logger):
-    """Кастомный логгер с записью в файл"""
+    """Кастомный логгер с записью в файл
+
+    Обработчики файлов общие для всех логгеров процесса (по одному на файл).
+    В режиме queued (CustomLogger.configure) запись идёт пачками в фоновом
+    потоке. Вызовы с extra={'trade': {...}} и log_trade дополнительно пишутся
+    в журнал сделок JSON Lines, если он задан.
+    """
+
+    queued = False
+    max_bytes = 50 * 1024 * 1024
+    backup_count = 5
+    console = True
+    writer: LogWriter | None = None
+    _handlers: dict[str, logging.Handler] = {}
+    _handlers_lock = threading.Lock()
 
-    def __init__(self, name: str, log_file: str = 'loggers.log', log_dir: str = 'logs'):
+    def __init__(self,
+                 name: str,
+                 log_file: str = 'loggers.log',
+                 log_dir: str = 'logs',
+                 journal: str | None = None):
         super().__init__(name)
         self.log_dir = log_dir
         os.makedirs(self.log_dir, exist_ok=True)
         self.log_file = os.path.join(self.log_dir, log_file)
+        self.journal_file = os.path.join(self.log_dir, journal) if journal else None
         self.setup_logger()
 
+    @classmethod
+    def configure(cls,
+                  queued: bool = True,
+                  max_bytes: int | None = None,
+                  backup_count: int | None = None,
+                  console: bool | None = None):
+        """Режим записи для логгеров, создаваемых после вызова"""
+        cls.queued = queued
+        if max_bytes is not None:
+            cls.max_bytes = max_bytes
+        if backup_count is not None:
+            cls.backup_count = backup_count
+        if console is not None:
+            cls.console = console
+        if queued and cls.writer is None:
+            cls.writer = LogWriter()
+            atexit.register(cls.shutdown)
+
+    @classmethod
+    def shutdown(cls):
+        """Дописать очередь записей; вызывается и при выходе из процесса"""
+        if cls.writer:
+            cls.writer.close()
+            cls.writer = None
+        cls.queued = False
+
     def setup_logger(self):
         formatter = logging.Formatter(
             '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
         )
-        file_handler = logging.FileHandler(self.log_file)
-        file_handler.setFormatter(formatter)
-        self.addHandler(file_handler)
+        handlers = [self._shared(self.log_file, lambda: BatchFileHandler(
+            self.log_file, maxBytes=self.max_bytes, backupCount=self.backup_count, encoding='utf-8'
+        ), formatter)]
+        if self.console:
+            handlers.append(self._shared('<console>', BatchStreamHandler, formatter))
+        if self.journal_file:
+            journal = self._shared(self.journal_file, lambda: BatchFileHandler(self.journal_file, encoding='utf-8'),
+                                   TradeJournalFormatter())
+            handlers.append(journal)
+
+        if self.queued and self.writer:
+            self.addHandler(QueuedHandler(self.writer, tuple(handlers)))
+        else:
+            for handler in handlers:
+                self.addHandler(handler)
 
-        console_handler = logging.StreamHandler()
-        console_handler.setFormatter(formatter)
-        self.addHandler(console_handler)
+    @classmethod
+    def _shared(cls, key: str, factory, formatter: logging.Formatter) -> logging.Handler:
+        with cls._handlers_lock:
+            handler = cls._handlers.get(key)
+            if handler is None:
+                handler = cls._handlers[key] = factory()
+                handler.setFormatter(formatter)
+                if isinstance(formatter, TradeJournalFormatter):
+                    handler.addFilter(lambda record: hasattr(record, 'trade'))
+            return handler
 
     def log_trade(self, event_type: str, details: dict):
         message = f"{event_type}: "
         message += " | ".join(f"{k}: {v}" for k, v in details.items())
-        self.info(message)
+        self.info(message, extra={'trade': {'event': event_type, **details}})
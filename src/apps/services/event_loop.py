@@ -0,0 +1,112 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from logging import Logger
+
+from apps.services.latency import LatencyHistogram, LatencyRecorder
+
+
+def _eager_task_factory(loop, coro, **kwargs):
+    """asyncio.eager_task_factory, принимающий eager_start: uvloop передаёт его фабрике задач"""
+    kwargs.pop('eager_start', None)
+    return asyncio.Task(coro, loop=loop, eager_start=True, **kwargs)
+
+
+def run_loop(coro, fast: bool = False):
+    """asyncio.run; с fast - uvloop, если установлен, и eager task factory
+
+    Eager-задача выполняется синхронно до первого await прямо в create_task,
+    без лишнего прохода event loop: короткие задачи (отправка ордера,
+    восполнение сделок) завершаются, не дожидаясь очереди.
+    """
+    if not fast:
+        return asyncio.run(coro)
+
+    loop_factory = None
+    try:
+        import uvloop
+        loop_factory = uvloop.new_event_loop
+    except ImportError:
+        pass
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        # Eager-задачи появились в Python 3.12
+        if hasattr(asyncio, 'eager_task_factory'):
+            runner.get_loop().set_task_factory(_eager_task_factory)
+        return runner.run(coro)
+
+
+class LoopMonitor:
+    """Задержка планирования event loop и стек кода, который его блокирует
+
+    Задача в loop просыпается каждые interval секунд и пишет опоздание
+    пробуждения в гистограмму (этап loop_lag в LatencyRecorder, если он
+    задан). Сторожевой поток следит за отметкой этой задачи: если loop не
+    отвечает дольше threshold, в лог пишется стек потока loop в этот момент,
+    то есть callback, который держит loop. Один дамп на блокировку.
+    """
+
+    def __init__(self,
+                 logger: Logger,
+                 latency: LatencyRecorder | None = None,
+                 interval: float = 0.05,
+                 threshold: float = 0.1):
+        self.logger = logger
+        self.interval = interval
+        self.threshold = threshold
+        self.histogram = latency.histogram('loop_lag', 'process') if latency else LatencyHistogram()
+        self.stalls = 0
+        self.longest_stall = 0.0
+        self._beat = 0.0
+        self._dumped = 0.0
+        self._loop_thread = 0
+        self._stop = threading.Event()
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        watchdog = threading.Thread(target=self._watch, name='LoopWatchdog', daemon=True)
+        watchdog.start()
+        try:
+            expected = loop.time() + self.interval
+            while True:
+                await asyncio.sleep(self.interval)
+                now = loop.time()
+                self._beat = time.monotonic()
+                self.histogram.record(int((now - expected) * 1_000_000))
+                expected = now + self.interval
+        finally:
+            self._stop.set()
+            watchdog.join(timeout=1)
+            self.logger.info(f"Event loop: {self.stats()}")
+
+    def _watch(self):
+        while not self._stop.wait(self.threshold / 2):
+            beat = self._beat
+            # Пробуждение задачи ожидалось в beat + interval
+            blocked = time.monotonic() - beat - self.interval
+            if blocked < self.threshold:
+                continue
+            if blocked > self.longest_stall:
+                self.longest_stall = blocked
+            if beat == self._dumped:
+                continue
+            self._dumped = beat
+            self.stalls += 1
+            frame = sys._current_frames().get(self._loop_thread)
+            stack = ''.join(traceback.format_stack(frame)) if frame else ''
+            self.logger.warning(f"Event loop заблокирован дольше {blocked * 1000:.0f} мс, стек loop:\n{stack}")
+
+    def stats(self) -> dict:
+        histogram = self.histogram
+        return {
+            'samples': histogram.count,
+            'lag_p50_ms': round(histogram.percentile(50) / 1000, 3),
+            'lag_p99_ms': round(histogram.percentile(99) / 1000, 3),
+            'lag_max_ms': round(histogram.max / 1000, 3),
+            'stalls': self.stalls,
+            'longest_stall_ms': round(self.longest_stall * 1000, 1),
+        }
@@ -0,0 +1,186 @@
+import math
+from array import array
+from collections import deque
+
+from apps.adapters.fixed_point import SCALE
+
+
+class RingBuffer:
+    """Кольцевой буфер сделок (время, цена, объём) на заранее выделенных массивах"""
+
+    __slots__ = ('capacity', 'times', 'prices', 'volumes', 'head', 'size')
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.times = array('d', bytes(8 * capacity))
+        self.prices = array('d', bytes(8 * capacity))
+        self.volumes = array('d', bytes(8 * capacity))
+        # head - индекс самой старой записи
+        self.head = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def push(self, ts: float, price: float, volume: float):
+        index = (self.head + self.size) % self.capacity
+        self.times[index] = ts
+        self.prices[index] = price
+        self.volumes[index] = volume
+        self.size += 1
+
+    def pop(self) -> int:
+        """Удалить самую старую запись, возвращает её индекс в массивах"""
+        index = self.head
+        self.head = (self.head + 1) % self.capacity
+        self.size -= 1
+        return index
+
+    @property
+    def full(self) -> bool:
+        return self.size == self.capacity
+
+    def __iter__(self):
+        for i in range(self.size):
+            index = (self.head + i) % self.capacity
+            yield self.times[index], self.prices[index], self.volumes[index]
+
+
+class TickIndicators:
+    """Скользящие индикаторы по потоку сделок за O(1) на сделку
+
+    EMA по времени (полураспад ema_half_life секунд), а также за окно window
+    секунд: VWAP, реализованная волатильность (корень суммы квадратов
+    лог-доходностей, в процентах) и min/max на монотонных очередях.
+    Суммы окна ведутся инкрементально и периодически пересчитываются, чтобы
+    не накапливалась ошибка вычитания. Если сделок в окне больше capacity,
+    окно укорачивается (счётчик overflows).
+    """
+
+    def __init__(self, window: float = 60.0, ema_half_life: float = 10.0, capacity: int = 1 << 17):
+        self.window = window
+        self.ema_tau = ema_half_life / math.log(2)
+        self.buffer = RingBuffer(capacity)
+        # Лог-доходность каждой сделки к предыдущей, по тем же индексам, что и буфер
+        self._returns = array('d', bytes(8 * capacity))
+
+        self.ema: float | None = None
+        self.last_price: float | None = None
+        self.last_time = 0.0
+        self.first_time: float | None = None
+        self.ticks = 0
+        self.overflows = 0
+
+        self._sum_pv = 0.0
+        self._sum_v = 0.0
+        self._sum_r2 = 0.0
+        self._evicted = 0
+        # Монотонные очереди (порядковый номер сделки, цена)
+        self._min: deque[tuple[int, float]] = deque()
+        self._max: deque[tuple[int, float]] = deque()
+
+    def update_tick(self, tick):
+        self.update(tick.fixed_price / SCALE, tick.fixed_qty / SCALE, tick.trade_time / 1000)
+
+    def update(self, price: float, volume: float, ts: float):
+        buffer = self.buffer
+        self._evict(ts)
+        if buffer.full:
+            self.overflows += 1
+            self._drop()
+
+        if self.last_price is None:
+            self.ema = price
+            self.first_time = ts
+            r = 0.0
+        else:
+            alpha = 1.0 - math.exp(-max(ts - self.last_time, 0.0) / self.ema_tau)
+            self.ema += alpha * (price - self.ema)
+            r = math.log(price / self.last_price)
+
+        index = (buffer.head + buffer.size) % buffer.capacity
+        buffer.push(ts, price, volume)
+        self._returns[index] = r
+        self._sum_pv += price * volume
+        self._sum_v += volume
+        self._sum_r2 += r * r
+
+        seq = self.ticks
+        while self._min and self._min[-1][1] >= price:
+            self._min.pop()
+        self._min.append((seq, price))
+        while self._max and self._max[-1][1] <= price:
+            self._max.pop()
+        self._max.append((seq, price))
+
+        self.ticks += 1
+        self.last_price = price
+        self.last_time = ts
+
+    def _evict(self, now: float):
+        buffer = self.buffer
+        horizon = now - self.window
+        while buffer.size and buffer.times[buffer.head] < horizon:
+            self._drop()
+
+    def _drop(self):
+        index = self.buffer.pop()
+        price, volume, r = self.buffer.prices[index], self.buffer.volumes[index], self._returns[index]
+        self._sum_pv -= price * volume
+        self._sum_v -= volume
+        self._sum_r2 -= r * r
+
+        # Порядковый номер самой старой оставшейся сделки
+        first = self.ticks - self.buffer.size
+        while self._min and self._min[0][0] < first:
+            self._min.popleft()
+        while self._max and self._max[0][0] < first:
+            self._max.popleft()
+
+        self._evicted += 1
+        if self._evicted >= self.buffer.capacity:
+            self._resync()
+
+    def _resync(self):
+        """Пересчёт сумм окна с нуля, амортизированно O(1) на сделку"""
+        self._evicted = 0
+        self._sum_pv = self._sum_v = self._sum_r2 = 0.0
+        buffer = self.buffer
+        for i in range(buffer.size):
+            index = (buffer.head + i) % buffer.capacity
+            self._sum_pv += buffer.prices[index] * buffer.volumes[index]
+            self._sum_v += buffer.volumes[index]
+            self._sum_r2 += self._returns[index] * self._returns[index]
+
+    @property
+    def ready(self) -> bool:
+        """Окно заполнено: с первой сделки прошло не меньше window секунд"""
+        return self.first_time is not None and self.last_time - self.first_time >= self.window
+
+    @property
+    def vwap(self) -> float | None:
+        return self._sum_pv / self._sum_v if self._sum_v > 0 else self.last_price
+
+    @property
+    def volatility(self) -> float:
+        """Реализованная волатильность за окно в процентах"""
+        return math.sqrt(max(self._sum_r2, 0.0)) * 100
+
+    @property
+    def low(self) -> float | None:
+        return self._min[0][1] if self._min else None
+
+    @property
+    def high(self) -> float | None:
+        return self._max[0][1] if self._max else None
+
+    def snapshot(self) -> dict:
+        return {
+            'ticks': len(self.buffer),
+            'ema': self.ema,
+            'vwap': self.vwap,
+            'volatility_pct': round(self.volatility, 6),
+            'low': self.low,
+            'high': self.high,
+            'overflows': self.overflows,
+        }
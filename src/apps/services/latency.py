@@ -0,0 +1,226 @@
+import asyncio
+import os
+import time
+from logging import Logger
+
+
+class LatencyHistogram:
+    """Гистограмма задержек в микросекундах с логарифмически-линейными корзинами (как HDR)
+
+    Значения до 2 * sub_buckets хранятся точно, дальше каждая октава делится на
+    sub_buckets равных корзин, относительная погрешность не больше 1 / sub_buckets.
+    Запись - несколько целочисленных операций без выделения памяти.
+    """
+
+    sub_bits = 5
+    sub_buckets = 1 << sub_bits
+    # Значения сверх 2**36 мкс (~19 часов) попадают в последнюю корзину
+    max_shift = 30
+
+    __slots__ = ('counts', 'count', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (2 * self.sub_buckets + self.max_shift * self.sub_buckets)
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    @classmethod
+    def index(cls, value: int) -> int:
+        if value < 2 * cls.sub_buckets:
+            return value
+        shift = min(value.bit_length() - cls.sub_bits - 1, cls.max_shift)
+        sub = min(value >> shift, 2 * cls.sub_buckets - 1)
+        return cls.sub_buckets * shift + sub
+
+    @classmethod
+    def upper_bound(cls, index: int) -> int:
+        """Наибольшее значение, попадающее в корзину"""
+        if index < 2 * cls.sub_buckets:
+            return index
+        shift = index // cls.sub_buckets - 1
+        sub = index - cls.sub_buckets * shift
+        return ((sub + 1) << shift) - 1
+
+    def record(self, value: int):
+        if value < 0:
+            value = 0
+        self.counts[self.index(value)] += 1
+        if not self.count or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.count += 1
+        self.total += value
+
+    def percentile(self, q: float) -> int:
+        """Значение квантиля q (0..100) с точностью корзины"""
+        if not self.count:
+            return 0
+        target = max(1, round(self.count * q / 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self.upper_bound(index), self.max)
+        return self.max
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def merge(self, other: 'LatencyHistogram'):
+        """Добавить значения другой гистограммы: квантили суммарного распределения точны до корзины"""
+        if not other.count:
+            return
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.min = min(self.min, other.min) if self.count else other.min
+        self.max = max(self.max, other.max)
+        self.count += other.count
+        self.total += other.total
+
+    def reset(self):
+        self.counts = [0] * len(self.counts)
+        self.count = self.total = self.min = self.max = 0
+
+
+class LatencyRecorder:
+    """Задержки по этапам обработки и парам на монотонных часах
+
+    Этапы: wire - от времени сделки биржи до приёма кадра (зависит от
+    расхождения часов), queue - от приёма кадра до чтения менеджером,
+    decision - от события (тик или таймер) до отправки ордера, order - от
+    отправки ордера до ответа биржи, tick_to_order - от приёма кадра до ответа.
+    """
+
+    quantiles = (50, 90, 99, 99.9)
+
+    def __init__(self):
+        self.histograms: dict[tuple[str, str], LatencyHistogram] = {}
+        # Перевод монотонных отметок в UNIX-время для сравнения с временем биржи
+        self.wall_offset = time.time() - time.monotonic()
+        self.started = time.monotonic()
+
+    def histogram(self, stage: str, symbol: str) -> LatencyHistogram:
+        histogram = self.histograms.get((stage, symbol))
+        if histogram is None:
+            histogram = self.histograms[(stage, symbol)] = LatencyHistogram()
+        return histogram
+
+    def record(self, stage: str, symbol: str, seconds: float):
+        self.histogram(stage, symbol).record(int(seconds * 1_000_000))
+
+    def since(self, stage: str, symbol: str, started: float):
+        """Задержка от монотонной отметки started до текущего момента"""
+        self.histogram(stage, symbol).record(int((time.monotonic() - started) * 1_000_000))
+
+    def record_tick(self, tick, now: float):
+        """Этапы тика: от сделки на бирже до приёма и от приёма до чтения менеджером"""
+        if tick.received:
+            self.record('wire', tick.symbol, tick.received + self.wall_offset - tick.trade_time / 1000)
+            self.record('queue', tick.symbol, now - tick.received)
+
+    def snapshot(self) -> dict:
+        """Сводка в миллисекундах по каждому этапу и паре"""
+        return {
+            f"{stage}[{symbol}]": {
+                'count': histogram.count,
+                'mean_ms': round(histogram.mean() / 1000, 3),
+                **{f'p{q:g}_ms': round(histogram.percentile(q) / 1000, 3) for q in self.quantiles},
+                'max_ms': round(histogram.max / 1000, 3),
+            }
+            for (stage, symbol), histogram in sorted(self.histograms.items())
+        }
+
+    def totals(self) -> dict[str, LatencyHistogram]:
+        """Этапы по всем парам: квантили summary нельзя сложить на стороне Prometheus"""
+        totals: dict[str, LatencyHistogram] = {}
+        for (stage, _), histogram in self.histograms.items():
+            totals.setdefault(stage, LatencyHistogram()).merge(histogram)
+        return totals
+
+    def render(self) -> str:
+        """Текстовый формат Prometheus (summary в секундах), при нескольких парах - и по всем (symbol="all")"""
+        lines = [
+            '# HELP bot_latency_seconds Latency by processing stage and symbol',
+            '# TYPE bot_latency_seconds summary',
+        ]
+        series = sorted(self.histograms.items())
+        if len({symbol for _, symbol in self.histograms}) > 1:
+            series += [((stage, 'all'), histogram) for stage, histogram in sorted(self.totals().items())]
+        maxima = []
+        for (stage, symbol), histogram in series:
+            labels = f'stage="{stage}",symbol="{symbol}"'
+            for q in self.quantiles:
+                lines.append(f'bot_latency_seconds{{{labels},quantile="{q / 100:g}"}} '
+                             f'{histogram.percentile(q) / 1e6:.6f}')
+            lines.append(f'bot_latency_seconds_sum{{{labels}}} {histogram.total / 1e6:.6f}')
+            lines.append(f'bot_latency_seconds_count{{{labels}}} {histogram.count}')
+            maxima.append(f'bot_latency_seconds_max{{{labels}}} {histogram.max / 1e6:.6f}')
+        # _max не входит в суффиксы summary: максимум - отдельное семейство gauge
+        lines += [
+            '# HELP bot_latency_seconds_max Maximum latency by processing stage and symbol',
+            '# TYPE bot_latency_seconds_max gauge',
+            *maxima,
+            '# HELP bot_uptime_seconds Seconds since the latency recorder started',
+            '# TYPE bot_uptime_seconds gauge',
+            f'bot_uptime_seconds {time.monotonic() - self.started:.3f}',
+        ]
+        return '\n'.join(lines) + '\n'
+
+
+class LatencyExporter:
+    """Периодическая выгрузка LatencyRecorder в файл и/или HTTP /metrics"""
+
+    def __init__(self,
+                 recorder: LatencyRecorder,
+                 logger: Logger,
+                 path: str | None = None,
+                 port: int | None = None,
+                 host: str = '127.0.0.1',
+                 interval: float = 10):
+        self.recorder = recorder
+        self.logger = logger
+        self.path = path
+        self.port = port
+        self.host = host
+        self.interval = interval
+        # aiohttp.web импортируется только при запуске HTTP-эндпоинта
+        self._runner = None
+
+    async def run(self):
+        if self.port is not None:
+            await self._serve()
+        try:
+            while True:
+                await asyncio.sleep(self.interval)
+                if self.path:
+                    self.write()
+        finally:
+            if self.path:
+                self.write()
+            if self._runner:
+                await self._runner.cleanup()
+
+    def write(self):
+        """Атомарная запись: читатель файла не увидит недописанный снимок"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temp = f"{self.path}.tmp"
+        with open(temp, 'w') as f:
+            f.write(self.recorder.render())
+        os.replace(temp, self.path)
+
+    async def _serve(self):
+        from aiohttp import web
+
+        app = web.Application()
+        app.add_routes([web.get('/metrics', self._metrics)])
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        self.logger.info(f"Метрики задержек: http://{self.host}:{self.port}/metrics")
+
+    async def _metrics(self, request):
+        from aiohttp import web
+
+        return web.Response(text=self.recorder.render(), content_type='text/plain')
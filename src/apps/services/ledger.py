@@ -0,0 +1,143 @@
+import asyncio
+import uuid
+from collections import defaultdict
+from decimal import Decimal
+from logging import Logger
+
+from apps.adapters.client_base import APIClient
+
+
+class BalanceLedger:
+    """Локальный учёт балансов по исполнениям ордеров
+
+    Балансы обновляются из ответа new_order (executedQty, cummulativeQuoteQty,
+    комиссии в fills) и событий user data stream. Полная сверка через REST
+    /account выполняется только по расписанию или после расхождения.
+    Один экземпляр разделяют все менеджеры аккаунта.
+
+    outboundAccountPosition несёт абсолютные балансы на момент u: приращение
+    из ответа ордера с transactTime не позже u в них уже учтено и повторно
+    не применяется, а событие старше уже учтённого состояния отбрасывается.
+    Свои ордера регистрируются до отправки по newClientOrderId и узнаются
+    в executionReport по полю c, даже если ответ REST ещё не пришёл.
+    """
+
+    max_tracked_orders = 1024
+
+    def __init__(self, api_client: APIClient, logger: Logger, reconcile_interval: float = 300):
+        self.api_client = api_client
+        self.logger = logger
+        self.reconcile_interval = reconcile_interval
+        self.balances: defaultdict[str, Decimal] = defaultdict(Decimal)
+        self.synced_at: float | None = None
+        self.mismatches = 0
+        # clientOrderId своих ордеров, зарегистрированных до отправки
+        self._own_orders: dict[str, None] = {}
+        # Время биржи (мс) последних абсолютных балансов и последнего учтённого исполнения
+        self._position_time = 0
+        self._fill_time = 0
+        self._lock = asyncio.Lock()
+
+    def free(self, asset: str) -> Decimal:
+        return self.balances.get(asset, Decimal('0'))
+
+    def invalidate(self):
+        """Пометить учёт как недостоверный: следующая сверка пойдёт в REST"""
+        self.synced_at = None
+
+    @property
+    def reconcile_due(self) -> bool:
+        if self.synced_at is None:
+            return True
+        return asyncio.get_running_loop().time() - self.synced_at >= self.reconcile_interval
+
+    async def sync(self):
+        """Полная загрузка балансов через REST"""
+        async with self._lock:
+            await self._sync()
+
+    async def maybe_reconcile(self) -> bool:
+        """Сверка с биржей, если подошёл срок или учёт помечен недостоверным"""
+        async with self._lock:
+            # Проверка под блокировкой: менеджеры с общим учётом не дублируют запрос
+            if not self.reconcile_due:
+                return False
+            await self._sync()
+            return True
+
+    async def _sync(self):
+        balances = await self.api_client.get_balances()
+        fresh = {asset: Decimal(free) for asset, free in balances.items()}
+        diff = {
+            asset: (self.free(asset), fresh.get(asset, Decimal('0')))
+            for asset in self.balances.keys() | fresh.keys()
+            if self.free(asset) != fresh.get(asset, Decimal('0'))
+        }
+        if self.synced_at is not None and diff:
+            self.mismatches += 1
+            self.logger.warning(f"Расхождение локальных балансов с биржей: {diff}")
+        self.balances = defaultdict(Decimal, fresh)
+        self.synced_at = asyncio.get_running_loop().time()
+
+    def register(self) -> str:
+        """Новый clientOrderId своего ордера, регистрируется до отправки"""
+        client_order_id = uuid.uuid4().hex
+        self._own_orders[client_order_id] = None
+        if len(self._own_orders) > self.max_tracked_orders:
+            del self._own_orders[next(iter(self._own_orders))]
+        return client_order_id
+
+    def apply_fill(self, order: dict, base_asset: str, quote_asset: str):
+        """Учёт исполнения по ответу new_order"""
+        transact_time = order.get('transactTime')
+        if transact_time is not None:
+            if transact_time <= self._position_time:
+                # Стрим уже прислал балансы после этого исполнения
+                return
+            self._fill_time = max(self._fill_time, transact_time)
+
+        executed = Decimal(order['executedQty'])
+        quote = Decimal(order['cummulativeQuoteQty'])
+        if order['side'].upper() == 'BUY':
+            self.balances[base_asset] += executed
+            self.balances[quote_asset] -= quote
+        else:
+            self.balances[base_asset] -= executed
+            self.balances[quote_asset] += quote
+
+        for fill in order.get('fills', ()):
+            self.balances[fill['commissionAsset']] -= Decimal(fill['commission'])
+
+    async def put(self, event: dict):
+        """Приёмник событий user data stream (совместим с BaseWSClient.connect)"""
+        match event.get('e'):
+            case 'outboundAccountPosition':
+                self._apply_position(event)
+            case 'executionReport':
+                self._apply_execution(event)
+
+    def _apply_position(self, event: dict):
+        updated = event.get('u', event.get('E', 0))
+        if updated < max(self._position_time, self._fill_time):
+            # Пришло позже более нового состояния: перезапись откатила бы учтённые исполнения
+            return
+        self._position_time = updated
+        # Абсолютные значения биржи: сразу показывают расхождение с локальным учётом
+        for balance in event['B']:
+            asset, free = balance['a'], Decimal(balance['f'])
+            if self.balances.get(asset, Decimal('0')) != free:
+                self.logger.info(f"Баланс {asset} по стриму: {self.free(asset)} -> {free}")
+                self.balances[asset] = free
+
+    def _apply_execution(self, event: dict):
+        if event.get('x') != 'TRADE':
+            return
+        if event.get('c') in self._own_orders:
+            # Свой ордер учитывается по ответу и абсолютным балансам стрима
+            if event.get('X') == 'FILLED':
+                self._own_orders.pop(event['c'], None)
+            return
+        # Сделки по чужим ордерам (другой процесс, ручная торговля) без разбивки на активы
+        # не учесть, поэтому актуализируем учёт полной сверкой
+        self.logger.info(f"Исполнение стороннего ордера {event['i']} {event['s']}, требуется сверка")
+        self.invalidate()
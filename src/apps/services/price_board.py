@@ -0,0 +1,184 @@
+import argparse
+import os
+import struct
+import time
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+from apps.adapters.fixed_point import to_decimal
+
+# Заголовок: сигнатура, версия, число слотов, размер слота
+HEADER = struct.Struct('<4sIII')
+HEADER_SIZE = 64
+MAGIC = b'PBRD'
+VERSION = 1
+# seq, symbol, цена * 1e8, trade id, время сделки (мс), время публикации, pid, позиции, объём позиций * 1e8, состояние
+SLOT = struct.Struct('<Q16sqqqdiiq16s')
+SEQ = struct.Struct('<Q')
+# Слот занимает две линии кеша: соседние пары пишут разные процессы
+SLOT_SIZE = 128
+TICK = struct.Struct('<qqqd')
+TICK_OFFSET = 8 + 16
+POSITION = struct.Struct('<iiq16s')
+POSITION_OFFSET = TICK_OFFSET + TICK.size
+_pack_seq = SEQ.pack_into
+_pack_tick = TICK.pack_into
+_pack_position = POSITION.pack_into
+
+
+def _attach(name: str) -> SharedMemory:
+    """Подключение к существующему сегменту без передачи его resource_tracker
+
+    Иначе до Python 3.13 сегмент удаляется при выходе любого подключившегося процесса.
+    """
+    try:
+        return SharedMemory(name, track=False)
+    except TypeError:
+        # Без track регистрацию пропускаем: unregister снял бы и запись создателя,
+        # если процессы делят один resource_tracker (spawn)
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return SharedMemory(name)
+        finally:
+            resource_tracker.register = register
+
+
+class PriceBoard:
+    """Последние цены и состояние позиций всех пар в разделяемой памяти
+
+    Фиксированная раскладка: заголовок и по слоту на пару в порядке symbols.
+    У каждого слота один писатель (процесс, ведущий пару), запись защищена
+    seqlock: seq нечётный во время записи, читатель повторяет чтение, пока
+    seq до и после не совпадут и не станут чётными. Читатели (монитор,
+    риск-контроль) не обмениваются сообщениями с писателями. Рассчитано на
+    x86, где порядок записей в память сохраняется.
+    """
+
+    def __init__(self, shm: SharedMemory, owner: bool = False):
+        self.shm = shm
+        self.owner = owner
+        self.buffer = shm.buf
+        magic, version, slots, slot_size = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC or version != VERSION or slot_size != SLOT_SIZE:
+            raise ValueError(f"{shm.name}: не доска цен или другая версия раскладки")
+        self.symbols = [self._symbol(i) for i in range(slots)]
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+    @classmethod
+    def create(cls, name: str, symbols: list[str]) -> 'PriceBoard':
+        shm = SharedMemory(name, create=True, size=HEADER_SIZE + SLOT_SIZE * len(symbols))
+        HEADER.pack_into(shm.buf, 0, MAGIC, VERSION, len(symbols), SLOT_SIZE)
+        for i, symbol in enumerate(symbols):
+            SLOT.pack_into(shm.buf, HEADER_SIZE + i * SLOT_SIZE, 0, symbol.encode(), 0, 0, 0, 0.0, 0, 0, 0, b'')
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> 'PriceBoard':
+        return cls(_attach(name))
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def writer(self, symbol: str) -> 'BoardWriter':
+        return BoardWriter(self, self.index[symbol])
+
+    def read(self, index: int, retries: int = 1000) -> dict | None:
+        """Согласованная копия слота или None, если писатель не дал её прочитать"""
+        offset = HEADER_SIZE + index * SLOT_SIZE
+        buffer = self.buffer
+        for _ in range(retries):
+            before = SEQ.unpack_from(buffer, offset)[0]
+            if before & 1:
+                # Писатель вытеснен посреди записи: отдаём ему процессор
+                os.sched_yield()
+                continue
+            record = SLOT.unpack_from(buffer, offset)
+            if SEQ.unpack_from(buffer, offset)[0] == before:
+                break
+        else:
+            return None
+
+        _, symbol, price, trade_id, event_time, updated, pid, positions, exposure, state = record
+        return {
+            'symbol': symbol.rstrip(b'\0').decode(),
+            'price': to_decimal(price) if price else None,
+            'trade_id': trade_id,
+            'event_time': event_time,
+            'updated': updated,
+            'pid': pid,
+            'positions': positions,
+            'exposure': to_decimal(exposure),
+            'state': state.rstrip(b'\0').decode(),
+            'seq': before,
+        }
+
+    def snapshot(self) -> list[dict]:
+        return [record for record in map(self.read, range(len(self.symbols))) if record is not None]
+
+    def close(self):
+        self.buffer = None
+        self.shm.close()
+
+    def unlink(self):
+        if self.owner:
+            self.shm.unlink()
+
+    def _symbol(self, index: int) -> str:
+        offset = HEADER_SIZE + index * SLOT_SIZE + 8
+        return bytes(self.buffer[offset:offset + 16]).rstrip(b'\0').decode()
+
+
+class BoardWriter:
+    """Запись в слот одной пары; единственный писатель слота"""
+
+    __slots__ = ('buffer', 'offset', 'seq', 'pid')
+
+    def __init__(self, board: PriceBoard, index: int):
+        self.buffer = board.buffer
+        self.offset = HEADER_SIZE + index * SLOT_SIZE
+        # Перезапущенный процесс продолжает с чётного seq предыдущего писателя
+        seq = SEQ.unpack_from(self.buffer, self.offset)[0]
+        self.seq = seq + (seq & 1)
+        self.pid = os.getpid()
+
+    def publish_tick(self, tick):
+        buffer, offset, seq = self.buffer, self.offset, self.seq
+        _pack_seq(buffer, offset, seq + 1)
+        _pack_tick(buffer, offset + TICK_OFFSET, tick.fixed_price, tick.trade_id, tick.event_time, time.time())
+        self.seq = seq = seq + 2
+        _pack_seq(buffer, offset, seq)
+
+    def publish_position(self, positions: int, exposure: int, state: str):
+        buffer, offset, seq = self.buffer, self.offset, self.seq
+        _pack_seq(buffer, offset, seq + 1)
+        _pack_position(buffer, offset + POSITION_OFFSET, self.pid, positions, exposure, state.encode())
+        self.seq = seq = seq + 2
+        _pack_seq(buffer, offset, seq)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Print the shared-memory price board')
+    parser.add_argument('name', type=str, help='Board name (supervisor.py --board)')
+    parser.add_argument('--interval', type=float, default=0, help='Refresh every N seconds (0 - print once)')
+    args = parser.parse_args()
+
+    board = PriceBoard.attach(args.name)
+    try:
+        while True:
+            now = time.time()
+            for record in board.snapshot():
+                age = f"{now - record['updated']:.1f}s" if record['updated'] else '-'
+                print(f"{record['symbol']:<12} {str(record['price']):>20} {age:>8} pid={record['pid']:<7} "
+                      f"positions={record['positions']:<4} exposure={record['exposure']:f} {record['state']}")
+            if not args.interval:
+                break
+            time.sleep(args.interval)
+            print()
+    finally:
+        board.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Callable
+
+
+class PriceChannel:
+    """Канал между WS адаптером и TradeManager с хранением только последней цены
+
+    Новое значение перезаписывает ещё не прочитанное (такие тики считаются
+    схлопнутыми), поэтому память не растёт при всплесках, а решения
+    принимаются по самой свежей цене. Совместим с asyncio.Queue по put/get.
+    observer получает каждое значение до схлопывания (например, индикаторы).
+    """
+
+    def __init__(self, history: int = 0, observer: Callable[[Any], None] | None = None):
+        self.observer = observer
+        self._value: Any = None
+        self._pending = False
+        self._put_at = 0.0
+        self._event = asyncio.Event()
+        # Кольцо последних тиков (значение, время поступления) для стратегий
+        self.recent: deque | None = deque(maxlen=history) if history else None
+
+        self.received = 0
+        self.delivered = 0
+        self.coalesced = 0
+        self.last_dwell = 0.0
+        self.max_dwell = 0.0
+        self.total_dwell = 0.0
+
+    def put_nowait(self, value: Any):
+        now = time.monotonic()
+        self.received += 1
+        if self._pending:
+            self.coalesced += 1
+        self._value = value
+        self._put_at = now
+        self._pending = True
+        if self.recent is not None:
+            self.recent.append((value, now))
+        if self.observer is not None:
+            self.observer(value)
+        self._event.set()
+
+    async def put(self, value: Any):
+        self.put_nowait(value)
+
+    async def get(self) -> Any:
+        while not self._pending:
+            self._event.clear()
+            await self._event.wait()
+
+        dwell = time.monotonic() - self._put_at
+        self.last_dwell = dwell
+        self.total_dwell += dwell
+        if dwell > self.max_dwell:
+            self.max_dwell = dwell
+        self.delivered += 1
+
+        self._pending = False
+        value, self._value = self._value, None
+        return value
+
+    def qsize(self) -> int:
+        return int(self._pending)
+
+    def empty(self) -> bool:
+        return not self._pending
+
+    def stats(self) -> dict:
+        """Счётчики канала: принято, выдано, схлопнуто и время ожидания в канале"""
+        return {
+            'received': self.received,
+            'delivered': self.delivered,
+            'coalesced': self.coalesced,
+            'last_dwell_ms': round(self.last_dwell * 1000, 3),
+            'avg_dwell_ms': round(self.total_dwell / self.delivered * 1000, 3) if self.delivered else 0.0,
+            'max_dwell_ms': round(self.max_dwell * 1000, 3),
+        }
@@ -0,0 +1,158 @@
+import asyncio
+import time
+from decimal import Decimal
+from logging import Logger
+from typing import Callable
+
+from apps.adapters import BinanceDepthWSClient, BinanceStreamWSClient, BinanceUserDataWSClient
+from apps.adapters.binance.decoders import JsonDecoder
+from apps.adapters.client_base import APIClient
+from apps.adapters.order_book import OrderBook
+from apps.adapters.tick import Tick
+from apps.services.bars import BarBuilder
+from apps.services.indicators import TickIndicators
+from apps.services.latency import LatencyExporter, LatencyRecorder
+from apps.services.ledger import BalanceLedger
+from apps.services.price_board import PriceBoard
+from apps.services.state_journal import StateJournal
+from apps.services.tick_store import TickRecorder
+from apps.services.trade_handler import TradeManager
+
+
+class SymbolRouter:
+    """Раскладывает тики комбинированного потока по очередям менеджеров, каждый тик идёт и в бары"""
+
+    def __init__(self, queues: dict[str, asyncio.Queue], bars: BarBuilder | None = None):
+        self.queues = queues
+        self.bars = bars
+
+    async def put(self, tick: Tick):
+        if self.bars is not None:
+            self.bars.update(tick)
+        queue = self.queues.get(tick.symbol)
+        if queue is not None:
+            await queue.put(tick)
+
+
+class MultiSymbolRunner:
+    """Запуск нескольких пар в одном процессе поверх общих соединений"""
+
+    def __init__(
+            self,
+            api_client: APIClient,
+            symbols: list[str],
+            quantity: Decimal,
+            stop_loss: float,
+            take_profit: float,
+            timeout: int,
+            cooldown: int,
+            logger_factory: Callable[[str], Logger],
+            ws_logger: Logger,
+            recorder: TickRecorder | None = None,
+            decoder: JsonDecoder | None = None,
+            user_stream: bool = False,
+            reconcile_interval: float = 300,
+            latency: LatencyRecorder | None = None,
+            exporter: LatencyExporter | None = None,
+            indicator_factory: Callable[[], TickIndicators] | None = None,
+            volatility_factor: float = 0,
+            trend_entry: bool = False,
+            max_positions: int = 1,
+            board: PriceBoard | None = None,
+            state_dir: str | None = None,
+            depth: bool = False,
+            max_slippage: float = 0,
+            bars: BarBuilder | None = None,
+            started: float | None = None
+    ):
+        self.api_client = api_client
+        self.recorder = recorder
+        self.exporter = exporter
+        self.bars = bars
+        self.ws_logger = ws_logger
+        self.latency = latency
+        # Монотонная отметка запуска процесса для замера времени до первого соединения
+        self.started = started
+        # Один аккаунт - один учёт балансов на все пары
+        self.ledger = BalanceLedger(api_client, ws_logger, reconcile_interval)
+        self.books = {symbol: OrderBook(symbol) for symbol in dict.fromkeys(symbols)} if depth else {}
+        self.managers = {
+            symbol: TradeManager(
+                api_client=api_client,
+                ws_client=None,
+                symbol=symbol,
+                quantity=quantity,
+                stop_loss=stop_loss,
+                take_profit=take_profit,
+                timeout=timeout,
+                cooldown=cooldown,
+                logger=logger_factory(symbol),
+                ledger=self.ledger,
+                latency=latency,
+                indicators=indicator_factory() if indicator_factory else None,
+                volatility_factor=volatility_factor,
+                trend_entry=trend_entry,
+                max_positions=max_positions,
+                board=board.writer(symbol) if board else None,
+                journal=StateJournal(state_dir, symbol) if state_dir else None,
+                depth=self.books.get(symbol),
+                max_slippage=max_slippage,
+                bars=bars.series[symbol] if bars else None
+            )
+            for symbol in dict.fromkeys(symbols)
+        }
+        self.ws_clients = BinanceStreamWSClient.shard(
+            list(self.managers), ws_logger, recorder, decoder, api_client
+        )
+        self.depth_clients = BinanceDepthWSClient.shard(self.books, ws_logger, api_client, decoder) if depth else []
+        self.router = SymbolRouter({
+            symbol: manager.price_queue for symbol, manager in self.managers.items()
+        }, bars)
+        self.user_data_client = BinanceUserDataWSClient(api_client, ws_logger) if user_stream else None
+
+    async def run(self):
+        """Запуск всех соединений и менеджеров"""
+        tasks = [asyncio.create_task(ws.connect(self.router)) for ws in self.ws_clients]
+        if self.started is not None:
+            tasks.append(asyncio.create_task(self._log_connected()))
+        # Стаканы читаются менеджерами напрямую, очередь потоку стакана не нужна
+        tasks += [asyncio.create_task(ws.connect(None)) for ws in self.depth_clients]
+        if self.user_data_client:
+            tasks.append(asyncio.create_task(self.user_data_client.connect(self.ledger)))
+        if self.exporter:
+            tasks.append(asyncio.create_task(self.exporter.run()))
+        if self.bars:
+            tasks.append(asyncio.create_task(self.bars.run()))
+        exchange_info = getattr(self.api_client, 'exchange_info', None)
+        if exchange_info:
+            tasks.append(asyncio.create_task(exchange_info.run()))
+        maintain = getattr(self.api_client, 'maintain', None)
+        if maintain:
+            tasks.append(asyncio.create_task(maintain()))
+        tasks += [asyncio.create_task(manager.start_trading()) for manager in self.managers.values()]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            for ws in (*self.ws_clients, *self.depth_clients):
+                await ws.close()
+            if self.user_data_client:
+                await self.user_data_client.close()
+            if self.recorder:
+                self.recorder.close()
+            if self.bars:
+                self.bars.close()
+
+    async def _log_connected(self):
+        """Время от запуска процесса до первого соединения потока сделок"""
+        waiters = [asyncio.ensure_future(ws.wait_connected()) for ws in self.ws_clients]
+        try:
+            await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+        elapsed = time.monotonic() - self.started
+        self.ws_logger.info(f"Поток сделок подключён через {elapsed * 1000:.1f} мс после запуска")
+        if self.latency:
+            self.latency.record('startup_connect', 'process', elapsed)
@@ -0,0 +1,120 @@
+import json
+import os
+import time
+
+
+class StateJournal:
+    """Журнал состояния торговой пары для тёплого перезапуска
+
+    Переходы (открытие позиции, начало продажи, закрытие, кулдаун) дописываются
+    в {name}.wal по строке JSON одним вызовом write, так что запись переживает
+    падение процесса. Раз в snapshot_every событий владелец сохраняет снимок
+    полного состояния в {name}.snapshot.json (через временный файл и
+    os.replace) и журнал обнуляется. Сроки хранятся временем эпохи в мс:
+    после перезапуска остаток считается от текущего времени.
+    """
+
+    def __init__(self, directory: str, name: str, snapshot_every: int = 1000):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f'{name}.wal')
+        self.snapshot_path = os.path.join(directory, f'{name}.snapshot.json')
+        self.snapshot_every = snapshot_every
+        self.seq = 0
+        self.pending = 0
+        self.records = 0
+        self.snapshots = 0
+        self._fd: int | None = None
+
+    @property
+    def due(self) -> bool:
+        return self.pending >= self.snapshot_every
+
+    def load(self) -> dict:
+        """Состояние из снимка и журнала после него
+
+        {'positions': {id: поля}, 'exiting': {id: поля}, 'cooldown_until': мс | None}.
+        Недописанная последняя строка (падение во время записи) пропускается.
+        """
+        state = {'seq': 0, 'positions': [], 'exiting': [], 'cooldown_until': None}
+        try:
+            with open(self.snapshot_path, encoding='utf-8') as f:
+                state.update(json.load(f))
+        except FileNotFoundError:
+            pass
+        positions = {fields['id']: fields for fields in state['positions']}
+        exiting = {fields['id']: fields for fields in state['exiting']}
+        cooldown_until = state['cooldown_until']
+        self.seq = state['seq']
+
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            lines = []
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            # Журнал мог остаться необнулённым после снимка: уже учтённые записи пропускаются
+            if record['seq'] <= self.seq:
+                continue
+            self.seq = record['seq']
+            match record['e']:
+                case 'open':
+                    # Повторное открытие: позиция вернулась в книгу после неудачной продажи
+                    exiting.pop(record['id'], None)
+                    positions[record['id']] = record
+                case 'exit':
+                    for position_id in record['ids']:
+                        if position_id in positions:
+                            exiting[position_id] = positions.pop(position_id)
+                case 'close':
+                    for position_id in record['ids']:
+                        positions.pop(position_id, None)
+                        exiting.pop(position_id, None)
+                case 'cooldown':
+                    cooldown_until = record['until']
+        return {'positions': positions, 'exiting': exiting, 'cooldown_until': cooldown_until}
+
+    def record(self, event: str, **fields):
+        self.seq += 1
+        line = json.dumps({'e': event, 'seq': self.seq, **fields}, separators=(',', ':'), default=str) + '\n'
+        if self._fd is None:
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        os.write(self._fd, line.encode())
+        self.pending += 1
+        self.records += 1
+
+    def snapshot(self, positions: list[dict], exiting: list[dict], cooldown_until: int | None):
+        """Снимок полного состояния и обнуление журнала"""
+        state = {
+            'seq': self.seq,
+            'ts': int(time.time() * 1000),
+            'positions': positions,
+            'exiting': exiting,
+            'cooldown_until': cooldown_until,
+        }
+        tmp = self.snapshot_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(state, f, separators=(',', ':'), default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot_path)
+        if self._fd is None:
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        os.ftruncate(self._fd, 0)
+        self.pending = 0
+        self.snapshots += 1
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def stats(self) -> dict:
+        return {
+            'records': self.records,
+            'snapshots': self.snapshots,
+            'pending': self.pending,
+        }
@@ -0,0 +1,199 @@
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+
+import numpy as np
+
+from apps.adapters.fixed_point import SCALE
+from apps.services.tick_store import TickStore
+
+# Столбцы сетки параметров
+PROFIT, LOSS, WAIT, COOLDOWN = range(4)
+
+
+def load_csv_arrays(path: str) -> tuple[np.ndarray, np.ndarray]:
+    """Время (с) и цены сделок из CSV формата Binance public data"""
+    times, prices = [], []
+    with open(path, newline='') as f:
+        for row in csv.reader(f):
+            if not row or not row[0].isdigit():
+                continue
+            ts = int(row[4])
+            times.append(ts / 1e6 if ts > 10 ** 14 else ts / 1e3)
+            prices.append(float(row[1]))
+    return np.array(times), np.array(prices)
+
+
+def load_store_arrays(root: str, symbol: str, days: list[str] | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """Время (с) и цены сделок из хранилища TickRecorder без разбора записей по одной"""
+    store = TickStore(root)
+    times, prices = [], []
+    for day in days or store.days(symbol):
+        with store.open(symbol, day) as view:
+            records = view.array()
+            times.append(records['event_time'] / 1e3)
+            prices.append(records['price'] / SCALE)
+            del records
+    if not times:
+        return np.empty(0), np.empty(0)
+    return np.concatenate(times), np.concatenate(prices)
+
+
+def make_grid(profits, losses, waits, cooldowns) -> np.ndarray:
+    """Все сочетания параметров, строка - (profit %, loss %, wait с, cooldown с)"""
+    return np.array(list(product(profits, losses, waits, cooldowns)), dtype=float).reshape(-1, 4)
+
+
+class SparseTable:
+    """Минимумы и максимумы цен на отрезках длины 2^k для поиска первого пробоя за O(log n)"""
+
+    def __init__(self, prices: np.ndarray):
+        self.prices = prices
+        self.mins = [prices]
+        self.maxs = [prices]
+        width = 1
+        while width * 2 <= len(prices):
+            self.mins.append(np.minimum(self.mins[-1][:-width], self.mins[-1][width:]))
+            self.maxs.append(np.maximum(self.maxs[-1][:-width], self.maxs[-1][width:]))
+            width *= 2
+
+    def first_at_or_below(self, start: np.ndarray, end: np.ndarray, limit: np.ndarray) -> np.ndarray:
+        """Первый индекс в [start, end] с ценой <= limit для каждой строки, иначе len(prices)"""
+        return self._first(self.mins, start, end, limit, below=True)
+
+    def first_at_or_above(self, start: np.ndarray, end: np.ndarray, limit: np.ndarray) -> np.ndarray:
+        return self._first(self.maxs, start, end, limit, below=False)
+
+    def _first(self, levels: list[np.ndarray], start, end, limit, below: bool) -> np.ndarray:
+        # Спуск по степеням двойки: отрезок без пробоя пропускается целиком
+        position = start.copy()
+        for k in range(len(levels) - 1, -1, -1):
+            level = levels[k]
+            width = 1 << k
+            fits = position + (width - 1) <= end
+            values = level[np.minimum(position, len(level) - 1)]
+            clear = values > limit if below else values < limit
+            position += np.where(fits & clear, width, 0)
+
+        n = len(self.prices)
+        values = self.prices[np.minimum(position, n - 1)]
+        hit = (position <= end) & (values <= limit if below else values >= limit)
+        return np.where(hit, position, n)
+
+
+def simulate(times: np.ndarray,
+             table: SparseTable,
+             grid: np.ndarray,
+             quantity: float,
+             commission: float) -> dict[str, np.ndarray]:
+    """Прогон стратегии TradeManager для всех строк сетки одновременно
+
+    Покупка по текущей цене, выход по первому тику за TP/SL или по таймеру
+    wait по последней цене, затем кулдаун и новая покупка по последней цене.
+    Каждая итерация - одна сделка для всех ещё активных сочетаний.
+    """
+    prices = table.prices
+    n = len(prices)
+    m = len(grid)
+    last_time = times[-1]
+    take_profit = 1 + grid[:, PROFIT] / 100
+    stop_loss = 1 - grid[:, LOSS] / 100
+    fee = 1 - commission
+
+    entry_index = np.zeros(m, dtype=np.int64)
+    entry_time = np.full(m, times[0])
+    active = np.ones(m, dtype=bool)
+    open_position = np.zeros(m, dtype=bool)
+    trades = np.zeros(m, dtype=np.int64)
+    wins = np.zeros(m, dtype=np.int64)
+    equity = np.zeros(m)
+    peak = np.zeros(m)
+    drawdown = np.zeros(m)
+
+    while active.any():
+        rows = np.flatnonzero(active)
+        index = entry_index[rows]
+        entry_price = prices[index]
+        deadline = entry_time[rows] + grid[rows, WAIT]
+        # Последний тик не позже таймера: его цена - цена выхода по таймауту
+        last = np.searchsorted(times, deadline, side='right') - 1
+        start = index + 1
+
+        exit_index = np.minimum(
+            table.first_at_or_below(start, last, entry_price * stop_loss[rows]),
+            table.first_at_or_above(start, last, entry_price * take_profit[rows]),
+        )
+        hit = exit_index < n
+        timed_out = ~hit & (deadline <= last_time)
+        closed = hit | timed_out
+
+        exit_price = np.where(hit, prices[np.minimum(exit_index, n - 1)], prices[last])
+        exit_time = np.where(hit, times[np.minimum(exit_index, n - 1)], deadline)
+        pnl = quantity * fee * exit_price * fee - quantity * entry_price
+
+        done = rows[closed]
+        pnl = pnl[closed]
+        trades[done] += 1
+        wins[done] += pnl > 0
+        equity[done] += pnl
+        peak[done] = np.maximum(peak[done], equity[done])
+        drawdown[done] = np.maximum(drawdown[done], peak[done] - equity[done])
+        open_position[rows[~closed]] = True
+
+        next_time = exit_time[closed] + grid[done, COOLDOWN]
+        again = next_time <= last_time
+        entry_time[done] = next_time
+        entry_index[done] = np.searchsorted(times, next_time, side='right') - 1
+        active[rows] = False
+        active[done[again]] = True
+
+    return {
+        'trades': trades,
+        'wins': wins,
+        'pnl': equity,
+        'max_drawdown': drawdown,
+        'open_position': open_position,
+    }
+
+
+_worker: dict = {}
+
+
+def _init_worker(times: np.ndarray, prices: np.ndarray, quantity: float, commission: float):
+    _worker.update(times=times, table=SparseTable(prices), quantity=quantity, commission=commission)
+
+
+def _run_chunk(grid: np.ndarray) -> dict[str, np.ndarray]:
+    return simulate(_worker['times'], _worker['table'], grid, _worker['quantity'], _worker['commission'])
+
+
+def sweep(times: np.ndarray,
+          prices: np.ndarray,
+          grid: np.ndarray,
+          quantity: float,
+          commission: float,
+          workers: int | None = None,
+          chunk: int | None = None) -> dict[str, np.ndarray]:
+    """Оценка сетки параметров частями в пуле процессов, результаты в порядке строк сетки
+
+    Стоимость итерации simulate почти не зависит от числа строк, поэтому части
+    крупные: по умолчанию две на процесс.
+    """
+    workers = workers or os.cpu_count() or 1
+    if not chunk:
+        chunk = max(-(-len(grid) // (workers * 2 if workers > 1 else 1)), 1)
+    chunks = [grid[i:i + chunk] for i in range(0, len(grid), chunk)]
+    if workers == 1:
+        _init_worker(times, prices, quantity, commission)
+        parts = [_run_chunk(part) for part in chunks]
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(times, prices, quantity, commission)) as pool:
+            parts = list(pool.map(_run_chunk, chunks))
+
+    results = {key: np.concatenate([part[key] for part in parts]) for key in parts[0]} if parts else {}
+    trades = results.get('trades', np.zeros(0))
+    results['win_rate'] = np.divide(results.get('wins', trades) * 100, trades,
+                                    out=np.zeros(len(trades)), where=trades > 0)
+    return results
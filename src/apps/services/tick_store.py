@@ -0,0 +1,158 @@
+import mmap
+import os
+import struct
+from datetime import datetime, timezone
+from typing import BinaryIO, Iterator
+
+# trade_id, event_time (мс), price * 1e8, qty * 1e8, buyer_maker + выравнивание до 40 байт
+RECORD = struct.Struct('<qqqq?7x')
+DAY_MS = 86_400_000
+EXTENSION = '.ticks'
+
+
+def tick_dtype():
+    """NumPy dtype, совпадающий с форматом записи RECORD"""
+    import numpy as np
+
+    return np.dtype([
+        ('trade_id', '<i8'),
+        ('event_time', '<i8'),
+        ('price', '<i8'),
+        ('qty', '<i8'),
+        ('buyer_maker', '?'),
+        ('_pad', 'V7'),
+    ])
+
+
+def partition_path(root: str, symbol: str, day: int) -> str:
+    """Путь файла пары за сутки: <root>/<SYMBOL>/<YYYY-MM-DD>.ticks"""
+    date = datetime.fromtimestamp(day * DAY_MS / 1000, tz=timezone.utc).strftime('%Y-%m-%d')
+    return os.path.join(root, symbol.upper(), f"{date}{EXTENSION}")
+
+
+class TickRecorder:
+    """Запись сделок в append-only файлы фиксированной ширины по парам и дням"""
+
+    def __init__(self, root: str, buffer_records: int = 1024):
+        self.root = root
+        self.buffer_size = RECORD.size * buffer_records
+        self.records = 0
+        self._files: dict[str, tuple[int, BinaryIO]] = {}
+
+    def append(self,
+               symbol: str,
+               trade_id: int,
+               event_time: int,
+               price: int,
+               qty: int,
+               buyer_maker: bool):
+        """price и qty - целые с масштабом 1e8 (Tick.fixed_price, Tick.fixed_qty)"""
+        day = event_time // DAY_MS
+        current = self._files.get(symbol)
+        if current is None or current[0] != day:
+            file = self._open(symbol, day, current)
+        else:
+            file = current[1]
+
+        file.write(RECORD.pack(trade_id, event_time, price, qty, buyer_maker))
+        self.records += 1
+
+    def _open(self, symbol: str, day: int, current: tuple[int, BinaryIO] | None) -> BinaryIO:
+        if current is not None:
+            current[1].close()
+
+        path = partition_path(self.root, symbol, day)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        file = open(path, 'ab', buffering=self.buffer_size)
+        # Запись, оборванная при аварии, отрезается: иначе новые записи встанут
+        # со сдвигом и весь остаток файла прочитается как мусор
+        size = file.tell()
+        if size % RECORD.size:
+            file.truncate(size - size % RECORD.size)
+        self._files[symbol] = (day, file)
+        return file
+
+    def flush(self):
+        for _, file in self._files.values():
+            file.flush()
+
+    def close(self):
+        for _, file in self._files.values():
+            file.close()
+        self._files.clear()
+
+
+class TickView:
+    """Отображённый в память файл сделок без копирования данных
+
+    array() возвращает структурированный NumPy-массив поверх того же буфера,
+    а итерация отдаёт кортежи RECORD без зависимости от NumPy.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self.buffer = memoryview(self._mmap or b'')[:size - size % RECORD.size]
+
+    def __len__(self) -> int:
+        return len(self.buffer) // RECORD.size
+
+    def __getitem__(self, index: int) -> tuple[int, int, int, int, bool]:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return RECORD.unpack_from(self.buffer, index * RECORD.size)
+
+    def __iter__(self) -> Iterator[tuple[int, int, int, int, bool]]:
+        return RECORD.iter_unpack(self.buffer)
+
+    def array(self):
+        import numpy as np
+
+        return np.frombuffer(self.buffer, dtype=tick_dtype())
+
+    def close(self):
+        try:
+            self.buffer.release()
+            if self._mmap is not None:
+                self._mmap.close()
+        except BufferError:
+            # Живые NumPy-массивы держат буфер, отображение закроется вместе с ними
+            pass
+        self._file.close()
+
+    def __enter__(self) -> 'TickView':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TickStore:
+    """Чтение записанных TickRecorder сделок"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def symbols(self) -> list[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, name)))
+
+    def days(self, symbol: str) -> list[str]:
+        directory = os.path.join(self.root, symbol.upper())
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name.removesuffix(EXTENSION) for name in os.listdir(directory) if name.endswith(EXTENSION))
+
+    def open(self, symbol: str, day: str) -> TickView:
+        return TickView(os.path.join(self.root, symbol.upper(), f"{day}{EXTENSION}"))
+
+    def iter_ticks(self, symbol: str, days: list[str] | None = None) -> Iterator[tuple[int, int, int, int, bool]]:
+        """Последовательный обход сделок пары по дням"""
+        for day in days or self.days(symbol):
+            with self.open(symbol, day) as view:
+                yield from view
@@ -4,9 +4,39 @@ from decimal import Decimal
 from logging import Logger
 
 from apps.adapters.client_base import OrderType, SideType
+from apps.adapters.fixed_point import SCALE, ceil_scaled, floor_scaled, to_decimal
+from apps.adapters.order_book import OrderBook
+from apps.adapters.symbol_info import OrderRejected, SymbolInfo
+from apps.services.bars import BarAggregator
+from apps.services.indicators import TickIndicators
+from apps.services.latency import LatencyRecorder
+from apps.services.ledger import BalanceLedger
+from apps.services.price_board import BoardWriter
+from apps.services.price_channel import PriceChannel
+from apps.services.state_journal import StateJournal
+from apps.services.trigger_book import Position, TimerWheel, TriggerBook
+from base.enum import BaseEnum
+
+
+class TradeState(BaseEnum):
+    """Состояния цикла входа; выходы из позиций обрабатываются независимо"""
+    WAITING_PRICE = 'waiting_price'
+    READY = 'ready'
+    BUYING = 'buying'
+    # Открыто max_positions позиций, новый вход после закрытия одной из них
+    POSITION = 'position'
+    COOLDOWN = 'cooldown'
 
 
 class TradeManager:
+    """Торговый цикл по одной паре
+
+    Открытые позиции лежат в TriggerBook с абсолютными ценами стопа и
+    тейк-профита, посчитанными при входе, таймауты - на общем TimerWheel.
+    При max_positions > 1 входы повторяются через cooldown, пока не открыто
+    max_positions позиций; сработавшие на одном тике позиции продаются одним ордером.
+    """
+
     def __init__(
             self,
             api_client,
@@ -17,7 +47,19 @@ class TradeManager:
             take_profit: float,
             timeout: int,
             cooldown: int,
-            logger: Logger
+            logger: Logger,
+            price_history: int = 0,
+            ledger: BalanceLedger | None = None,
+            latency: LatencyRecorder | None = None,
+            indicators: TickIndicators | None = None,
+            volatility_factor: float = 0,
+            trend_entry: bool = False,
+            max_positions: int = 1,
+            board: BoardWriter | None = None,
+            journal: StateJournal | None = None,
+            depth: OrderBook | None = None,
+            max_slippage: float = 0,
+            bars: dict[str, BarAggregator] | None = None
     ):
         self.api_client = api_client
         self.ws_client = ws_client
@@ -28,54 +70,154 @@ class TradeManager:
         self.timeout = timeout
         self.cooldown = cooldown
         self.logger = logger
-
-        self.position_open = False
-        self.cooldown_open = False
-        self.entry_price: Decimal | None = None
-        self.current_price: Decimal | None = None
-        self.timer_task: asyncio.Task | None = None
-        self.price_queue = asyncio.Queue()
-        self.balance_crypto = Decimal('0')
-        self.balance_usdt = Decimal('0')
+        self.ledger = ledger or BalanceLedger(api_client, logger)
+        self.latency = latency
+        # Индикаторы получают каждую сделку до схлопывания в канале цен
+        self.indicators = indicators
+        # Бары пары по видам ('1m', 'v0.5'): история закрытых баров для стратегий
+        self.bars = bars or {}
+        # Пороги выхода не меньше volatility_factor * волатильности окна
+        self.volatility_factor = volatility_factor
+        # Вход только при цене выше EMA
+        self.trend_entry = trend_entry
+        self.max_positions = max_positions
+        # Слот пары на доске цен: последняя цена и позиции для процессов мониторинга
+        self.board = board
+        # Журнал переходов для восстановления позиций и кулдауна после перезапуска
+        self.journal = journal
+        # Локальный стакан: выходы проверяются по цене продажи объёма входа, а не по последней сделке
+        self.depth = depth
+        # Допустимое проскальзывание входа в процентах от лучшего аска, 0 - без ограничения
+        self.max_slippage = max_slippage
+        self._exit_quantity = floor_scaled(quantity)
+        if depth is not None:
+            depth.observer = self._on_depth
+        # Уточняются по exchangeInfo при запуске, если клиент его предоставляет
+        self.symbol_info: SymbolInfo | None = None
+        self.quote_asset = 'USDT'
+        self.base_asset = symbol.replace(self.quote_asset, '')
+
+        self.state = TradeState.WAITING_PRICE
+        # Последняя цена целым с масштабом 1e8, Decimal - только по запросу current_price
+        self.last_price: int | None = None
+        self.book = TriggerBook()
+        self.timers = TimerWheel(self._on_timeout)
+        # Сработавшие позиции в ожидании продажи и позиции продаваемого сейчас ордера
+        self._exits: list[Position] = []
+        self.exiting: list[Position] = []
+        self.cooldown_timer: asyncio.TimerHandle | None = None
+        # Конец кулдауна временем эпохи в мс, для журнала
+        self._cooldown_until: int | None = None
+        self.price_queue = PriceChannel(
+            history=price_history,
+            observer=indicators.update_tick if indicators else None
+        )
+        self._wakeup = asyncio.Event()
+        # Монотонные отметки для замера задержек: приём последнего тика и событие, запустившее ордер
+        self._last_received = 0.0
+        self._trigger_at = 0.0
+        self._trigger_received = 0.0
+        # Начало запуска до первого обработанного тика
+        self._started = 0.0
+
+    @property
+    def current_price(self) -> Decimal | None:
+        return to_decimal(self.last_price) if self.last_price is not None else None
+
+    @property
+    def position_open(self) -> bool:
+        return bool(self.book or self._exits or self.exiting)
+
+    @property
+    def cooldown_open(self) -> bool:
+        return self.state is TradeState.COOLDOWN
+
+    @property
+    def balance_crypto(self) -> Decimal:
+        return self.ledger.free(self.base_asset)
+
+    @property
+    def balance_usdt(self) -> Decimal:
+        return self.ledger.free(self.quote_asset)
 
     async def start_trading(self):
         """Запуск торгового процесса"""
         self.logger.info(f"{'#' * 10} Запуск бота! {'#' * 10}")
+        self._started = time.monotonic()
+        await self._load_symbol_info()
+        positions, exits = self._restore()
+        if positions:
+            await self._reconcile_restored(positions)
         await self._update_balances()
+        if exits:
+            self._resume_exits(exits)
+        if self.journal:
+            # Восстановленные позиции получили новые id: журнал начинается с их снимка
+            self._journal_snapshot()
+        self._publish_position()
+        self.logger.info("Цена не получена, ожидание...")
         try:
             tasks = [
-                asyncio.create_task(self.ws_client.connect(self.price_queue)),
                 asyncio.create_task(self._price_listener()),
                 asyncio.create_task(self._trading_loop())
             ]
+            # Без собственного клиента цены поступают в price_queue извне (MultiSymbolRunner)
+            if self.ws_client:
+                tasks.append(asyncio.create_task(self.ws_client.connect(self.price_queue)))
             await asyncio.gather(*tasks)
         except Exception as e:
             self.logger.error(f"Критическая ошибка: {str(e)}")
         finally:
             await self._shutdown()
 
+    async def _load_symbol_info(self):
+        try:
+            self.symbol_info = await self.api_client.get_symbol_info(self.symbol)
+        except Exception as e:
+            self.logger.error(f"Ошибка получения параметров пары: {str(e)}")
+        if self.symbol_info:
+            self.base_asset = self.symbol_info.base_asset
+            self.quote_asset = self.symbol_info.quote_asset
+            self.logger.info(f"Параметры пары: {self.symbol_info}")
+
     async def _shutdown(self):
         """Корректное завершение работы"""
         self.logger.info("Завершение работы...")
-        if self.timer_task:
-            self.timer_task.cancel()
-        await self.ws_client.close()
+        self.logger.info(f"Канал цен: {self.price_queue.stats()}")
+        self.logger.info(f"Позиции: {self.book.stats()}, таймауты: {self.timers.stats()}")
+        if self.journal:
+            self._journal_snapshot()
+            self.journal.close()
+        self.timers.close()
+        if self.cooldown_timer:
+            self.cooldown_timer.cancel()
+            self.cooldown_timer = None
+        if self.ws_client:
+            await self.ws_client.close()
+
+    def _set_state(self, state: TradeState):
+        """Переход в новое состояние с пробуждением торгового цикла"""
+        self.state = state
+        self._wakeup.set()
+        self._publish_position()
+
+    def _publish_position(self):
+        """Состояние и открытые позиции пары на доску цен"""
+        if self.board:
+            positions = [*self.book, *self._exits, *self.exiting]
+            exposure = floor_scaled(sum(position.quantity for position in positions))
+            self.board.publish_position(len(positions), exposure, self.state.value)
 
     async def _trading_loop(self):
-        """Основной торговый цикл"""
+        """Основной торговый цикл: просыпается только по событиям"""
         while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
             try:
-                if self.current_price is None:
-                    self.logger.warning("Цена не получена, ожидание...")
-                    await asyncio.sleep(5)
-                    continue
-
-                if not self.position_open and not self.cooldown_open:
-                    if await self._buy():
-                        self._start_sell_timer()
-
-                await asyncio.sleep(0.1)
-
+                if self._exits:
+                    await self._sell()
+                if self.state is TradeState.READY:
+                    await self._buy()
             except Exception as e:
                 self.logger.error(f"Ошибка цикла: {str(e)}")
 
@@ -83,152 +225,414 @@ class TradeManager:
         """Обработчик обновлений цены"""
         while True:
             try:
-                price = await asyncio.wait_for(
-                    self.price_queue.get(),
-                    timeout=30
-                )
-                self.current_price = Decimal(str(price))
-                if self.position_open or self.current_price:
-                    await self._check_conditions()
+                async with asyncio.timeout(30):
+                    tick = await self.price_queue.get()
+                if self.latency:
+                    self.latency.record_tick(tick, time.monotonic())
+                self._last_received = tick.received
+                self.last_price = tick.fixed_price
+                if self.board:
+                    self.board.publish_tick(tick)
+                self._on_price()
+                if self._started:
+                    self._log_startup()
             except asyncio.TimeoutError:
-                self.logger.warning("Нет новых данных цены 30 секунд")
+                self.logger.warning(f"Нет новых данных цены 30 секунд. Канал цен: {self.price_queue.stats()}")
             except Exception as e:
                 self.logger.error(f"Ошибка получения цены: {str(e)}")
 
-    def _start_sell_timer(self):
-        """Запуск таймера"""
-        if self.timer_task and not self.timer_task.done():
-            self.logger.debug("Таймер уже активен")
-            return
+    def _log_startup(self):
+        startup, self._started = time.monotonic() - self._started, 0.0
+        self.logger.info(f"Первый тик через {startup * 1000:.1f} мс после запуска")
+        if self.latency:
+            self.latency.record('startup', self.symbol, startup)
+
+    def _restore(self) -> tuple[list[Position], list[Position]]:
+        """Позиции и кулдаун из журнала; сроки пересчитываются по оставшимся миллисекундам
+
+        Возвращает открытые позиции и позиции, продажа которых прервалась перезапуском.
+        """
+        if not self.journal:
+            return [], []
+        state = self.journal.load()
+        loop = asyncio.get_running_loop()
+        loop_now, wall_now = loop.time(), time.time() * 1000
+        positions = [self._restored_position(fields, loop_now, wall_now) for fields in state['positions'].values()]
+        exits = [self._restored_position(fields, loop_now, wall_now) for fields in state['exiting'].values()]
+        for position in positions:
+            self.book.add(position)
+            # Истёкший за время простоя срок срабатывает на первой итерации loop
+            self.timers.schedule(position)
+
+        remaining = (state['cooldown_until'] or 0) - wall_now
+        if len(self.book) >= self.max_positions:
+            self.state = TradeState.POSITION
+        elif remaining > 0:
+            self.state = TradeState.COOLDOWN
+            self._cooldown_until = state['cooldown_until']
+            self.cooldown_timer = loop.call_later(remaining / 1000, self._end_cooldown)
+        if positions or exits or remaining > 0:
+            self.logger.info(f"Восстановлено из журнала: позиций {len(positions)}, "
+                             f"прерванных продаж {len(exits)}, кулдаун {max(remaining, 0):.0f} мс")
+        return positions, exits
+
+    def _restored_position(self, fields: dict, loop_now: float, wall_now: float) -> Position:
+        return Position(
+            symbol=self.symbol,
+            quantity=Decimal(fields['quantity']),
+            entry_price=Decimal(fields['entry_price']),
+            stop_price=fields['stop'],
+            take_price=fields['take'],
+            deadline=loop_now + (fields['deadline'] - wall_now) / 1000,
+            order_id=fields['order_id']
+        )
 
-        self.timer_task = asyncio.create_task(self._sell_timer())
+    async def _reconcile_restored(self, positions: list[Position]):
+        """Сверка восстановленных позиций с биржей: покупка должна быть исполнена"""
+        checked = [position for position in positions if position.order_id is not None]
+        orders = await asyncio.gather(
+            *(self.api_client.get_order(position.order_id, self.symbol) for position in checked),
+            return_exceptions=True
+        )
+        for position, order in zip(checked, orders):
+            if isinstance(order, Exception):
+                self.logger.warning(f"Не удалось сверить позицию {position}: {str(order)}")
+            elif order.get('status') != 'FILLED':
+                self.book.remove(position)
+                self.logger.warning(f"Ордер покупки {position.order_id} в статусе {order.get('status')}, "
+                                    f"позиция {position} снята")
+        if self.state is TradeState.POSITION and len(self.book) < self.max_positions:
+            self.state = TradeState.WAITING_PRICE
+
+    def _resume_exits(self, positions: list[Position]):
+        """Продажа, прерванная перезапуском: прошла ли она, видно по балансу после сверки"""
+        held = sum(position.quantity for position in self.book)
+        expected = sum(position.quantity for position in positions)
+        if self.balance_crypto - held < expected / 2:
+            self.logger.info(f"Продажа позиций {positions} исполнена до перезапуска")
+            return
+        for position in positions:
+            position.open = False
+            position.reason = 'Restart'
+            self._request_exit(position)
+
+    def _journal(self, event: str, **fields):
+        """Переход в журнал состояния; разросшийся журнал сворачивается в снимок"""
+        if self.journal:
+            self.journal.record(event, **fields)
+            if self.journal.due:
+                self._journal_snapshot()
+
+    def _journal_snapshot(self):
+        # Ожидающие продажи позиции ещё не переданы в ордер и восстанавливаются как открытые
+        self.journal.snapshot(
+            positions=[self._journal_fields(position) for position in (*self.book, *self._exits)],
+            exiting=[self._journal_fields(position) for position in self.exiting],
+            cooldown_until=self._cooldown_until if self.cooldown_timer else None
+        )
 
-    async def _sell_timer(self):
+    def _journal_fields(self, position: Position) -> dict:
+        deadline = time.time() + position.deadline - asyncio.get_running_loop().time()
+        return {
+            'id': position.id,
+            'quantity': str(position.quantity),
+            'entry_price': str(position.entry_price),
+            'stop': position.stop_price,
+            'take': position.take_price,
+            'deadline': int(deadline * 1000),
+            'order_id': position.order_id,
+        }
+
+    def _on_price(self):
+        """Событие: пришла новая цена"""
+        if self.book:
+            price = self.last_price if self.depth is None else self._exit_price()
+            for position in self.book.pop_triggered(price):
+                self._request_exit(position, self._last_received)
+        if self.state is TradeState.WAITING_PRICE and self._entry_allowed():
+            self._mark_trigger(self._last_received)
+            self._set_state(TradeState.READY)
+
+    def _on_depth(self):
+        """Событие: обновился стакан; исполнимая цена могла дойти до стопа без новых сделок"""
+        if self.book and self.last_price is not None:
+            for position in self.book.pop_triggered(self._exit_price()):
+                self._request_exit(position)
+
+    def _exit_price(self) -> int:
+        """Средняя цена продажи объёма входа по стакану, без синхронизированного стакана - последняя сделка"""
+        price = self.depth.expected_price(SideType.SELL.value, self._exit_quantity)
+        return self.last_price if price is None else price
+
+    def _entry_quantity(self) -> Decimal:
+        """Объём входа, урезанный до глубины стакана в пределах max_slippage от лучшего аска"""
+        if self.depth is None or not self.max_slippage or self.depth.best_ask is None:
+            return self.quantity
+        limit = floor_scaled(to_decimal(self.depth.best_ask) * (1 + Decimal(str(self.max_slippage)) / 100))
+        return min(self.quantity, to_decimal(self.depth.available(SideType.BUY.value, limit)))
+
+    def _expected_fill(self, side: SideType, quantity: Decimal) -> dict:
+        """Ожидаемая по стакану средняя цена ордера для журнала сделок"""
+        if self.depth is None:
+            return {}
+        price = self.depth.expected_price(side.value, floor_scaled(quantity))
+        return {} if price is None else {'expected_price': to_decimal(price)}
+
+    def _request_exit(self, position: Position, received: float = 0.0):
+        """Событие: сработало условие выхода из позиции"""
+        if not self._exits:
+            self._mark_trigger(received)
+        self._exits.append(position)
+        self._wakeup.set()
+
+    def _mark_trigger(self, received: float = 0.0):
+        """Отметка события, запустившего ордер; received - приём тика, если событие ценовое"""
+        self._trigger_at = time.monotonic()
+        self._trigger_received = received
+
+    def _on_timeout(self, positions: list[Position]):
         """Таймер продажи"""
-        try:
-            await asyncio.sleep(self.timeout)
-
-            if self.position_open:
-                await self._sell("Timeout")
-
-        except Exception as e:
-            self.logger.error(f"Ошибка таймера: {str(e)}")
+        for position in positions:
+            if self.book.remove(position):
+                position.reason = 'Timeout'
+                self._request_exit(position)
 
-    async def _start_cooldown(self):
+    def _start_cooldown(self):
         """Точный кулдаун между сделками"""
-        self.cooldown_open = True
-        await asyncio.sleep(self.cooldown)
-        self.cooldown_open = False
+        self.state = TradeState.COOLDOWN
+        self.cooldown_timer = asyncio.get_running_loop().call_later(self.cooldown, self._end_cooldown)
+        self._cooldown_until = int((time.time() + self.cooldown) * 1000)
+        self._journal('cooldown', until=self._cooldown_until)
+
+    def _end_cooldown(self):
+        self.cooldown_timer = None
+        self._mark_trigger()
+        ready = self.last_price is not None and self._entry_allowed()
+        self._set_state(TradeState.READY if ready else TradeState.WAITING_PRICE)
+
+    def _entry_allowed(self) -> bool:
+        """Условие входа: без фильтра тренда - сразу, с фильтром - после заполнения окна и выше EMA"""
+        if not self.trend_entry or not self.indicators:
+            return True
+        return self.indicators.ready and self.last_price / SCALE > self.indicators.ema
+
+    def _thresholds(self) -> tuple[float, float]:
+        """Стоп-лосс и тейк-профит в процентах с учётом текущей волатильности"""
+        if not self.volatility_factor or not self.indicators:
+            return self.stop_loss, self.take_profit
+        floor = self.volatility_factor * self.indicators.volatility
+        return max(self.stop_loss, floor), max(self.take_profit, floor)
 
     async def _buy(self) -> bool:
         """Выполнение покупки"""
+        self.state = TradeState.BUYING
         try:
             if self.balance_usdt < self.quantity * self.current_price:
                 self.logger.warning("Недостаточно средств для покупки")
                 return False
 
-            order = await self.api_client.new_order(
-                symbol=self.symbol,
-                order_type=OrderType.MARKET.value,
-                side=SideType.BUY.value,
-                quantity=self.quantity
-            )
+            quantity = self._entry_quantity()
+            if not quantity:
+                self.logger.warning("Нет объёма в стакане в пределах допустимого проскальзывания")
+                return False
+            expected = self._expected_fill(SideType.BUY, quantity)
+            order = await self._place_order(SideType.BUY, quantity)
 
             if order:
+                self.ledger.apply_fill(order, self.base_asset, self.quote_asset)
                 total_quantity = Decimal(order['executedQty'])
                 total_quote = Decimal(order['cummulativeQuoteQty'])
-                self.entry_price = (total_quote / total_quantity).normalize()
+                entry_price = (total_quote / total_quantity).normalize()
+                position = self._open_position(order, entry_price)
                 self.logger.info(
-                    f"Покупка {self.quantity} {self.symbol} "
-                    f"по цене {self.entry_price:.4f} "
-                    f"Баланс: {self.balance_usdt:.4f} USDT"
+                    f"Покупка {quantity} {self.symbol} "
+                    f"по цене {entry_price:.4f} "
+                    f"Баланс: {self.balance_usdt:.4f} USDT",
+                    extra={'trade': {
+                        'event': 'BUY',
+                        'symbol': self.symbol,
+                        'order_id': order.get('orderId'),
+                        'position': position.id,
+                        'quantity': total_quantity,
+                        'price': entry_price,
+                        'quote': total_quote,
+                        **expected,
+                    }}
                 )
+                # Пока есть свободные слоты, следующий вход - после кулдауна
+                if len(self.book) >= self.max_positions:
+                    self.state = TradeState.POSITION
                 return True
 
+        except OrderRejected as e:
+            self.logger.warning(f"Покупка отклонена: {e.reason}")
         except Exception as e:
             self.logger.error(f"Ошибка покупки: {str(e)}")
+            # Исход ордера неизвестен, балансы сверяются с биржей
+            self.ledger.invalidate()
         finally:
-            self.position_open = True
+            # Неудачная покупка повторяется после кулдауна, как и добор позиций
+            if self.state is TradeState.BUYING:
+                self._start_cooldown()
+            self._publish_position()
             await self._update_balances()
+        return False
 
-    async def _sell(self, reason: str):
-        """Выполнение продажи"""
-        try:
-            if not self.position_open:
-                return
+    def _open_position(self, order: dict, entry_price: Decimal) -> Position:
+        """Позиция по исполненной покупке
 
-            await self._execute_sell(reason=reason)
+        Пороги фиксируются при входе целыми с масштабом 1e8 (стоп округлён вниз,
+        тейк-профит вверх), проверка на тике - сравнение целых без Decimal.
+        """
+        quantity = Decimal(order['executedQty'])
+        for fill in order.get('fills', ()):
+            if fill.get('commissionAsset') == self.base_asset:
+                quantity -= Decimal(fill['commission'])
 
+        stop_loss, take_profit = self._thresholds()
+        position = Position(
+            symbol=self.symbol,
+            quantity=quantity,
+            entry_price=entry_price,
+            stop_price=floor_scaled(entry_price * (1 - Decimal(str(stop_loss)) / 100)),
+            take_price=ceil_scaled(entry_price * (1 + Decimal(str(take_profit)) / 100)),
+            deadline=asyncio.get_running_loop().time() + self.timeout,
+            order_id=order.get('orderId')
+        )
+        self.book.add(position)
+        self.timers.schedule(position)
+        self._journal('open', **self._journal_fields(position))
+        return position
+
+    async def _sell(self):
+        """Продажа всех сработавших позиций одним ордером"""
+        self.exiting, self._exits = self._exits, []
+        self._journal('exit', ids=[position.id for position in self.exiting])
+        sold = False
+        try:
+            sold = await self._execute_sell(self.exiting)
+
+        except OrderRejected as e:
+            self.logger.warning(f"Продажа отклонена: {e.reason}")
         except Exception as e:
             self.logger.error(f"Ошибка продажи: {str(e)}")
+            self.ledger.invalidate()
         finally:
-            await self._post_sell_cleanup()
+            await self._post_sell_cleanup(sold)
 
-    async def _execute_sell(self, reason: str):
-        """Выполнение продажи"""
+    async def _execute_sell(self, positions: list[Position]) -> bool:
+        """Выполнение продажи; True, если ордер исполнен"""
         if self.balance_crypto <= Decimal('0'):
             self.logger.warning("Нет криптовалюты для продажи")
-            return
+            return False
 
+        # Последняя позиция забирает и остаток от округления лота
         quantity = self.balance_crypto
-        order = await self.api_client.new_order(
-            symbol=self.symbol,
-            order_type=OrderType.MARKET.value,
-            side=SideType.SELL.value,
-            quantity=quantity
-        )
+        if self.book:
+            quantity = min(sum(position.quantity for position in positions), quantity)
+        expected = self._expected_fill(SideType.SELL, quantity)
+        order = await self._place_order(SideType.SELL, quantity)
 
         if order:
+            self.ledger.apply_fill(order, self.base_asset, self.quote_asset)
             total_quantity = Decimal(order['executedQty'])
             total_quote = Decimal(order['cummulativeQuoteQty'])
             sell_price = total_quote / total_quantity
-            profit = (sell_price - self.entry_price) * quantity
+            entry_price = (sum(position.entry_price * position.quantity for position in positions) /
+                           sum(position.quantity for position in positions))
+            profit = (sell_price - entry_price) * total_quantity
+            reason = ', '.join(dict.fromkeys(position.reason for position in positions))
             self.logger.info(
-                f"Продажа {quantity:.4f} {self.symbol} "
+                f"Продажа {total_quantity:.4f} {self.symbol} "
                 f"по цене {sell_price:.4f} ({reason}) "
                 f"Прибыль: {profit:.4f} USDT "
-                f"Баланс: {self.balance_usdt:.4f} USDT"
+                f"Баланс: {self.balance_usdt:.4f} USDT",
+                extra={'trade': {
+                    'event': 'SELL',
+                    'symbol': self.symbol,
+                    'order_id': order.get('orderId'),
+                    'positions': [position.id for position in positions],
+                    'quantity': total_quantity,
+                    'price': sell_price,
+                    'quote': total_quote,
+                    'reason': reason,
+                    'profit': profit,
+                    **expected,
+                }}
             )
+        return bool(order)
 
-    async def _post_sell_cleanup(self):
-        """Гарантированный сброс состояния"""
-        await self._start_cooldown()
-
-        if self.timer_task:
-            self.timer_task.cancel()
-        self.timer_task = None
+    async def _place_order(self, side: SideType, quantity: Decimal) -> dict:
+        """Рыночный ордер с замером этапов decision, order и tick_to_order
 
-        self.position_open = False
-        self.entry_price = None
+        Округление к шагу лота и проверку минимального объёма по текущей цене
+        выполняет адаптер биржи, без запроса к бирже.
+        """
+        sent = time.monotonic()
+        order = await self.api_client.new_order(
+            symbol=self.symbol,
+            order_type=OrderType.MARKET.value,
+            side=side.value,
+            quantity=quantity,
+            reference_price=self.current_price,
+            # Регистрация до отправки: события стрима могут опередить ответ
+            client_order_id=self.ledger.register()
+        )
+        if self.latency:
+            acked = time.monotonic()
+            self.latency.record('decision', self.symbol, sent - self._trigger_at)
+            self.latency.record('order', self.symbol, acked - sent)
+            if self._trigger_received:
+                self.latency.record('tick_to_order', self.symbol, acked - self._trigger_received)
+        return order
+
+    async def _post_sell_cleanup(self, sold: bool):
+        """Гарантированный сброс состояния
+
+        Позиции неудачной продажи, которые ещё покрывает баланс после сверки,
+        возвращаются в книгу: иначе монеты остались бы без позиции и, пока в
+        книге есть другие позиции, не продавались бы.
+        """
         await self._update_balances()
-
-    async def _check_conditions(self):
-        """Проверка торговых условий"""
-        try:
-            if not self.entry_price or self.entry_price == Decimal('0'):
-                return
-
-            price_change = ((self.current_price - self.entry_price) /
-                            self.entry_price * 100)
-
-            if price_change <= -self.stop_loss:
-                await self._sell('Stop Loss')
-            elif price_change >= self.take_profit:
-                await self._sell('Take Profit')
-        except ZeroDivisionError:
-            self.logger.error("Ошибка: Нулевая цена входа")
-            await self._sell('Error')
+        positions, self.exiting = self.exiting, []
+        if not sold:
+            positions = self._reopen(positions)
+        if positions:
+            self._journal('close', ids=[position.id for position in positions])
+        # Освободился слот: вход после кулдауна, в остальных состояниях цикл входа идёт своим ходом
+        if positions and self.state is TradeState.POSITION:
+            self._start_cooldown()
+        self._publish_position()
+
+    def _reopen(self, positions: list[Position]) -> list[Position]:
+        """Вернуть в книгу позиции, покрытые балансом; возвращает непокрытые"""
+        available = self.balance_crypto - sum(position.quantity for position in self.book)
+        now = asyncio.get_running_loop().time()
+        lost = []
+        for position in positions:
+            if position.quantity > available:
+                lost.append(position)
+                continue
+            available -= position.quantity
+            position.open = True
+            position.reason = None
+            if position.deadline <= now:
+                # Истёкший срок уже снят с колеса: повтор по таймауту не раньше кулдауна, а не в цикле
+                position.deadline = now + self.cooldown
+            self.book.add(position)
+            self.timers.schedule(position)
+            self._journal('open', **self._journal_fields(position))
+        if lost:
+            self.logger.warning(f"Баланс {self.base_asset} не покрывает позиции {lost}, они закрыты")
+        return lost
 
     async def _update_balances(self):
-        """Обновление балансов"""
+        """Обновление балансов: локальный учёт, REST-сверка по расписанию или при расхождении"""
         try:
-            balances = await self.api_client.get_balances()
-            self.balance_usdt = Decimal(balances.get('USDT', '0'))
-            crypto_asset = self.symbol.replace('USDT', '')
-            self.balance_crypto = Decimal(balances.get(crypto_asset, '0'))
+            await self.ledger.maybe_reconcile()
             self.logger.info(
                 f"Баланс: {self.balance_usdt:.4f} USDT "
-                f"Баланс: {self.balance_crypto:.4f} {crypto_asset}"
+                f"Баланс: {self.balance_crypto:.4f} {self.base_asset}"
             )
         except Exception as e:
             self.logger.error(f"Ошибка получения баланса: {str(e)}")
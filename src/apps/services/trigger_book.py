@@ -0,0 +1,206 @@
+import asyncio
+import heapq
+from decimal import Decimal
+from itertools import count
+from typing import Callable
+
+
+class Position:
+    """Открытая позиция с абсолютными ценами стоп-лосса и тейк-профита
+
+    stop_price/take_price - целые с масштабом 1e8, как Tick.fixed_price.
+    """
+
+    __slots__ = ('id', 'symbol', 'quantity', 'entry_price', 'stop_price', 'take_price',
+                 'deadline', 'order_id', 'reason', 'open')
+
+    _ids = count(1)
+
+    def __init__(self,
+                 symbol: str,
+                 quantity: Decimal,
+                 entry_price: Decimal,
+                 stop_price: int,
+                 take_price: int,
+                 deadline: float,
+                 order_id: int | None = None):
+        self.id = next(self._ids)
+        self.symbol = symbol
+        self.quantity = quantity
+        self.entry_price = entry_price
+        self.stop_price = stop_price
+        self.take_price = take_price
+        # Время event loop, после которого позиция закрывается по таймауту
+        self.deadline = deadline
+        self.order_id = order_id
+        self.reason: str | None = None
+        self.open = True
+
+    def __repr__(self):
+        return (f'Position(#{self.id} {self.symbol} {self.quantity} @ {self.entry_price} '
+                f'sl={self.stop_price} tp={self.take_price})')
+
+
+class TriggerBook:
+    """Книга позиций с выборкой сработавших по цене за O(log n + k)
+
+    Стопы лежат в куче по убыванию цены стопа, тейк-профиты - по возрастанию,
+    так что на тике проверяются только вершины куч. Закрытые позиции удаляются
+    из куч лениво и вычищаются при накоплении.
+    """
+
+    def __init__(self):
+        self.positions: dict[int, Position] = {}
+        self._stops: list[tuple[int, int, Position]] = []
+        self._takes: list[tuple[int, int, Position]] = []
+        self.triggered = 0
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __bool__(self):
+        return bool(self.positions)
+
+    def __iter__(self):
+        return iter(self.positions.values())
+
+    def add(self, position: Position):
+        self.positions[position.id] = position
+        heapq.heappush(self._stops, (-position.stop_price, position.id, position))
+        heapq.heappush(self._takes, (position.take_price, position.id, position))
+
+    def remove(self, position: Position) -> bool:
+        """Закрыть позицию вне ценовых условий (таймаут, ручное закрытие)"""
+        if self.positions.pop(position.id, None) is None:
+            return False
+        position.open = False
+        if len(self._stops) > 2 * len(self.positions) + 64:
+            self._compact()
+        return True
+
+    def pop_triggered(self, price: int) -> list[Position]:
+        """Снять позиции, для которых цена достигла стопа или тейк-профита
+
+        Стоп проверяется первым, как и раньше в TradeManager.
+        """
+        triggered = []
+        stops = self._stops
+        while stops and (not stops[0][2].open or -stops[0][0] >= price):
+            position = heapq.heappop(stops)[2]
+            if position.open:
+                self._close(position, 'Stop Loss')
+                triggered.append(position)
+
+        takes = self._takes
+        while takes and (not takes[0][2].open or takes[0][0] <= price):
+            position = heapq.heappop(takes)[2]
+            if position.open:
+                self._close(position, 'Take Profit')
+                triggered.append(position)
+        return triggered
+
+    def _close(self, position: Position, reason: str):
+        del self.positions[position.id]
+        position.open = False
+        position.reason = reason
+        self.triggered += 1
+
+    def _compact(self):
+        self._stops = [entry for entry in self._stops if entry[2].open]
+        self._takes = [entry for entry in self._takes if entry[2].open]
+        heapq.heapify(self._stops)
+        heapq.heapify(self._takes)
+
+    def stats(self) -> dict:
+        return {
+            'positions': len(self.positions),
+            'triggered': self.triggered,
+            'heap_entries': len(self._stops) + len(self._takes),
+        }
+
+
+class TimerWheel:
+    """Таймауты всех позиций на одном таймере event loop
+
+    Сроки раскладываются по корзинам шириной resolution секунд, в куче лежат
+    только номера непустых корзин. Таймер loop взведён на ближайший срок
+    первой корзины, позиции срабатывают точно в свой срок. Закрытые по цене
+    позиции не снимаются с колеса, а пропускаются при срабатывании.
+    """
+
+    # call_at может сработать раньше срока на разрешение часов loop
+    tolerance = 1e-6
+
+    def __init__(self, callback: Callable[[list[Position]], None], resolution: float = 0.05):
+        self.callback = callback
+        self.resolution = resolution
+        self._buckets: dict[int, list[Position]] = {}
+        self._slots: list[int] = []
+        self._handle: asyncio.TimerHandle | None = None
+        self._armed_at: float | None = None
+        self.scheduled = 0
+        self.expired = 0
+
+    def schedule(self, position: Position):
+        slot = int(position.deadline // self.resolution)
+        bucket = self._buckets.get(slot)
+        if bucket is None:
+            bucket = self._buckets[slot] = []
+            heapq.heappush(self._slots, slot)
+        bucket.append(position)
+        self.scheduled += 1
+        if self._armed_at is None or position.deadline < self._armed_at:
+            self._arm(position.deadline)
+
+    def close(self):
+        if self._handle:
+            self._handle.cancel()
+        self._handle = self._armed_at = None
+        self._buckets.clear()
+        self._slots.clear()
+
+    def _arm(self, when: float):
+        if self._handle:
+            self._handle.cancel()
+        self._armed_at = when
+        self._handle = asyncio.get_running_loop().call_at(when, self._fire)
+
+    def _fire(self):
+        self._handle = self._armed_at = None
+        now = asyncio.get_running_loop().time() + self.tolerance
+        expired = []
+        while self._slots and self._slots[0] * self.resolution <= now:
+            slot = self._slots[0]
+            pending = []
+            for position in self._buckets[slot]:
+                if not position.open:
+                    continue
+                (expired if position.deadline <= now else pending).append(position)
+            if pending:
+                self._buckets[slot] = pending
+                break
+            heapq.heappop(self._slots)
+            del self._buckets[slot]
+
+        self._arm_next()
+        if expired:
+            self.expired += len(expired)
+            self.callback(expired)
+
+    def _arm_next(self):
+        while self._slots:
+            slot = self._slots[0]
+            bucket = [position for position in self._buckets[slot] if position.open]
+            if bucket:
+                self._buckets[slot] = bucket
+                self._arm(min(position.deadline for position in bucket))
+                return
+            heapq.heappop(self._slots)
+            del self._buckets[slot]
+
+    def stats(self) -> dict:
+        return {
+            'scheduled': self.scheduled,
+            'expired': self.expired,
+            'buckets': len(self._slots),
+        }
@@ -0,0 +1,73 @@
+import argparse
+import logging
+from decimal import Decimal
+
+from apps.services.backtest import Backtest, load_csv_ticks, load_store_ticks
+from apps.services.custom_logger import CustomLogger
+from apps.services.indicators import TickIndicators
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Aravia Fintech Bot backtest')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--ticks', type=str, help='Recorded trades (Binance public data CSV)')
+    source.add_argument('--store', type=str, help='Tick store directory written by main.py --record')
+    parser.add_argument('--days', type=str, default=None, help='Store days, comma-separated (YYYY-MM-DD)')
+    parser.add_argument('--symbol', type=str, default='BTCUSDT', help='Trading symbol (e.g., BTCUSDT)')
+    parser.add_argument('--quantity', type=str, default='0.0001', help='Quantity to trade')
+    parser.add_argument('--profit', type=float, default=0.25, help='Profit threshold in percentage')
+    parser.add_argument('--loss', type=float, default=0.25, help='Loss threshold in percentage')
+    parser.add_argument('--wait', type=int, default=60, help='Max wait time in seconds')
+    parser.add_argument('--cooldown', type=int, default=30, help='Cooldown time in seconds')
+    parser.add_argument('--vol-factor', type=float, default=0,
+                        help='Widen profit/loss thresholds to at least this multiple of rolling volatility')
+    parser.add_argument('--trend-entry', action='store_true', help='Enter only when price is above the EMA')
+    parser.add_argument('--max-positions', type=int, default=1,
+                        help='Open positions per symbol, new entries every cooldown until the limit')
+    parser.add_argument('--indicator-window', type=float, default=60,
+                        help='Rolling window for VWAP, volatility and min/max in seconds')
+    parser.add_argument('--ema-half-life', type=float, default=10, help='EMA half-life in seconds')
+    parser.add_argument('--balance', type=str, default='10000', help='Initial quote balance')
+    parser.add_argument('--fee', type=str, default='0.1', help='Commission in percentage')
+    parser.add_argument('--verbose', action='store_true', help='Show TradeManager logs')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    logger = logging.getLogger("Backtest.TradeManager")
+    logger.setLevel(logging.INFO if args.verbose else logging.ERROR)
+    CustomLogger.configure(queued=True)
+    trade_logger = CustomLogger(name="Backtest", log_file="backtest.log", journal="backtest_trades.jsonl")
+
+    indicators = None
+    if args.vol_factor or args.trend_entry:
+        indicators = TickIndicators(window=args.indicator_window, ema_half_life=args.ema_half_life)
+
+    backtest = Backtest(
+        symbol=args.symbol,
+        ticks=load_csv_ticks(args.ticks, args.symbol) if args.ticks else load_store_ticks(
+            args.store, args.symbol, args.days.split(',') if args.days else None
+        ),
+        quantity=Decimal(args.quantity),
+        stop_loss=args.loss,
+        take_profit=args.profit,
+        timeout=args.wait,
+        cooldown=args.cooldown,
+        logger=logger,
+        trade_logger=trade_logger,
+        balance=Decimal(args.balance),
+        commission=Decimal(args.fee) / 100,
+        indicators=indicators,
+        volatility_factor=args.vol_factor,
+        trend_entry=args.trend_entry,
+        max_positions=args.max_positions
+    )
+    backtest.run()
+    CustomLogger.shutdown()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,82 @@
+"""Бары по потоку сделок: цена сделки в агрегаторах, запись пачки и загрузка в NumPy
+
+Запуск из каталога src: python -m benchmarks.bars
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from apps.adapters.fixed_point import to_scaled
+from apps.adapters.tick import Tick
+from apps.services.bars import Bar, BarBuilder, BarStore, BarWriter, partition_path
+
+
+def make_ticks(count: int, rate: float) -> list[Tick]:
+    """Сделки BTCUSDT с частотой rate в секунду, начиная с полуночи UTC"""
+    price, ts, ticks = 84000.0, 1735689600000.0, []
+    for i in range(count):
+        price *= 1 + random.gauss(0, 0.00005)
+        ts += random.expovariate(rate) * 1000
+        ticks.append(Tick('BTCUSDT', to_scaled(f"{price:.8f}"), to_scaled(f"{random.expovariate(50):.8f}"),
+                          i, int(ts), int(ts), random.random() < 0.5))
+    return ticks
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bar aggregation benchmark')
+    parser.add_argument('--ticks', type=int, default=300_000)
+    parser.add_argument('--rate', type=float, default=200, help='Trades per second in the generated stream')
+    parser.add_argument('--bars', type=str, default='1s,1m', help='Time bar intervals')
+    parser.add_argument('--volume', type=str, default='1', help='Volume bar threshold')
+    args = parser.parse_args()
+
+    random.seed(1)
+    ticks = make_ticks(args.ticks, args.rate)
+    directory = tempfile.mkdtemp(prefix='bars-')
+    try:
+        writer = BarWriter(directory)
+        builder = BarBuilder(['BTCUSDT'], args.bars.split(','), args.volume, writer=writer)
+        started = time.perf_counter()
+        for tick in ticks:
+            builder.update(tick)
+        update_us = (time.perf_counter() - started) / len(ticks) * 1e6
+
+        batch = writer.take()
+        started = time.perf_counter()
+        writer.write(batch)
+        write_ms = (time.perf_counter() - started) * 1000
+        writer.close()
+
+        store = BarStore(directory)
+        store.load('BTCUSDT', '1s', store.days('BTCUSDT', '1s')[:1])
+        started = time.perf_counter()
+        loaded = sum(len(store.load('BTCUSDT', kind)['close']) for kind in store.kinds('BTCUSDT'))
+        load_ms = (time.perf_counter() - started) * 1000
+
+        # Авария посреди пачки: записаны не все поля, следующая пачка ложится ровно
+        bars = [bar for _, kind, bar in batch if kind == '1s']
+        day = partition_path(directory, 'BTCUSDT', '1s', bars[-1].start // 86_400_000)
+        for name in Bar._fields[:3]:
+            with open(os.path.join(day, f'{name}.i8'), 'ab') as file:
+                file.write(bytes(8))
+        writer = BarWriter(directory)
+        writer.write([('BTCUSDT', '1s', bars[-1])])
+        writer.close()
+        columns = store.load('BTCUSDT', '1s')
+        assert columns['start'][-1] == bars[-1].start and columns['close'][-1] == bars[-1].close
+        assert columns['start'][-2] == columns['start'][-1], 'torn batch left columns misaligned'
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    kinds = len(builder.series['BTCUSDT'])
+    print(f"update: {update_us:.2f} us per trade for {kinds} bar kinds "
+          f"({1e6 / update_us:,.0f} trades/s)")
+    print(f"write:  {write_ms:.2f} ms for {len(batch):,} bars in one batch")
+    print(f"load:   {load_ms:.2f} ms for {loaded:,} bars into NumPy")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Сравнение декодеров потока сделок
+
+Запуск из каталога src: python -m benchmarks.decoders
+"""
+import argparse
+import json
+import random
+import time
+from decimal import Decimal
+
+from apps.adapters.binance.decoders import DECODERS
+
+
+def make_frames(count: int, combined: bool) -> list[str]:
+    frames = []
+    price = 84000.0
+    for i in range(count):
+        price *= 1 + random.gauss(0, 0.0001)
+        data = {
+            "e": "trade", "E": 1735689600000 + i, "s": "BTCUSDT", "t": 4000000000 + i,
+            "p": f"{price:.8f}", "q": f"{random.random() / 100:.8f}", "T": 1735689600000 + i,
+            "m": random.random() > 0.5, "M": True
+        }
+        frames.append(json.dumps({"stream": "btcusdt@trade", "data": data} if combined else data))
+    return frames
+
+
+def legacy(frames: list[str]):
+    """Прежний путь: json.loads ради поля p и повторный Decimal(str(price))"""
+    for message in frames:
+        data = json.loads(message)
+        price = data.get("data", data).get("p")
+        Decimal(str(price))
+
+
+def bench(name: str, func, frames: list[str], repeat: int):
+    best = min(_timed(func, frames) for _ in range(repeat))
+    print(f"{name:<22} {best / len(frames) * 1e9:>8.0f} ns/frame {len(frames) / best:>12,.0f} frames/s")
+
+
+def _timed(func, frames: list[str]) -> float:
+    started = time.perf_counter()
+    func(frames)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Trade stream decoder benchmark')
+    parser.add_argument('--frames', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--combined', action='store_true', help='Use combined stream envelope')
+    args = parser.parse_args()
+
+    frames = make_frames(args.frames, args.combined)
+    bench('legacy json + Decimal', legacy, frames, args.repeat)
+    for name, decoder_cls in DECODERS.items():
+        decoder = decoder_cls()
+        bench(f'{name} decode', lambda batch: [decoder.decode(m) for m in batch], frames, args.repeat)
+        bench(f'{name} decode_batch', decoder.decode_batch, frames, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
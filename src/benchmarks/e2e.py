@@ -0,0 +1,157 @@
+"""Сквозной прогон main.py против локального мок-сервера Binance
+
+Запуск из каталога src: python -m benchmarks.e2e
+Для 1, 10 и 100 пар поднимается MockBinanceServer с TickGenerator, main.py
+запускается отдельным процессом с BINANCE_* на мок и --metrics-file. За окно
+замера считаются обработанные сделки в секунду (этап queue), квантили
+tick_to_order по всем парам и память процесса на пару.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from decimal import Decimal
+
+from apps.mock.exchange import FakeExchange
+from apps.mock.market import TickGenerator, load_replay
+from apps.mock.server import MockBinanceServer
+
+SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+METRIC = re.compile(r'^bot_latency_seconds(_count)?\{stage="(\w+)",symbol="(\w+)"(?:,quantile="([\d.]+)")?\} (\S+)$')
+
+
+def read_metrics(path: str) -> dict:
+    """Счётчики и квантили из файла --metrics-file: {(stage, symbol): {'count': n, '0.5': seconds, ...}}"""
+    metrics: dict[tuple[str, str], dict] = {}
+    try:
+        with open(path) as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return metrics
+    for line in lines:
+        match = METRIC.match(line)
+        if match:
+            count, stage, symbol, quantile, value = match.groups()
+            metrics.setdefault((stage, symbol), {})['count' if count else quantile] = float(value)
+    return metrics
+
+
+def processed(metrics: dict) -> int:
+    return int(sum(values.get('count', 0) for (stage, symbol), values in metrics.items()
+                   if stage == 'queue' and symbol != 'all'))
+
+
+def rss_kb(pid: int) -> int:
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+
+
+async def run_case(count: int, args, replay) -> dict:
+    symbols = [f"S{i:03d}USDT" for i in range(count)]
+    exchange = FakeExchange(balances={'USDT': Decimal('1000000000')}, commission=Decimal('0.001'))
+    for symbol in symbols:
+        exchange.set_price(symbol, Decimal('10000'))
+    market = TickGenerator(exchange, args.rate, source=replay, seed=1)
+    server = MockBinanceServer(exchange, logging.getLogger('MockBinance'), market=market)
+    runner = await server.start('127.0.0.1', 0)
+    port = runner.addresses[0][1]
+    generator = asyncio.create_task(market.run())
+
+    workdir = tempfile.mkdtemp(prefix='e2e-')
+    metrics_file = os.path.join(workdir, 'metrics.prom')
+    env = {
+        **os.environ,
+        'BINANCE_API_URL': f'http://127.0.0.1:{port}',
+        'BINANCE_WS_URL': f'ws://127.0.0.1:{port}/ws',
+        'BINANCE_WS_STREAM_URL': f'ws://127.0.0.1:{port}/stream',
+        'BINANCE_WS_API_URL': f'ws://127.0.0.1:{port}/ws-api/v3',
+        'BINANCE_API_KEY': 'e2e',
+        'BINANCE_API_SECRET': 'e2e',
+        'CACHE_DIR': os.path.join(workdir, 'cache'),
+    }
+    command = [
+        sys.executable, os.path.join(SRC, 'main.py'),
+        '--symbol', ','.join(symbols),
+        '--quantity', '0.001',
+        '--profit', str(args.threshold),
+        '--loss', str(args.threshold),
+        '--wait', '5',
+        '--cooldown', '1',
+        '--transport', args.transport,
+        '--metrics-file', metrics_file,
+        '--metrics-interval', '1',
+    ]
+    bot = subprocess.Popen(command, cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        await asyncio.sleep(args.warmup)
+        if bot.poll() is not None:
+            raise RuntimeError(f"main.py завершился с кодом {bot.returncode}, логи в {workdir}/logs")
+        start_metrics, start_emitted, started = read_metrics(metrics_file), market.emitted, time.monotonic()
+        await asyncio.sleep(args.duration)
+        # Файл метрик обновляется раз в секунду: ждём свежую выгрузку
+        await asyncio.sleep(1.1)
+        end_metrics, end_emitted, elapsed = read_metrics(metrics_file), market.emitted, time.monotonic() - started
+        memory = rss_kb(bot.pid)
+    finally:
+        bot.terminate()
+        bot.wait()
+        generator.cancel()
+        await runner.cleanup()
+    if not args.keep:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    key = ('tick_to_order', 'all' if count > 1 else symbols[0])
+    latency = end_metrics.get(key, {})
+    orders = latency.get('count', 0) - start_metrics.get(key, {}).get('count', 0)
+    return {
+        'symbols': count,
+        'offered': (end_emitted - start_emitted) / elapsed,
+        'processed': (processed(end_metrics) - processed(start_metrics)) / elapsed,
+        'orders_per_s': orders / elapsed,
+        'p50_ms': latency.get('0.5', 0) * 1000,
+        'p99_ms': latency.get('0.99', 0) * 1000,
+        'rss_mb': memory / 1024,
+        'rss_kb': memory,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='End-to-end benchmark against the local mock exchange')
+    parser.add_argument('--symbols', type=str, default='1,10,100', help='Symbol counts to run, comma-separated')
+    parser.add_argument('--rate', type=float, default=20, help='Generated trades per second per symbol')
+    parser.add_argument('--threshold', type=float, default=0.05, help='--profit/--loss for main.py in percentage')
+    parser.add_argument('--transport', type=str, default='rest', choices=['rest', 'ws'])
+    parser.add_argument('--replay', type=str, default=None, help='Replay prices from a Binance public data CSV')
+    parser.add_argument('--warmup', type=float, default=5, help='Seconds before the measurement window')
+    parser.add_argument('--duration', type=float, default=15, help='Measurement window in seconds')
+    parser.add_argument('--keep', action='store_true', help='Keep main.py working directories with logs')
+    args = parser.parse_args()
+
+    replay = load_replay(args.replay) if args.replay else None
+    print(f"{'symbols':>7} {'offered/s':>10} {'ticks/s':>10} {'orders/s':>9} {'t2o p50 ms':>11} {'t2o p99 ms':>11} "
+          f"{'RSS MB':>7} {'KB/symbol':>10}")
+    baseline = None
+    for count in map(int, args.symbols.split(',')):
+        result = await run_case(count, args, replay)
+        # Память на пару - прирост RSS относительно первого прогона, без общей части процесса
+        if baseline is None or count == baseline['symbols']:
+            baseline = result
+            per_symbol = '-'
+        else:
+            per_symbol = f"{(result['rss_kb'] - baseline['rss_kb']) / (count - baseline['symbols']):,.0f}"
+        print(f"{result['symbols']:>7} {result['offered']:>10,.0f} {result['processed']:>10,.0f} "
+              f"{result['orders_per_s']:>9.1f} {result['p50_ms']:>11.2f} {result['p99_ms']:>11.2f} "
+              f"{result['rss_mb']:>7.1f} {per_symbol:>10}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
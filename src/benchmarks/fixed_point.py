@@ -0,0 +1,71 @@
+"""Горячий путь тика: Decimal против целых с масштабом 1e8
+
+Запуск из каталога src: python -m benchmarks.fixed_point
+На тик: разбор цены и объёма из строк кадра, значения для индикаторов
+(float) и проверка стоп-лосса/тейк-профита открытой позиции.
+"""
+import argparse
+import random
+import time
+from decimal import Decimal
+
+from apps.adapters.fixed_point import SCALE, ceil_scaled, floor_scaled, to_scaled
+
+
+def make_frames(count: int) -> list[tuple[str, str]]:
+    price, frames = 84000.0, []
+    for _ in range(count):
+        price *= 1 + random.gauss(0, 0.00005)
+        frames.append((f"{price:.8f}", f"{random.random() / 100:.8f}"))
+    return frames
+
+
+def decimal_path(frames, entry: Decimal, stop_loss: Decimal, take_profit: Decimal) -> int:
+    """Прежний путь: Decimal на каждый тик и процент изменения цены"""
+    exits = 0
+    for p, q in frames:
+        price, qty = Decimal(p), Decimal(q)
+        float(price), float(qty)
+        change = (price - entry) / entry * 100
+        if change <= -stop_loss or change >= take_profit:
+            exits += 1
+    return exits
+
+
+def fixed_path(frames, entry: Decimal, stop_loss: Decimal, take_profit: Decimal) -> int:
+    """Целые: пороги посчитаны один раз при входе, на тике два сравнения"""
+    stop = floor_scaled(entry * (1 - stop_loss / 100))
+    take = ceil_scaled(entry * (1 + take_profit / 100))
+    exits = 0
+    for p, q in frames:
+        price, qty = to_scaled(p), to_scaled(q)
+        price / SCALE, qty / SCALE
+        if price <= stop or price >= take:
+            exits += 1
+    return exits
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fixed-point hot path benchmark')
+    parser.add_argument('--ticks', type=int, default=500_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    random.seed(1)
+    frames = make_frames(args.ticks)
+    entry = Decimal(frames[0][0])
+    stop_loss = take_profit = Decimal('0.25')
+    exits = []
+    for name, path in (('decimal', decimal_path), ('fixed', fixed_path)):
+        best = float('inf')
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            result = path(frames, entry, stop_loss, take_profit)
+            best = min(best, time.perf_counter() - started)
+        exits.append(result)
+        print(f"{name:<8} {best / args.ticks * 1e9:7.0f} ns/tick {args.ticks / best:12,.0f} ticks/s  exits {result:,}")
+    assert exits[0] == exits[1], exits
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Пропускная способность скользящих индикаторов и сверка с пересчётом окна с нуля
+
+Запуск из каталога src: python -m benchmarks.indicators
+"""
+import argparse
+import math
+import random
+import time
+
+from apps.services.indicators import TickIndicators
+
+
+def make_ticks(count: int, rate: float) -> list[tuple[float, float, float]]:
+    """Случайное блуждание цены с пуассоновским потоком сделок rate в секунду"""
+    ticks = []
+    price, ts = 84000.0, 1735689600.0
+    for _ in range(count):
+        price *= 1 + random.gauss(0, 0.00005)
+        ts += random.expovariate(rate)
+        ticks.append((price, random.random() / 100, ts))
+    return ticks
+
+
+def brute_force(ticks: list[tuple[float, float, float]], window: float) -> dict:
+    """Те же значения окна прямым пересчётом по последним сделкам"""
+    now = ticks[-1][2]
+    start = next(i for i, tick in enumerate(ticks) if tick[2] >= now - window)
+    inside = ticks[start:]
+    returns = [math.log(ticks[i][0] / ticks[i - 1][0]) for i in range(max(start, 1), len(ticks))]
+    return {
+        'vwap': sum(p * v for p, v, _ in inside) / sum(v for _, v, _ in inside),
+        'volatility_pct': math.sqrt(sum(r * r for r in returns)) * 100,
+        'low': min(p for p, _, _ in inside),
+        'high': max(p for p, _, _ in inside),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rolling indicators benchmark')
+    parser.add_argument('--ticks', type=int, default=1_000_000)
+    parser.add_argument('--rate', type=float, default=2000, help='Trades per second in the generated stream')
+    parser.add_argument('--window', type=float, default=60)
+    args = parser.parse_args()
+
+    ticks = make_ticks(args.ticks, args.rate)
+    indicators = TickIndicators(window=args.window)
+    update = indicators.update
+    started = time.perf_counter()
+    for price, volume, ts in ticks:
+        update(price, volume, ts)
+    elapsed = time.perf_counter() - started
+
+    print(f"{args.ticks:,} ticks at {args.rate:,.0f}/s, window {args.window:g} s: "
+          f"{elapsed / args.ticks * 1e9:,.0f} ns/tick, {args.ticks / elapsed:,.0f} ticks/s on one core")
+    expected = brute_force(ticks, args.window)
+    snapshot = indicators.snapshot()
+    for key, value in expected.items():
+        print(f"{key:<15} incremental {snapshot[key]:>18.8f}  brute force {value:>18.8f}")
+    print(f"window ticks {snapshot['ticks']:,}, overflows {snapshot['overflows']}")
+
+
+if __name__ == "__main__":
+    main()
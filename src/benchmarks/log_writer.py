@@ -0,0 +1,82 @@
+"""Стоимость логирования в event loop: синхронные обработчики против фонового LogWriter
+
+Запуск из каталога src: python -m benchmarks.log_writer
+"""
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+
+from apps.services.custom_logger import CustomLogger
+from apps.services.latency import LatencyHistogram
+
+
+def make_logger(queued: bool, log_dir: str) -> CustomLogger:
+    CustomLogger.shutdown()
+    CustomLogger._handlers = {}
+    CustomLogger.configure(queued=queued, console=False)
+    logger = CustomLogger(name=f"Bench[{'queued' if queued else 'sync'}]", log_dir=log_dir, journal='trades.jsonl')
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+def throughput(logger: CustomLogger, records: int) -> tuple[float, float]:
+    """Записей в секунду для вызывающего кода и до фактической записи на диск"""
+    writer = CustomLogger.writer
+    written = writer.written if writer else 0
+    started = time.perf_counter()
+    for i in range(records):
+        logger.info("Цена %s, тик %d", "84000.12", i)
+    returned = time.perf_counter() - started
+    while writer and writer.written - written < records:
+        time.sleep(0.001)
+    return records / returned, records / (time.perf_counter() - started)
+
+
+async def loop_lag(logger: CustomLogger, seconds: float, burst: int) -> LatencyHistogram:
+    """Опоздание таймера 1 мс, пока соседняя задача раз в 1 мс логирует пачку из burst записей"""
+    histogram = LatencyHistogram()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + seconds
+
+    async def producer():
+        i = 0
+        while loop.time() < deadline:
+            for _ in range(burst):
+                logger.info("Цена %s, тик %d", "84000.12", i)
+                i += 1
+            logger.info("Сделка", extra={'trade': {'event': 'BUY', 'price': '84000.12', 'tick': i}})
+            await asyncio.sleep(0.001)
+
+    async def probe():
+        while loop.time() < deadline:
+            planned = time.perf_counter() + 0.001
+            await asyncio.sleep(0.001)
+            histogram.record(int((time.perf_counter() - planned) * 1_000_000))
+
+    await asyncio.gather(producer(), probe())
+    return histogram
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Logging overhead benchmark')
+    parser.add_argument('--records', type=int, default=100_000)
+    parser.add_argument('--seconds', type=float, default=3)
+    parser.add_argument('--burst', type=int, default=20, help='Log calls per millisecond')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as log_dir:
+        for queued in (False, True):
+            name = 'queued' if queued else 'sync'
+            logger = make_logger(queued, os.path.join(log_dir, name))
+            rate, drained = throughput(logger, args.records)
+            lag = asyncio.run(loop_lag(logger, args.seconds, args.burst))
+            CustomLogger.shutdown()
+            print(f"{name:<7} {rate:>10,.0f} records/s (written {drained:>8,.0f}/s)  loop lag p50 {lag.percentile(50):>6} us  "
+                  f"p99 {lag.percentile(99):>6} us  max {lag.max:>6} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Локальный стакан: применение diff-событий и оценка цены рыночного ордера
+
+Запуск из каталога src: python -m benchmarks.order_book
+"""
+import argparse
+import random
+import time
+
+from apps.adapters.fixed_point import to_scaled
+from apps.adapters.order_book import OrderBook
+
+
+def make_snapshot(levels: int, mid: float, tick: float) -> dict:
+    return {
+        'lastUpdateId': 1,
+        'bids': [[f"{mid - tick * (i + 1):.8f}", f"{random.uniform(0.01, 2):.8f}"] for i in range(levels)],
+        'asks': [[f"{mid + tick * (i + 1):.8f}", f"{random.uniform(0.01, 2):.8f}"] for i in range(levels)],
+    }
+
+
+def make_events(count: int, levels: int, mid: float, tick: float) -> list[dict]:
+    """Изменения сосредоточены у вершины стакана, каждое пятое удаляет уровень"""
+    events = []
+    for i in range(count):
+        side = [[f"{mid + tick * min(int(random.expovariate(0.2)) + 1, levels):.8f}",
+                 '0' if random.random() < 0.2 else f"{random.uniform(0.01, 2):.8f}"] for _ in range(5)]
+        bids = [[f"{2 * mid - float(price):.8f}", quantity] for price, quantity in side]
+        events.append({'U': i + 2, 'u': i + 2, 'b': bids, 'a': side})
+    return events
+
+
+def naive_price(book: OrderBook, quantity: int) -> int | None:
+    """Прежний подход: словарь уровней, сортировка на каждый запрос"""
+    levels = dict(zip((-key for key in book.asks.keys), book.asks.quantities))
+    filled = cost = 0
+    for price in sorted(levels):
+        take = min(levels[price], quantity - filled)
+        filled += take
+        cost += take * price
+        if filled >= quantity:
+            return -(-cost // filled)
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Order book benchmark')
+    parser.add_argument('--levels', type=int, default=1000, help='Levels per side in the snapshot')
+    parser.add_argument('--events', type=int, default=20_000)
+    parser.add_argument('--quantity', type=str, default='0.5,5,50', help='Order sizes to price')
+    args = parser.parse_args()
+
+    random.seed(1)
+    mid, tick = 84000.0, 0.01
+    book = OrderBook('BTCUSDT')
+    book.load_snapshot(make_snapshot(args.levels, mid, tick))
+    events = make_events(args.events, args.levels, mid, tick)
+
+    started = time.perf_counter()
+    for event in events:
+        book.apply(event)
+    elapsed = time.perf_counter() - started
+    print(f"apply:          {elapsed / len(events) * 1e6:7.2f} us/event "
+          f"(10 level changes, {len(book.bids)}/{len(book.asks)} levels)")
+
+    for quantity in map(to_scaled, args.quantity.split(',')):
+        line = [f"quantity={quantity / 1e8:<5g}"]
+        for name, price in (('book', lambda: book.expected_price('BUY', quantity)),
+                            ('naive', lambda: naive_price(book, quantity))):
+            rounds = 2000
+            started = time.perf_counter()
+            for _ in range(rounds):
+                result = price()
+            elapsed = time.perf_counter() - started
+            line.append(f"{name} {elapsed / rounds * 1e6:8.2f} us")
+        assert book.expected_price('BUY', quantity) == naive_price(book, quantity)
+        print('  '.join(line) + f"  -> {result / 1e8 if result else None}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Накладные расходы REST-ордера: подготовка запроса и время ответа на холодном и тёплом соединении
+
+Мок-биржа запускается в том же процессе. Прежняя схема (hmac.new на каждый
+запрос, кодирование params силами aiohttp, новое соединение после простоя)
+сравнивается с BinanceAPIClient: ключ HMAC готов заранее, строка запроса
+уходит как есть, соединение пула остаётся открытым.
+
+Запуск из каталога src: python -m benchmarks.rest_transport
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import logging
+import statistics
+import time
+import urllib.parse
+from decimal import Decimal
+
+import aiohttp
+from yarl import URL
+
+from apps.adapters.binance.binance_api import BinanceAPIClient
+from apps.mock.exchange import FakeExchange
+from apps.mock.server import MockBinanceServer
+
+SECRET = 'benchmark-secret'
+ORDER = {'symbol': 'AUSDT', 'side': 'BUY', 'type': 'MARKET', 'quantity': '0.01'}
+
+
+def legacy_url(url: str, params: dict) -> URL:
+    """Прежняя подготовка: timestamp в словарь, новый HMAC, params кодирует aiohttp"""
+    params = dict(params, timestamp=int(time.time() * 1000))
+    query = urllib.parse.urlencode(params)
+    params['signature'] = hmac.new(SECRET.encode(), query.encode(), hashlib.sha256).hexdigest()
+    return URL(url).with_query(params)
+
+
+def prepare_us(client: BinanceAPIClient, url: str, count: int) -> tuple[float, float]:
+    started = time.perf_counter()
+    for _ in range(count):
+        legacy_url(url, ORDER)
+    legacy = (time.perf_counter() - started) / count * 1e6
+
+    started = time.perf_counter()
+    for _ in range(count):
+        URL(f"{url}?{client._query(ORDER, True)}", encoded=True)
+    tuned = (time.perf_counter() - started) / count * 1e6
+    return legacy, tuned
+
+
+async def timed(request) -> float:
+    started = time.perf_counter()
+    await request()
+    return (time.perf_counter() - started) * 1000
+
+
+async def round_trips(client: BinanceAPIClient, url: str, count: int) -> dict[str, list[float]]:
+    headers = client.get_headers(client.api_key)
+
+    async def legacy_cold():
+        # Соединение закрыто после простоя: каждый ордер открывает новое
+        async with aiohttp.ClientSession() as session:
+            async with session.post(legacy_url(url, ORDER), headers=headers) as response:
+                response.raise_for_status()
+                await response.json()
+
+    async def tuned_warm():
+        await client._send('POST', '/api/v3/order', ORDER)
+
+    results = {'legacy cold': [], 'pooled warm': []}
+    for _ in range(count):
+        results['legacy cold'].append(await timed(legacy_cold))
+        results['pooled warm'].append(await timed(tuned_warm))
+    return results
+
+
+async def run(args):
+    logger = logging.getLogger('benchmark')
+    logger.disabled = True
+    exchange = FakeExchange({'USDT': Decimal('1000000000')})
+    exchange.set_price('AUSDT', Decimal('100'))
+    server = MockBinanceServer(exchange, logger, SECRET)
+    runner = await server.start('127.0.0.1', 0)
+    port = runner.addresses[0][1]
+
+    class Client(BinanceAPIClient):
+        url = f'http://127.0.0.1:{port}'
+        api_key = 'benchmark'
+        api_secret = SECRET
+
+    client = Client(logger)
+    try:
+        url = f'{client.url}/api/v3/order'
+        legacy, tuned = prepare_us(client, url, args.prepare)
+        print(f"prepare: legacy {legacy:.2f} us, pre-signed {tuned:.2f} us per order")
+
+        # Первый запрос клиента открывает соединение, sync_time делает это до ордера
+        first = await timed(client.sync_time)
+        print(f"first request (connect + /api/v3/time): {first:.2f} ms")
+
+        for name, samples in (await round_trips(client, url, args.orders)).items():
+            samples.sort()
+            p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+            print(f"{name:>12}: median {statistics.median(samples):.3f} ms, p99 {p99:.3f} ms over {len(samples)} orders")
+    finally:
+        await client.close()
+        await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='REST order transport benchmark')
+    parser.add_argument('--orders', type=int, default=500)
+    parser.add_argument('--prepare', type=int, default=50_000)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Время импорта main.py в новом процессе и самые дорогие модули (python -X importtime)
+
+Запуск из каталога src: python -m benchmarks.startup
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+
+def import_times(module: str) -> dict[str, int]:
+    """Накопленное время импорта каждого модуля в мкс"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.removeprefix('import time:').split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Startup import benchmark')
+    parser.add_argument('--module', type=str, default='main')
+    parser.add_argument('--runs', type=int, default=15)
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    runs = [import_times(args.module) for _ in range(args.runs)]
+    total = statistics.median(run[args.module] for run in runs) / 1000
+    print(f"import {args.module}: median {total:.1f} ms over {args.runs} runs")
+
+    names = set.intersection(*(set(run) for run in runs))
+    medians = {name: statistics.median(run[name] for run in runs) / 1000 for name in names if name != args.module}
+    for name, ms in sorted(medians.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {ms:7.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Журнал состояния: цена записи перехода, снимка и восстановления при запуске
+
+Запуск из каталога src: python -m benchmarks.state_journal
+"""
+import argparse
+import shutil
+import tempfile
+import time
+
+from apps.services.state_journal import StateJournal
+
+
+def position_fields(position_id: int) -> dict:
+    return {
+        'id': position_id,
+        'quantity': '0.00009990',
+        'entry_price': '84000.12',
+        'stop': 8379000000000,
+        'take': 8421000000000,
+        'deadline': int(time.time() * 1000) + 60000,
+        'order_id': 1000000 + position_id,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='State journal benchmark')
+    parser.add_argument('--positions', type=int, default=1000, help='Open positions in the snapshot')
+    parser.add_argument('--events', type=int, default=999, help='Journal records after the snapshot')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='journal-')
+    try:
+        journal = StateJournal(directory, 'BTCUSDT', snapshot_every=args.events + 1)
+        positions = [position_fields(i) for i in range(args.positions)]
+
+        started = time.perf_counter()
+        journal.snapshot(positions, [], None)
+        snapshot_ms = (time.perf_counter() - started) * 1000
+
+        # Типичный поток переходов: открытие, кулдаун, продажа и закрытие
+        started = time.perf_counter()
+        for i in range(args.events):
+            match i % 4:
+                case 0:
+                    journal.record('open', **position_fields(args.positions + i))
+                case 1:
+                    journal.record('cooldown', until=int(time.time() * 1000) + 30000)
+                case 2:
+                    journal.record('exit', ids=[args.positions + i - 2])
+                case 3:
+                    journal.record('close', ids=[args.positions + i - 3])
+        record_us = (time.perf_counter() - started) / args.events * 1_000_000
+        journal.close()
+
+        started = time.perf_counter()
+        state = StateJournal(directory, 'BTCUSDT').load()
+        load_ms = (time.perf_counter() - started) * 1000
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print(f"record:   {record_us:.1f} us per transition")
+    print(f"snapshot: {snapshot_ms:.2f} ms for {args.positions} positions")
+    print(f"restore:  {load_ms:.2f} ms for snapshot + {args.events} records "
+          f"({len(state['positions'])} positions)")
+
+
+if __name__ == "__main__":
+    main()
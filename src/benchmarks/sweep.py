@@ -0,0 +1,84 @@
+"""Скорость перебора сетки параметров и сверка с пошаговым прогоном по тикам
+
+Запуск из каталога src: python -m benchmarks.sweep
+"""
+import argparse
+import os
+import random
+import time
+
+import numpy as np
+
+from apps.services.sweep import COOLDOWN, LOSS, PROFIT, WAIT, make_grid, sweep
+
+
+def make_ticks(count: int, rate: float) -> tuple[np.ndarray, np.ndarray]:
+    """Случайное блуждание цены с пуассоновским потоком сделок rate в секунду"""
+    rng = np.random.default_rng(1)
+    times = 1735689600.0 + np.cumsum(rng.exponential(1 / rate, count))
+    prices = 84000.0 * np.cumprod(1 + rng.normal(0, 0.0002, count))
+    return times, prices
+
+
+def reference(times, prices, params, quantity: float, commission: float) -> tuple[int, float]:
+    """Та же стратегия проходом по каждому тику: сделка по последней известной цене на момент события"""
+    profit, loss, wait, cooldown = params[PROFIT], params[LOSS], params[WAIT], params[COOLDOWN]
+    fee = 1 - commission
+    trades, pnl = 0, 0.0
+    entry = None
+    resume, last_price = times[0], None
+    for ts, price in zip(times.tolist(), prices.tolist()):
+        while True:
+            if entry is not None:
+                entry_price, deadline = entry
+                if ts > deadline:
+                    # Таймер истёк между тиками: выход по последней цене до него
+                    exit_price, resume = last_price, deadline + cooldown
+                elif price >= entry_price * (1 + profit / 100) or price <= entry_price * (1 - loss / 100):
+                    exit_price, resume = price, ts + cooldown
+                else:
+                    break
+                trades += 1
+                pnl += quantity * fee * exit_price * fee - quantity * entry_price
+                entry = None
+            elif ts > resume and last_price is not None:
+                # Кулдаун закончился между тиками: покупка по последней цене, текущий тик уже после входа
+                entry = (last_price, resume + wait)
+            elif ts >= resume:
+                entry = (price, ts + wait)
+                break
+            else:
+                break
+        last_price = price
+    return trades, pnl
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Parameter sweep benchmark')
+    parser.add_argument('--ticks', type=int, default=500_000)
+    parser.add_argument('--rate', type=float, default=20, help='Trades per second')
+    parser.add_argument('--check', type=int, default=5, help='Combinations to verify tick by tick')
+    args = parser.parse_args()
+
+    times, prices = make_ticks(args.ticks, args.rate)
+    grid = make_grid(np.arange(0.1, 1.01, 0.1), np.arange(0.1, 1.01, 0.1), [30, 60, 120, 300, 600], [0, 30, 60, 120])
+    quantity, commission = 0.0001, 0.001
+    print(f"{len(times):,} ticks over {(times[-1] - times[0]) / 3600:.1f} h, {len(grid):,} combinations")
+
+    runs = [1] if (os.cpu_count() or 1) == 1 else [1, os.cpu_count()]
+    for workers in runs:
+        started = time.perf_counter()
+        results = sweep(times, prices, grid, quantity, commission, workers)
+        elapsed = time.perf_counter() - started
+        print(f"workers={workers:<3} {elapsed:7.2f} s  {len(grid) / elapsed:8,.0f} combinations/s")
+
+    started = time.perf_counter()
+    for i in random.Random(1).sample(range(len(grid)), args.check):
+        trades, pnl = reference(times, prices, grid[i], quantity, commission)
+        assert trades == results['trades'][i] and abs(pnl - results['pnl'][i]) < 1e-9, (grid[i], trades, pnl)
+    elapsed = (time.perf_counter() - started) / max(args.check, 1)
+    print(f"tick-by-tick reference: {elapsed:.2f} s per combination, {args.check} combinations match")
+
+
+if __name__ == "__main__":
+    main()
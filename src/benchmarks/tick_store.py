@@ -0,0 +1,54 @@
+"""Запись сделок TickRecorder, чтение через TickView и дозапись после оборванной записи
+
+Запуск из каталога src: python -m benchmarks.tick_store
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from apps.services.tick_store import RECORD, TickRecorder, TickView, partition_path
+
+
+def record(root: str, first: int, count: int):
+    recorder = TickRecorder(root)
+    for trade_id in range(first, first + count):
+        recorder.append('BTCUSDT', trade_id, 1735689600000 + trade_id, 8_400_000_000_000 + trade_id, 100_000, False)
+    recorder.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tick store benchmark')
+    parser.add_argument('--ticks', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix='ticks-')
+    try:
+        started = time.perf_counter()
+        record(root, 0, args.ticks)
+        append_us = (time.perf_counter() - started) / args.ticks * 1e6
+
+        path = partition_path(root, 'BTCUSDT', 1735689600000 // 86_400_000)
+        started = time.perf_counter()
+        with TickView(path) as view:
+            total = sum(row[2] for row in view)
+        read_us = (time.perf_counter() - started) / args.ticks * 1e6
+
+        # Авария посреди записи: последняя запись обрезана, после перезапуска запись продолжается
+        with open(path, 'r+b') as file:
+            file.truncate(os.path.getsize(path) - RECORD.size // 2)
+        record(root, args.ticks, 3)
+        with TickView(path) as view:
+            trade_ids = [view[i][0] for i in range(-4, 0)]
+        assert trade_ids == [args.ticks - 2, args.ticks, args.ticks + 1, args.ticks + 2], trade_ids
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    print(f"append: {append_us:.2f} us per trade ({1e6 / append_us:,.0f} trades/s)")
+    print(f"read:   {read_us:.2f} us per trade, checksum {total}")
+    print("torn record: cut off before appending")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Проверка условий выхода на тике: TriggerBook против перебора позиций
+
+Запуск из каталога src: python -m benchmarks.trigger_book
+"""
+import argparse
+import random
+import time
+from decimal import Decimal
+
+from apps.adapters.fixed_point import ceil_scaled, floor_scaled, to_scaled
+from apps.services.trigger_book import Position, TriggerBook
+
+
+def make_prices(count: int) -> list[str]:
+    """Цены строками, как в кадрах потока: разбор входит в замер"""
+    price, prices = 84000.0, []
+    for _ in range(count):
+        price *= 1 + random.gauss(0, 0.00005)
+        prices.append(f"{price:.8f}")
+    return prices
+
+
+def make_position(price: Decimal, stop_loss: Decimal, take_profit: Decimal) -> Position:
+    return Position('BTCUSDT', Decimal('0.0001'), price, floor_scaled(price * (1 - stop_loss / 100)),
+                    ceil_scaled(price * (1 + take_profit / 100)), deadline=0.0)
+
+
+def run_book(prices, positions: int, stop_loss: Decimal, take_profit: Decimal) -> int:
+    book = TriggerBook()
+    for _ in range(positions):
+        book.add(make_position(Decimal(prices[0]), stop_loss, take_profit))
+    exits = 0
+    for price in prices:
+        triggered = book.pop_triggered(to_scaled(price))
+        exits += len(triggered)
+        # Закрытые позиции сразу заменяются новыми по текущей цене
+        for _ in triggered:
+            book.add(make_position(Decimal(price), stop_loss, take_profit))
+    return exits
+
+
+def run_scan(prices, positions: int, stop_loss: Decimal, take_profit: Decimal) -> int:
+    """Прежняя проверка: процент изменения в Decimal для каждой позиции на каждом тике"""
+    entries = [Decimal(prices[0])] * positions
+    exits = 0
+    for price in prices:
+        price = Decimal(price)
+        for i, entry_price in enumerate(entries):
+            change = (price - entry_price) / entry_price * 100
+            if change <= -stop_loss or change >= take_profit:
+                entries[i] = price
+                exits += 1
+    return exits
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Trigger book benchmark')
+    parser.add_argument('--ticks', type=int, default=20_000)
+    parser.add_argument('--positions', type=str, default='1,10,100,1000')
+    args = parser.parse_args()
+
+    random.seed(1)
+    prices = make_prices(args.ticks)
+    stop_loss = take_profit = Decimal('0.25')
+    for positions in map(int, args.positions.split(',')):
+        line = [f"positions={positions:<5}"]
+        exits = []
+        for name, run in (('book', run_book), ('scan', run_scan)):
+            started = time.perf_counter()
+            exits.append(run(prices, positions, stop_loss, take_profit))
+            elapsed = time.perf_counter() - started
+            line.append(f"{name} {elapsed / len(prices) * 1e6:9.2f} us/tick")
+        assert exits[0] == exits[1], exits
+        print('  '.join(line) + f"  exits {exits[0]:,}")
+
+
+if __name__ == "__main__":
+    main()
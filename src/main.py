@@ -1,55 +1,192 @@
-import argparse
-import asyncio
-import logging
-from decimal import Decimal
+import time
 
-from apps.adapters import BinanceWSClient, BinanceAPIClient
-from apps.services.custom_logger import CustomLogger
-from apps.services.trade_handler import TradeManager
+# Отметка до импортов: время импорта модулей входит в замер запуска
+STARTED = time.monotonic()
 
+import argparse  # noqa: E402
+import asyncio  # noqa: E402
+import logging  # noqa: E402
+from decimal import Decimal  # noqa: E402
+from functools import partial  # noqa: E402
 
-def parse_args():
+from apps.adapters import BinanceAPIClient, BinanceWSAPIClient  # noqa: E402
+from apps.adapters.binance.decoders import DECODERS, get_decoder  # noqa: E402
+from apps.services.bars import BarBuilder, BarWriter  # noqa: E402
+from apps.services.custom_logger import CustomLogger  # noqa: E402
+from apps.services.event_loop import LoopMonitor, run_loop  # noqa: E402
+from apps.services.indicators import TickIndicators  # noqa: E402
+from apps.services.latency import LatencyExporter, LatencyRecorder  # noqa: E402
+from apps.services.price_board import PriceBoard  # noqa: E402
+from apps.services.runner import MultiSymbolRunner  # noqa: E402
+from apps.services.tick_store import TickRecorder  # noqa: E402
+
+
+def parse_args(argv: list[str] | None = None):
     parser = argparse.ArgumentParser(description='Aravia Fintech Bot')
-    parser.add_argument('--symbol', type=str, default='BTCUSDT', help='Trading symbol (e.g., BTCUSDT)')
+    parser.add_argument('--symbol', type=str, default='BTCUSDT', help='Trading symbols, comma-separated (e.g., BTCUSDT,ETHUSDT)')
     parser.add_argument('--quantity', type=str, default='0.0001', help='Quantity to trade')
     parser.add_argument('--profit', type=float, default=0.25, help='Profit threshold in percentage')
     parser.add_argument('--loss', type=float, default=0.25, help='Loss threshold in percentage')
     parser.add_argument('--wait', type=int, default=60, help='Max wait time in seconds')
     parser.add_argument('--cooldown', type=int, default=30, help='Cooldown time in seconds')
-    return parser.parse_args()
+    parser.add_argument('--vol-factor', type=float, default=0,
+                        help='Widen profit/loss thresholds to at least this multiple of rolling volatility')
+    parser.add_argument('--trend-entry', action='store_true', help='Enter only when price is above the EMA')
+    parser.add_argument('--max-positions', type=int, default=1,
+                        help='Open positions per symbol, new entries every cooldown until the limit')
+    parser.add_argument('--indicator-window', type=float, default=60,
+                        help='Rolling window for VWAP, volatility and min/max in seconds')
+    parser.add_argument('--ema-half-life', type=float, default=10, help='EMA half-life in seconds')
+    parser.add_argument('--depth', action='store_true',
+                        help='Keep local order books and check exits against the executable bid price')
+    parser.add_argument('--max-slippage', type=float, default=0,
+                        help='With --depth, cut entries to the book depth within this percentage of the best ask')
+    parser.add_argument('--bars', type=str, default=None,
+                        help='Build time bars from the trade stream, comma-separated intervals (e.g., 1s,1m)')
+    parser.add_argument('--volume-bars', type=str, default=None,
+                        help='Also build volume bars closing at this base asset volume')
+    parser.add_argument('--bar-history', type=int, default=1000, help='Closed bars kept in memory per symbol and kind')
+    parser.add_argument('--bars-dir', type=str, default=None, help='Directory to write closed bars into')
+    parser.add_argument('--transport', type=str, default='rest', choices=['rest', 'ws'],
+                        help='Order entry transport: REST API or persistent WebSocket API')
+    parser.add_argument('--keep-warm', type=float, default=0,
+                        help='Ping the REST API after this many idle seconds to keep pooled connections open')
+    parser.add_argument('--decoder', type=str, default='auto', choices=['auto', *DECODERS],
+                        help='Trade stream decoder (auto picks the fastest installed)')
+    parser.add_argument('--user-stream', action='store_true',
+                        help='Keep balances in sync via the user data stream')
+    parser.add_argument('--reconcile', type=float, default=300,
+                        help='Full REST balance reconciliation interval in seconds')
+    parser.add_argument('--record', type=str, default=None, help='Directory to record trade ticks into')
+    parser.add_argument('--state-dir', type=str, default=None,
+                        help='Journal positions and cooldowns here and restore them on restart')
+    parser.add_argument('--async-logging', action=argparse.BooleanOptionalAction, default=True,
+                        help='Write logs in batches from a background thread instead of the event loop')
+    parser.add_argument('--log-max-mb', type=int, default=50, help='Rotate log files at this size')
+    parser.add_argument('--log-dir', type=str, default='logs', help='Directory for log files and the trade journal')
+    parser.add_argument('--board', type=str, default=None,
+                        help='Publish prices and positions to this shared-memory board (see supervisor.py)')
+    parser.add_argument('--metrics-file', type=str, default=None,
+                        help='Periodically write latency histograms to this file (Prometheus text format)')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help='Serve latency histograms on http://127.0.0.1:<port>/metrics')
+    parser.add_argument('--metrics-interval', type=float, default=10, help='Metrics file export interval in seconds')
+    parser.add_argument('--fast-loop', action='store_true',
+                        help='Run on uvloop when installed, with eager task start')
+    parser.add_argument('--loop-monitor', action='store_true',
+                        help='Sample event loop lag and log the stack of callbacks that block it')
+    parser.add_argument('--stall-threshold', type=float, default=0.1,
+                        help='With --loop-monitor, dump the loop stack after blocking this many seconds')
+    return parser.parse_args(argv)
 
 
-async def main():
-    args = parse_args()
+async def run(args: argparse.Namespace):
+    """Торговля по парам args.symbol в текущем процессе; supervisor.py запускает её в каждом воркере"""
+    symbols = [symbol.strip().upper() for symbol in args.symbol.split(',') if symbol.strip()]
+
+    CustomLogger.configure(queued=args.async_logging, max_bytes=args.log_max_mb * 1024 * 1024)
+    api_client_logger = CustomLogger(name="BinanceAPIClient", log_file="api_logger.log", log_dir=args.log_dir)
+    ws_client_logger = CustomLogger(name="BinanceWSClient", log_file="ws_logger.log", log_dir=args.log_dir)
+    ws_client_logger.info(f"Импорт модулей: {(time.monotonic() - STARTED) * 1000:.1f} мс")
+
+    connecting = None
+    if args.transport == 'ws':
+        api_client = BinanceWSAPIClient(api_client_logger)
+        # Рукопожатие идёт параллельно с подключением потоков: вызовы API дождутся его под блокировкой connect
+        connecting = asyncio.create_task(api_client.connect())
+        connecting.add_done_callback(partial(_log_connect_error, api_client_logger))
+    else:
+        api_client = BinanceAPIClient(api_client_logger, keep_warm=args.keep_warm)
+
+    latency = exporter = None
+    if args.metrics_file or args.metrics_port is not None:
+        latency = LatencyRecorder()
+        exporter = LatencyExporter(
+            latency, ws_client_logger, args.metrics_file, args.metrics_port, interval=args.metrics_interval
+        )
+
+    monitor = None
+    if args.loop_monitor:
+        monitor = LoopMonitor(
+            CustomLogger(name="EventLoop", log_file="loop.log", log_dir=args.log_dir),
+            latency,
+            threshold=args.stall_threshold
+        )
 
-    logger = CustomLogger(name="TradingBot")
-    api_client_logger = CustomLogger(name="BinanceAPIClient", log_file="api_logger.log")
-    ws_client_logger = CustomLogger(name="BinanceWSClient", log_file="ws_logger.log")
+    board = PriceBoard.attach(args.board) if args.board else None
 
-    api_client = BinanceAPIClient(api_client_logger)
-    ws_client = BinanceWSClient(symbol=args.symbol, logger=ws_client_logger)
+    indicator_factory = None
+    if args.vol_factor or args.trend_entry:
+        indicator_factory = partial(TickIndicators, window=args.indicator_window, ema_half_life=args.ema_half_life)
 
-    trade_manager = TradeManager(
+    bars = None
+    if args.bars or args.volume_bars:
+        bars = BarBuilder(
+            symbols,
+            intervals=[interval for interval in (args.bars or '').split(',') if interval.strip()],
+            volume=args.volume_bars,
+            history_size=args.bar_history,
+            writer=BarWriter(args.bars_dir) if args.bars_dir else None
+        )
+
+    runner = MultiSymbolRunner(
         api_client=api_client,
-        ws_client=ws_client,
-        symbol=args.symbol,
+        symbols=symbols,
         quantity=Decimal(args.quantity),
         stop_loss=args.loss,
         take_profit=args.profit,
         timeout=args.wait,
         cooldown=args.cooldown,
-        logger=logger
+        logger_factory=lambda symbol: CustomLogger(
+            name=f"TradingBot[{symbol}]", log_dir=args.log_dir, journal="trades.jsonl"
+        ),
+        ws_logger=ws_client_logger,
+        recorder=TickRecorder(args.record) if args.record else None,
+        decoder=get_decoder(args.decoder),
+        user_stream=args.user_stream,
+        reconcile_interval=args.reconcile,
+        latency=latency,
+        exporter=exporter,
+        indicator_factory=indicator_factory,
+        volatility_factor=args.vol_factor,
+        trend_entry=args.trend_entry,
+        max_positions=args.max_positions,
+        board=board,
+        state_dir=args.state_dir,
+        depth=args.depth,
+        max_slippage=args.max_slippage,
+        bars=bars,
+        started=STARTED
     )
 
+    monitor_task = asyncio.create_task(monitor.run()) if monitor else None
     try:
-        await trade_manager.start_trading()
+        await runner.run()
     finally:
+        for task in (connecting, monitor_task):
+            if task:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
         await api_client.close()
+        if board:
+            board.close()
+        CustomLogger.shutdown()
+
+
+def _log_connect_error(logger: logging.Logger, task: asyncio.Task):
+    """Ошибка фонового подключения; следующий вызов API подключится заново"""
+    if not task.cancelled() and task.exception():
+        logger.error(f"WebSocket API: ошибка подключения: {task.exception()}")
+
+
+def main():
+    args = parse_args()
+    run_loop(run(args), fast=args.fast_loop)
 
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
     try:
-        asyncio.run(main())
+        main()
     except KeyboardInterrupt:
         print("Program interrupted by user. Shutting down...")
@@ -10,3 +10,10 @@ BINANCE_API_KEY = os.environ.get('BINANCE_API_KEY')
 BINANCE_API_SECRET = os.environ.get('BINANCE_API_SECRET')
 BINANCE_WS_URL = os.environ.get('BINANCE_WS_URL')
 BINANCE_API_URL = os.environ.get('BINANCE_API_URL')
+# Комбинированные потоки (/stream?streams=...) живут рядом с /ws
+BINANCE_WS_STREAM_URL = os.environ.get('BINANCE_WS_STREAM_URL') or (
+    BINANCE_WS_URL.removesuffix('/ws') + '/stream' if BINANCE_WS_URL else None
+)
+BINANCE_WS_API_URL = os.environ.get('BINANCE_WS_API_URL')
+# Каталог для копий exchangeInfo, путь относительно рабочего каталога
+CACHE_DIR = os.environ.get('CACHE_DIR', 'cache')
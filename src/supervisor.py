@@ -0,0 +1,212 @@
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import time
+from multiprocessing.connection import wait
+
+import main as bot
+from apps.services.custom_logger import CustomLogger
+from apps.services.event_loop import run_loop
+from apps.services.price_board import PriceBoard
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Aravia Fintech Bot supervisor: symbols split across worker processes',
+        epilog='All other options are passed to the workers, see main.py --help'
+    )
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes')
+    parser.add_argument('--board', type=str, default=None,
+                        help='Shared-memory board name (default aravia-<pid>), read it with '
+                             'python -m apps.services.price_board <name>')
+    parser.add_argument('--restart-delay', type=float, default=1, help='Delay before restarting a crashed worker')
+    parser.add_argument('--max-restart-delay', type=float, default=60,
+                        help='Restart delay cap for workers that keep crashing')
+    parser.add_argument('--monitor-interval', type=float, default=30, help='Board summary log interval in seconds')
+    args, rest = parser.parse_known_args()
+    return args, bot.parse_args(rest)
+
+
+def _interrupt(signum, frame):
+    # Однократно: повторный сигнал не прерывает уже идущее завершение
+    signal.signal(signum, signal.SIG_IGN)
+    raise KeyboardInterrupt
+
+
+def run_worker(args: argparse.Namespace):
+    """Точка входа воркера: собственный event loop, клиенты и менеджеры своих пар"""
+    # Ctrl+C приходит всей группе процессов; воркер останавливает только SIGTERM
+    # супервизора, иначе он прервал бы завершение, начатое по SIGINT
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # SIGTERM от супервизора завершает воркер через finally в run, как Ctrl+C
+    signal.signal(signal.SIGTERM, _interrupt)
+    logging.basicConfig(level=logging.INFO)
+    try:
+        run_loop(bot.run(args), fast=args.fast_loop)
+    except KeyboardInterrupt:
+        pass
+
+
+def worker_args(args: argparse.Namespace, index: int, symbols: list[str], board: str) -> argparse.Namespace:
+    """Аргументы main.py для воркера: свои пары, каталог логов и адреса метрик"""
+    worker = argparse.Namespace(**vars(args))
+    worker.symbol = ','.join(symbols)
+    worker.board = board
+    worker.log_dir = os.path.join(args.log_dir, f'worker-{index}')
+    if args.metrics_file:
+        root, ext = os.path.splitext(args.metrics_file)
+        worker.metrics_file = f'{root}-{index}{ext}'
+    if args.metrics_port is not None:
+        worker.metrics_port = args.metrics_port + index
+    return worker
+
+
+class Worker:
+    """Процесс с закреплённым набором пар; после падения перезапускается с теми же парами"""
+
+    # Проработавший дольше воркер считается стабильным, задержка перезапуска сбрасывается
+    stable_after = 60
+
+    def __init__(self, index: int, symbols: list[str], args: argparse.Namespace):
+        self.index = index
+        self.symbols = symbols
+        self.args = args
+        self.process: multiprocessing.Process | None = None
+        self.started = 0.0
+        self.restarts = 0
+        self.delay = 0.0
+        self.restart_at: float | None = None
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    def start(self, context):
+        self.process = context.Process(target=run_worker, args=(self.args,), name=f'worker-{self.index}')
+        self.process.start()
+        self.started = time.monotonic()
+        self.restart_at = None
+
+
+class Supervisor:
+    """Раскладывает пары по воркерам, следит за ними и публикует доску цен
+
+    Доска создаётся до запуска воркеров и переживает их перезапуски: слот
+    упавшего воркера хранит последнюю цену и позиции до возврата пар новому
+    процессу.
+    """
+
+    def __init__(self,
+                 bot_args: argparse.Namespace,
+                 workers: int,
+                 board: str,
+                 logger: logging.Logger,
+                 restart_delay: float = 1,
+                 max_restart_delay: float = 60,
+                 monitor_interval: float = 30):
+        self.logger = logger
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.monitor_interval = monitor_interval
+        self.symbols = list(dict.fromkeys(symbol.strip().upper() for symbol in bot_args.symbol.split(',')
+                                          if symbol.strip()))
+        self.board_name = board
+        self.board: PriceBoard | None = None
+        # spawn: воркер не наследует состояние супервизора (потоки, открытые сокеты)
+        self.context = multiprocessing.get_context('spawn')
+        count = max(1, min(workers, len(self.symbols)))
+        self.workers = [
+            Worker(index, self.symbols[index::count], worker_args(bot_args, index, self.symbols[index::count], board))
+            for index in range(count)
+        ]
+
+    def run(self):
+        self.board = PriceBoard.create(self.board_name, self.symbols)
+        self.logger.info(f"Доска цен {self.board_name}: {len(self.symbols)} пар, воркеров {len(self.workers)}")
+        try:
+            for worker in self.workers:
+                self._start(worker)
+            next_report = time.monotonic() + self.monitor_interval
+            while True:
+                now = time.monotonic()
+                deadlines = [next_report, *(worker.restart_at for worker in self.workers if worker.restart_at)]
+                running = [worker.process.sentinel for worker in self.workers if worker.alive]
+                wait(running, timeout=max(0.0, min(deadlines) - now))
+
+                now = time.monotonic()
+                for worker in self.workers:
+                    if worker.restart_at is None and not worker.alive:
+                        self._schedule_restart(worker, now)
+                    elif worker.restart_at is not None and worker.restart_at <= now:
+                        worker.restarts += 1
+                        self._start(worker)
+                if now >= next_report:
+                    self._report()
+                    next_report = now + self.monitor_interval
+        finally:
+            self._stop()
+            self.board.close()
+            self.board.unlink()
+
+    def _start(self, worker: Worker):
+        worker.start(self.context)
+        self.logger.info(f"Воркер {worker.index} (pid {worker.process.pid}): {','.join(worker.symbols)}")
+
+    def _schedule_restart(self, worker: Worker, now: float):
+        """Перезапуск упавшего воркера; падающий сразу после старта - с растущей задержкой"""
+        if now - worker.started < worker.stable_after:
+            worker.delay = min(max(worker.delay * 2, self.restart_delay), self.max_restart_delay)
+        else:
+            worker.delay = self.restart_delay
+        worker.restart_at = now + worker.delay
+        self.logger.error(f"Воркер {worker.index} завершился с кодом {worker.process.exitcode}, "
+                          f"перезапуск через {worker.delay:.1f} с")
+
+    def _report(self):
+        now = time.time()
+        records = self.board.snapshot()
+        fresh = sum(1 for record in records if record['updated'] and now - record['updated'] < self.monitor_interval)
+        positions = sum(record['positions'] for record in records)
+        self.logger.info(f"Воркеры: {sum(worker.alive for worker in self.workers)}/{len(self.workers)}, "
+                         f"перезапусков: {sum(worker.restarts for worker in self.workers)}, "
+                         f"пар с ценой за {self.monitor_interval:g} с: {fresh}/{len(self.symbols)}, "
+                         f"позиций: {positions}")
+
+    def _stop(self):
+        for worker in self.workers:
+            if worker.alive:
+                worker.process.terminate()
+        for worker in self.workers:
+            if worker.process is not None:
+                worker.process.join(timeout=10)
+                if worker.process.is_alive():
+                    self.logger.warning(f"Воркер {worker.index} не завершился, принудительная остановка")
+                    worker.process.kill()
+                    worker.process.join()
+
+
+def main():
+    args, bot_args = parse_args()
+    logger = CustomLogger(name="Supervisor", log_file="supervisor.log", log_dir=bot_args.log_dir)
+    supervisor = Supervisor(
+        bot_args=bot_args,
+        workers=args.workers,
+        board=args.board or f'aravia-{os.getpid()}',
+        logger=logger,
+        restart_delay=args.restart_delay,
+        max_restart_delay=args.max_restart_delay,
+        monitor_interval=args.monitor_interval
+    )
+    # SIGTERM останавливает воркеры тем же путём, что и Ctrl+C
+    signal.signal(signal.SIGTERM, _interrupt)
+    supervisor.run()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("Supervisor interrupted by user. Shutting down...")
@@ -0,0 +1,76 @@
+import argparse
+import csv
+import time
+
+import numpy as np
+
+from apps.services.sweep import load_csv_arrays, load_store_arrays, make_grid, sweep
+
+
+def parse_values(text: str) -> list[float]:
+    """Список '0.1,0.2' или диапазон 'start:stop:step' (stop включительно)"""
+    if ':' in text:
+        start, stop, step = map(float, text.split(':'))
+        return list(np.round(np.arange(start, stop + step / 2, step), 10))
+    return [float(value) for value in text.split(',')]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Aravia Fintech Bot parameter sweep')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--ticks', type=str, help='Recorded trades (Binance public data CSV)')
+    source.add_argument('--store', type=str, help='Tick store directory written by main.py --record')
+    parser.add_argument('--days', type=str, default=None, help='Store days, comma-separated (YYYY-MM-DD)')
+    parser.add_argument('--symbol', type=str, default='BTCUSDT', help='Trading symbol (e.g., BTCUSDT)')
+    parser.add_argument('--quantity', type=float, default=0.0001, help='Quantity to trade')
+    parser.add_argument('--profit', type=str, default='0.05:1:0.05', help='Profit thresholds in percentage')
+    parser.add_argument('--loss', type=str, default='0.05:1:0.05', help='Loss thresholds in percentage')
+    parser.add_argument('--wait', type=str, default='30,60,120,300', help='Max wait times in seconds')
+    parser.add_argument('--cooldown', type=str, default='0,30,60', help='Cooldown times in seconds')
+    parser.add_argument('--fee', type=float, default=0.1, help='Commission in percentage')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: all cores)')
+    parser.add_argument('--chunk', type=int, default=None, help='Combinations per task (default: two per worker)')
+    parser.add_argument('--top', type=int, default=20, help='Print the best N combinations by PnL')
+    parser.add_argument('--output', type=str, default=None, help='Write all results to this CSV file')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    started = time.perf_counter()
+    if args.ticks:
+        times, prices = load_csv_arrays(args.ticks)
+    else:
+        times, prices = load_store_arrays(args.store, args.symbol, args.days.split(',') if args.days else None)
+    if not len(times):
+        raise SystemExit("Нет тиков для прогона")
+    loaded = time.perf_counter() - started
+
+    grid = make_grid(parse_values(args.profit), parse_values(args.loss),
+                     parse_values(args.wait), parse_values(args.cooldown))
+    started = time.perf_counter()
+    results = sweep(times, prices, grid, args.quantity, args.fee / 100, args.workers, args.chunk)
+    elapsed = time.perf_counter() - started
+    print(f"{len(times):,} ticks loaded in {loaded:.2f} s, {len(grid):,} combinations in {elapsed:.2f} s "
+          f"({len(grid) / elapsed:,.0f} combinations/s)")
+
+    columns = ['profit', 'loss', 'wait', 'cooldown', 'trades', 'win_rate', 'pnl', 'max_drawdown', 'open_position']
+    rows = [
+        [*grid[i], results['trades'][i], round(results['win_rate'][i], 2), round(results['pnl'][i], 8),
+         round(results['max_drawdown'][i], 8), bool(results['open_position'][i])]
+        for i in range(len(grid))
+    ]
+    if args.output:
+        with open(args.output, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            writer.writerows(rows)
+
+    print(' | '.join(f"{column:>12}" for column in columns))
+    for i in np.argsort(-results['pnl'])[:args.top]:
+        print(' | '.join(f"{value:>12}" for value in rows[i]))
+
+
+if __name__ == "__main__":
+    main()